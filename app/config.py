@@ -17,6 +17,7 @@ class Settings:
     # ===== CONFIGURACIÓN DEL SERVIDOR =====
     HOST: str = os.getenv("HOST", "0.0.0.0")
     PORT: int = int(os.getenv("PORT", "8000"))
+    GZIP_MINIMUM_SIZE: int = int(os.getenv("GZIP_MINIMUM_SIZE", "1024"))  # bytes
     
     # ===== CONFIGURACIÓN DE BASE DE DATOS =====
     # Configuración para Docker (por defecto)
@@ -30,16 +31,83 @@ class Settings:
     DB_NAME: str = os.getenv("DB_NAME", "sportbot_db")
     DB_SSL_CA: str = os.getenv("CA_PATH", "")
     
+    # Pool de conexiones síncronas (pymysql)
+    DB_POOL_MIN_SIZE: int = int(os.getenv("DB_POOL_MIN_SIZE", "1"))
+    DB_POOL_MAX_SIZE: int = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+    DB_POOL_MAX_LIFETIME: float = float(os.getenv("DB_POOL_MAX_LIFETIME", "1800"))  # segundos
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "10"))  # espera máxima por conexión
+    DB_POOL_PING_INTERVAL: float = float(os.getenv("DB_POOL_PING_INTERVAL", "0"))  # 0 = ping en cada préstamo
+    
+    # Pool de conexiones asíncronas (aiomysql)
+    DB_ASYNC_POOL_MIN_SIZE: int = int(os.getenv("DB_ASYNC_POOL_MIN_SIZE", "1"))
+    DB_ASYNC_POOL_MAX_SIZE: int = int(os.getenv("DB_ASYNC_POOL_MAX_SIZE", "10"))
+    
+    # Operaciones masivas (bulk)
+    BULK_CHUNK_SIZE: int = int(os.getenv("BULK_CHUNK_SIZE", "500"))  # filas por transacción
+    
+    # Persistencia diferida (write-behind) de chat y mensaje
+    WRITE_BEHIND_BATCH_SIZE: int = int(os.getenv("WRITE_BEHIND_BATCH_SIZE", "200"))  # turnos por flush
+    WRITE_BEHIND_FLUSH_INTERVAL: float = float(os.getenv("WRITE_BEHIND_FLUSH_INTERVAL", "1.0"))  # segundos
+    WRITE_BEHIND_MAX_PENDING: int = int(os.getenv("WRITE_BEHIND_MAX_PENDING", "10000"))
+    WRITE_BEHIND_ENQUEUE_TIMEOUT: float = float(os.getenv("WRITE_BEHIND_ENQUEUE_TIMEOUT", "2.0"))
+    WRITE_BEHIND_MAX_RETRIES: int = int(os.getenv("WRITE_BEHIND_MAX_RETRIES", "3"))
+    
     # ===== CONFIGURACIÓN DE QDRANT =====
     QDRANT_HOST: str = os.getenv("QDRANT_HOST", "localhost")
     QDRANT_PORT: int = int(os.getenv("QDRANT_PORT", "6333"))
     QDRANT_API_KEY: str = os.getenv("QDRANT_API_KEY", "")
     QDRANT_COLLECTION_NAME: str = os.getenv("QDRANT_COLLECTION_NAME", "sportbot_collection")
+    # ":memory:" o una ruta local usa Qdrant embebido en lugar del servidor
+    QDRANT_LOCATION: str = os.getenv("QDRANT_LOCATION", "")
+    QDRANT_PREFER_GRPC: bool = os.getenv("QDRANT_PREFER_GRPC", "false").lower() == "true"
+    QDRANT_GRPC_PORT: int = int(os.getenv("QDRANT_GRPC_PORT", "6334"))
+    QDRANT_TIMEOUT: int = int(os.getenv("QDRANT_TIMEOUT", "10"))  # segundos por petición
+    # Carga masiva: puntos por petición, peticiones simultáneas y reintentos por lote
+    QDRANT_UPSERT_BATCH_SIZE: int = int(os.getenv("QDRANT_UPSERT_BATCH_SIZE", "256"))
+    QDRANT_UPSERT_PARALLELISM: int = int(os.getenv("QDRANT_UPSERT_PARALLELISM", "4"))
+    QDRANT_UPSERT_MAX_RETRIES: int = int(os.getenv("QDRANT_UPSERT_MAX_RETRIES", "3"))
+    # Índice HNSW y almacenamiento de vectores (se aplican al crear la colección y al arrancar si cambian)
+    QDRANT_HNSW_M: int = int(os.getenv("QDRANT_HNSW_M", "16"))
+    QDRANT_HNSW_EF_CONSTRUCT: int = int(os.getenv("QDRANT_HNSW_EF_CONSTRUCT", "100"))
+    QDRANT_HNSW_EF: int = int(os.getenv("QDRANT_HNSW_EF", "0"))  # ef en búsqueda, 0 = valor del servidor
+    QDRANT_ON_DISK: bool = os.getenv("QDRANT_ON_DISK", "false").lower() == "true"  # vectores originales en disco
+    QDRANT_QUANTIZATION: str = os.getenv("QDRANT_QUANTIZATION", "none").lower()  # none | int8
+    QDRANT_QUANTIZATION_RESCORE: bool = os.getenv("QDRANT_QUANTIZATION_RESCORE", "true").lower() == "true"
+    QDRANT_QUANTIZATION_OVERSAMPLING: float = float(os.getenv("QDRANT_QUANTIZATION_OVERSAMPLING", "2.0"))
+    # Búsqueda híbrida: vector denso + BM25 disperso fusionados con RRF
+    HYBRID_SEARCH_ENABLED: bool = os.getenv("HYBRID_SEARCH_ENABLED", "true").lower() == "true"
+    SEARCH_MODE: str = os.getenv("SEARCH_MODE", "hybrid").lower()  # dense | sparse | hybrid (por defecto)
+    HYBRID_PREFETCH_LIMIT: int = int(os.getenv("HYBRID_PREFETCH_LIMIT", "50"))  # candidatos por rama antes de fusionar
+    SPARSE_ENCODER_PATH: str = os.getenv("SPARSE_ENCODER_PATH", "data/sparse_encoder.json")
+    # Backend vectorial: qdrant | local (índice en proceso, para desarrollo y tests sin servidor)
+    VECTOR_BACKEND: str = os.getenv("VECTOR_BACKEND", "qdrant").lower()
+    # Réplica local usada automáticamente cuando Qdrant no responde (circuit breaker);
+    # cada escritura reescribe la colección completa en LOCAL_VECTOR_PATH
+    VECTOR_FAILOVER_ENABLED: bool = os.getenv("VECTOR_FAILOVER_ENABLED", "true").lower() == "true"
+    VECTOR_FAILOVER_THRESHOLD: int = int(os.getenv("VECTOR_FAILOVER_THRESHOLD", "3"))  # fallos seguidos para abrir
+    VECTOR_FAILOVER_RESET_SECONDS: float = float(os.getenv("VECTOR_FAILOVER_RESET_SECONDS", "30"))  # antes de reintentar
+    LOCAL_VECTOR_PATH: str = os.getenv("LOCAL_VECTOR_PATH", "data/vectors")  # matriz float32 mapeada en memoria
+    # Índice HNSW (hnswlib) a partir de LOCAL_VECTOR_HNSW_MIN_POINTS puntos; por debajo, fuerza bruta
+    LOCAL_VECTOR_HNSW: bool = os.getenv("LOCAL_VECTOR_HNSW", "false").lower() == "true"
+    LOCAL_VECTOR_HNSW_MIN_POINTS: int = int(os.getenv("LOCAL_VECTOR_HNSW_MIN_POINTS", "20000"))
     
     # ===== CONFIGURACIÓN DE REDIS =====
     REDIS_HOST: str = os.getenv("REDIS_HOST", "localhost")
     REDIS_PORT: int = int(os.getenv("REDIS_PORT", "6379"))
     
+    # ===== CONFIGURACIÓN DE CACHÉ DEL CATÁLOGO =====
+    CACHE_BACKEND: str = os.getenv("CACHE_BACKEND", "memory").lower()  # memory | redis | none
+    CACHE_TTL_SECONDS: float = float(os.getenv("CACHE_TTL_SECONDS", "60"))
+    CACHE_MAX_ENTRIES: int = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+    CACHE_REDIS_PREFIX: str = os.getenv("CACHE_REDIS_PREFIX", "sportbot:cache:")
+    
+    # ===== CONFIGURACIÓN DEL HISTORIAL DE CONVERSACIÓN =====
+    CHAT_HISTORY_BACKEND: str = os.getenv("CHAT_HISTORY_BACKEND", "memory").lower()  # memory | redis
+    CHAT_HISTORY_MAX_TURNS: int = int(os.getenv("CHAT_HISTORY_MAX_TURNS", "10"))  # turnos por chat
+    CHAT_HISTORY_MAX_TOKENS: int = int(os.getenv("CHAT_HISTORY_MAX_TOKENS", "1500"))  # presupuesto enviado al LLM
+    CHAT_HISTORY_MAX_CHATS: int = int(os.getenv("CHAT_HISTORY_MAX_CHATS", "10000"))  # chats en memoria
+    CHAT_HISTORY_TTL_SECONDS: float = float(os.getenv("CHAT_HISTORY_TTL_SECONDS", "1800"))  # solo redis
+    
     # ===== CONFIGURACIÓN DE OPENAI/LLM =====
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
     OPENAI_MODEL: str = os.getenv("OPENAI_MODEL", "gpt-3.5-turbo")
@@ -47,6 +115,29 @@ class Settings:
     # ===== CONFIGURACIÓN DE EMBEDDINGS =====
     EMBEDDING_MODEL: str = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
     EMBEDDING_DIMENSION: int = int(os.getenv("EMBEDDING_DIMENSION", "384"))
+    # lazy: primer uso | startup: al arrancar cada worker | import: al importar la app
+    # (con gunicorn --preload los workers comparten los pesos cargados en el master)
+    EMBEDDING_WARMUP: str = os.getenv("EMBEDDING_WARMUP", "startup").lower()
+    # Agrupación de consultas concurrentes en un solo forward pass
+    EMBEDDING_MAX_BATCH_SIZE: int = int(os.getenv("EMBEDDING_MAX_BATCH_SIZE", "32"))
+    EMBEDDING_MAX_WAIT_MS: float = float(os.getenv("EMBEDDING_MAX_WAIT_MS", "5"))
+    EMBEDDING_EXECUTOR_WORKERS: int = int(os.getenv("EMBEDDING_EXECUTOR_WORKERS", "1"))
+    # Codificación masiva: lotes por longitud en tokens (tokens con padding por lote / máx. textos por lote)
+    EMBEDDING_BATCH_TOKENS: int = int(os.getenv("EMBEDDING_BATCH_TOKENS", "8192"))
+    EMBEDDING_DOCUMENT_BATCH_SIZE: int = int(os.getenv("EMBEDDING_DOCUMENT_BATCH_SIZE", "128"))
+    # Reindexado completo en procesos aparte (0 = un worker por núcleo / núcleos repartidos entre workers)
+    EMBEDDING_REINDEX_WORKERS: int = int(os.getenv("EMBEDDING_REINDEX_WORKERS", "0"))
+    EMBEDDING_REINDEX_THREADS: int = int(os.getenv("EMBEDDING_REINDEX_THREADS", "0"))
+    EMBEDDING_REINDEX_CHUNK_SIZE: int = int(os.getenv("EMBEDDING_REINDEX_CHUNK_SIZE", "256"))
+    # Backend de inferencia: torch (SentenceTransformer) | onnx (ONNX Runtime en CPU)
+    EMBEDDING_BACKEND: str = os.getenv("EMBEDDING_BACKEND", "torch").lower()
+    EMBEDDING_ONNX_DIR: str = os.getenv("EMBEDDING_ONNX_DIR", "data/onnx")  # modelos exportados
+    EMBEDDING_ONNX_QUANTIZE: bool = os.getenv("EMBEDDING_ONNX_QUANTIZE", "false").lower() == "true"  # pesos int8
+    EMBEDDING_ONNX_THREADS: int = int(os.getenv("EMBEDDING_ONNX_THREADS", "0"))  # 0 = todos los núcleos
+    # Caché persistente de embeddings por (modelo, hash del contenido)
+    EMBEDDING_CACHE_ENABLED: bool = os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() == "true"
+    EMBEDDING_CACHE_PATH: str = os.getenv("EMBEDDING_CACHE_PATH", "data/embedding_cache.sqlite3")
+    EMBEDDING_CACHE_MAX_ENTRIES: int = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "200000"))
     
     # ===== CONFIGURACIÓN DE TELEGRAM =====
     TELEGRAM_BOT_TOKEN: str = os.getenv("TELEGRAM_BOT_TOKEN", "")
@@ -98,7 +189,11 @@ class Settings:
             "host": cls.QDRANT_HOST,
             "port": cls.QDRANT_PORT,
             "api_key": cls.QDRANT_API_KEY,
-            "collection": cls.QDRANT_COLLECTION_NAME
+            "collection": cls.QDRANT_COLLECTION_NAME,
+            "location": cls.QDRANT_LOCATION,
+            "prefer_grpc": cls.QDRANT_PREFER_GRPC,
+            "grpc_port": cls.QDRANT_GRPC_PORT,
+            "timeout": cls.QDRANT_TIMEOUT
         }
     
     @classmethod
@@ -1,15 +1,20 @@
-from typing import List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 import pymysql
-from app.database import get_sync_connection
-from app.models.categoria.CategoriaModel import CategoriaCreate, CategoriaUpdate, CategoriaResponse
+from app.database import get_pooled_connection
+from app.models.categoria.CategoriaModel import CategoriaCreate, CategoriaUpdate, CategoriaBulkUpdate, CategoriaResponse
+from app.services.serialization import construct_models
+from app.services.pagination import fetch_page, stream_rows, iter_ndjson
+from app.services.bulk import bulk_insert, bulk_update, bulk_delete
+from app.services.cache import catalog_cache
+from app.services.conditional import CatalogVersion, compute_version
+from app.services.facets import remove_categoria_facets
 
 class CategoriaController:
     
     @staticmethod
     def create_categoria(categoria: CategoriaCreate) -> CategoriaResponse:
         """Create a new categoria"""
-        connection = get_sync_connection()
-        try:
+        with get_pooled_connection() as connection:
             with connection.cursor() as cursor:
                 sql = """
                 INSERT INTO categoria (nombre, descripcion) 
@@ -20,75 +25,137 @@ class CategoriaController:
                 
                 # Get the created categoria
                 categoria_id = cursor.lastrowid
-                return CategoriaController.get_categoria_by_id(categoria_id)
-        finally:
-            connection.close()
+        
+        catalog_cache.invalidate("categorias:all", "categorias:version", f"categoria:{categoria_id}")
+        return CategoriaController.get_categoria_by_id(categoria_id)
     
     @staticmethod
     def get_all_categorias() -> List[CategoriaResponse]:
-        """Get all categorias"""
-        connection = get_sync_connection()
-        try:
+        """Get all categorias (cached)"""
+        return catalog_cache.get_or_load(
+            "categorias:all",
+            lambda: CategoriaController._fetch_all_categorias()
+        )
+    
+    @staticmethod
+    def _fetch_all_categorias() -> List[CategoriaResponse]:
+        with get_pooled_connection() as connection:
             with connection.cursor() as cursor:
                 sql = "SELECT * FROM categoria ORDER BY fechaCreacion DESC"
                 cursor.execute(sql)
                 result = cursor.fetchall()
-                return [CategoriaResponse(**row) for row in result]
-        finally:
-            connection.close()
+                return construct_models(result, CategoriaResponse)
+    
+    @staticmethod
+    def get_categorias_page(limit: int, cursor: Optional[str] = None) -> Tuple[List[CategoriaResponse], Optional[str]]:
+        """Get one keyset page of categorias and the cursor of the next page"""
+        rows, next_cursor = fetch_page("categoria", "fechaCreacion", limit, cursor)
+        return construct_models(rows, CategoriaResponse), next_cursor
+    
+    @staticmethod
+    def stream_categorias() -> Iterator[bytes]:
+        """Stream categorias as NDJSON through a server-side cursor"""
+        return iter_ndjson(stream_rows("categoria", "fechaCreacion"), CategoriaResponse)
+    
+    @staticmethod
+    def get_catalog_version() -> CatalogVersion:
+        """Get the (ETag, None) version of the categoria listing (cached); ETag only, see compute_version"""
+        return catalog_cache.get_or_load("categorias:version", lambda: compute_version("categoria"))
     
     @staticmethod
     def get_categoria_by_id(categoria_id: int) -> Optional[CategoriaResponse]:
-        """Get categoria by ID"""
-        connection = get_sync_connection()
-        try:
+        """Get categoria by ID (cached)"""
+        return catalog_cache.get_or_load(
+            f"categoria:{categoria_id}",
+            lambda: CategoriaController._fetch_categoria_by_id(categoria_id)
+        )
+    
+    @staticmethod
+    def _fetch_categoria_by_id(categoria_id: int) -> Optional[CategoriaResponse]:
+        with get_pooled_connection() as connection:
             with connection.cursor() as cursor:
                 sql = "SELECT * FROM categoria WHERE id = %s"
                 cursor.execute(sql, (categoria_id,))
                 result = cursor.fetchone()
-                return CategoriaResponse(**result) if result else None
-        finally:
-            connection.close()
+                return CategoriaResponse.model_construct(**result) if result else None
     
     @staticmethod
     def update_categoria(categoria_id: int, categoria: CategoriaUpdate) -> Optional[CategoriaResponse]:
         """Update categoria"""
-        connection = get_sync_connection()
-        try:
+        # Build dynamic update query
+        update_fields = []
+        values = []
+        
+        if categoria.nombre is not None:
+            update_fields.append("nombre = %s")
+            values.append(categoria.nombre)
+        
+        if categoria.descripcion is not None:
+            update_fields.append("descripcion = %s")
+            values.append(categoria.descripcion)
+        
+        if not update_fields:
+            return CategoriaController.get_categoria_by_id(categoria_id)
+        
+        values.append(categoria_id)
+        sql = f"UPDATE categoria SET {', '.join(update_fields)} WHERE id = %s"
+        
+        with get_pooled_connection() as connection:
             with connection.cursor() as cursor:
-                # Build dynamic update query
-                update_fields = []
-                values = []
-                
-                if categoria.nombre is not None:
-                    update_fields.append("nombre = %s")
-                    values.append(categoria.nombre)
-                
-                if categoria.descripcion is not None:
-                    update_fields.append("descripcion = %s")
-                    values.append(categoria.descripcion)
-                
-                if not update_fields:
-                    return CategoriaController.get_categoria_by_id(categoria_id)
-                
-                values.append(categoria_id)
-                sql = f"UPDATE categoria SET {', '.join(update_fields)} WHERE id = %s"
                 cursor.execute(sql, values)
                 connection.commit()
-                
-                return CategoriaController.get_categoria_by_id(categoria_id)
-        finally:
-            connection.close()
+        
+        catalog_cache.invalidate("categorias:all", "categorias:version", f"categoria:{categoria_id}")
+        return CategoriaController.get_categoria_by_id(categoria_id)
     
     @staticmethod
     def delete_categoria(categoria_id: int) -> bool:
         """Delete categoria"""
-        connection = get_sync_connection()
-        try:
+        with get_pooled_connection() as connection:
             with connection.cursor() as cursor:
-                sql = "DELETE FROM categoria WHERE id = %s"
-                cursor.execute(sql, (categoria_id,))
+                # Categoria first, then its productos, then the counters: the
+                # order bulk_delete_categorias locks them in
+                cursor.execute("SELECT id FROM categoria WHERE id = %s FOR UPDATE", (categoria_id,))
+                deleted = cursor.fetchone() is not None
+                if deleted:
+                    remove_categoria_facets(cursor, [categoria_id])
+                    sql = "DELETE FROM categoria WHERE id = %s"
+                    cursor.execute(sql, (categoria_id,))
                 connection.commit()
-                return cursor.rowcount > 0
+        
+        catalog_cache.invalidate(
+            "categorias:all", "categorias:version", f"categoria:{categoria_id}", "productos:version",
+            f"productos:categoria:{categoria_id}", f"productos:categoria:{categoria_id}:version",
+            "productos:facets"
+        )
+        return deleted
+    
+    @staticmethod
+    def bulk_create_categorias(categorias: List[CategoriaCreate], atomic: bool = False) -> Dict:
+        """Create categorias with executemany in chunked transactions"""
+        result = bulk_insert("categoria", categorias, atomic=atomic)
+        catalog_cache.invalidate_prefix("categoria")
+        return result
+    
+    @staticmethod
+    def bulk_update_categorias(categorias: List[CategoriaBulkUpdate], atomic: bool = False) -> Dict:
+        """Update categorias with executemany in chunked transactions"""
+        result = bulk_update("categoria", categorias, atomic=atomic)
+        catalog_cache.invalidate_prefix("categoria")
+        return result
+    
+    @staticmethod
+    def bulk_delete_categorias(categoria_ids: List[int], atomic: bool = False) -> Dict:
+        """Delete categorias with executemany in chunked transactions"""
+        try:
+            return bulk_delete("categoria", categoria_ids, atomic=atomic,
+                               on_change=CategoriaController._remove_producto_facets)
         finally:
-            connection.close()
+            catalog_cache.invalidate_prefix("categoria")
+            # Deleted categorias may cascade to their productos
+            catalog_cache.invalidate_prefix("producto")
+    
+    @staticmethod
+    def _remove_producto_facets(cursor, changes) -> None:
+        """bulk_delete hook: the cascade removes the productos of these categorias"""
+        remove_categoria_facets(cursor, [old_row["id"] for old_row, _ in changes])
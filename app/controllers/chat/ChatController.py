@@ -1,9 +1,12 @@
-from typing import List, Optional, Dict
+from typing import Iterator, List, Optional, Tuple, Dict
 import pymysql
-from app.database import get_sync_connection
+from app.database import get_pooled_connection
 from app.models.chat.ChatModel import ChatCreate, ChatUpdate, ChatResponse
+from app.services.serialization import construct_models
+from app.services.pagination import fetch_page, stream_rows, iter_ndjson
 from app.services.agent import AgentService
 from app.services.data_sync import DataSyncService
+from app.services.write_behind import ConversationTurn, conversation_writer
 
 class ChatController:
     
@@ -44,41 +47,18 @@ class ChatController:
             }
     
     async def _store_conversation(self, user_id: int, user_message: str, bot_response: str):
-        """Store conversation in database for persistence"""
-        connection = get_sync_connection()
-        try:
-            with connection.cursor() as cursor:
-                # Update or create chat record
-                sql_check = "SELECT id FROM chat WHERE usuarioId = %s ORDER BY fechaCreacion DESC LIMIT 1"
-                cursor.execute(sql_check, (user_id,))
-                chat_record = cursor.fetchone()
-                
-                if chat_record:
-                    # Update existing chat
-                    sql_update = """
-                    UPDATE chat 
-                    SET ultimoMensaje = %s, totalMensajes = totalMensajes + 1 
-                    WHERE id = %s
-                    """
-                    cursor.execute(sql_update, (user_message, chat_record['id']))
-                else:
-                    # Create new chat
-                    sql_insert = """
-                    INSERT INTO chat (usuarioId, chatId, ultimoMensaje, totalMensajes) 
-                    VALUES (%s, %s, %s, %s)
-                    """
-                    cursor.execute(sql_insert, (user_id, f"chat_{user_id}", user_message, 1))
-                
-                connection.commit()
-                
-        finally:
-            connection.close()
+        """Queue the turn for write-behind persistence (chat counters and mensaje rows)"""
+        await conversation_writer.record_turn(ConversationTurn(
+            chat_key=f"chat_{user_id}",
+            user_message=user_message,
+            bot_response=bot_response,
+            usuario_id=user_id
+        ))
     
     @staticmethod
     def create_chat(chat: ChatCreate) -> ChatResponse:
         """Create a new chat"""
-        connection = get_sync_connection()
-        try:
+        with get_pooled_connection() as connection:
             with connection.cursor() as cursor:
                 sql = """
                 INSERT INTO chat (usuarioId, chatId, ultimoMensaje, totalMensajes) 
@@ -90,87 +70,89 @@ class ChatController:
                 connection.commit()
                 
                 chat_id = cursor.lastrowid
-                return ChatController.get_chat_by_id(chat_id)
-        finally:
-            connection.close()
+        
+        return ChatController.get_chat_by_id(chat_id)
     
     @staticmethod
     def get_all_chats() -> List[ChatResponse]:
         """Get all chats"""
-        connection = get_sync_connection()
-        try:
+        with get_pooled_connection() as connection:
             with connection.cursor() as cursor:
                 sql = "SELECT * FROM chat ORDER BY fechaCreacion DESC"
                 cursor.execute(sql)
                 result = cursor.fetchall()
-                return [ChatResponse(**row) for row in result]
-        finally:
-            connection.close()
+                return construct_models(result, ChatResponse)
+    
+    @staticmethod
+    def get_chats_page(limit: int, cursor: Optional[str] = None,
+                      usuario_id: Optional[int] = None) -> Tuple[List[ChatResponse], Optional[str]]:
+        """Get one keyset page of chats and the cursor of the next page"""
+        where, params = ("usuarioId = %s", (usuario_id,)) if usuario_id is not None else ("", ())
+        rows, next_cursor = fetch_page("chat", "fechaCreacion", limit, cursor, where, params)
+        return construct_models(rows, ChatResponse), next_cursor
+    
+    @staticmethod
+    def stream_chats(usuario_id: Optional[int] = None) -> Iterator[bytes]:
+        """Stream chats as NDJSON through a server-side cursor"""
+        where, params = ("usuarioId = %s", (usuario_id,)) if usuario_id is not None else ("", ())
+        return iter_ndjson(stream_rows("chat", "fechaCreacion", where, params), ChatResponse)
     
     @staticmethod
     def get_chat_by_id(chat_id: int) -> Optional[ChatResponse]:
         """Get chat by ID"""
-        connection = get_sync_connection()
-        try:
+        with get_pooled_connection() as connection:
             with connection.cursor() as cursor:
                 sql = "SELECT * FROM chat WHERE id = %s"
                 cursor.execute(sql, (chat_id,))
                 result = cursor.fetchone()
-                return ChatResponse(**result) if result else None
-        finally:
-            connection.close()
+                return ChatResponse.model_construct(**result) if result else None
     
     @staticmethod
     def get_chats_by_usuario(usuario_id: int) -> List[ChatResponse]:
         """Get chats by usuario"""
-        connection = get_sync_connection()
-        try:
+        with get_pooled_connection() as connection:
             with connection.cursor() as cursor:
                 sql = "SELECT * FROM chat WHERE usuarioId = %s ORDER BY fechaCreacion DESC"
                 cursor.execute(sql, (usuario_id,))
                 result = cursor.fetchall()
-                return [ChatResponse(**row) for row in result]
-        finally:
-            connection.close()
+                return construct_models(result, ChatResponse)
     
     @staticmethod
     def update_chat(chat_id: int, chat: ChatUpdate) -> Optional[ChatResponse]:
         """Update chat"""
-        connection = get_sync_connection()
-        try:
+        update_fields = []
+        values = []
+        
+        if chat.ultimoMensaje is not None:
+            update_fields.append("ultimoMensaje = %s")
+            values.append(chat.ultimoMensaje)
+        
+        if chat.totalMensajes is not None:
+            update_fields.append("totalMensajes = %s")
+            values.append(chat.totalMensajes)
+        
+        if not update_fields:
+            return ChatController.get_chat_by_id(chat_id)
+        
+        values.append(chat_id)
+        sql = f"UPDATE chat SET {', '.join(update_fields)} WHERE id = %s"
+        
+        with get_pooled_connection() as connection:
             with connection.cursor() as cursor:
-                update_fields = []
-                values = []
-                
-                if chat.ultimoMensaje is not None:
-                    update_fields.append("ultimoMensaje = %s")
-                    values.append(chat.ultimoMensaje)
-                
-                if chat.totalMensajes is not None:
-                    update_fields.append("totalMensajes = %s")
-                    values.append(chat.totalMensajes)
-                
-                if not update_fields:
-                    return ChatController.get_chat_by_id(chat_id)
-                
-                values.append(chat_id)
-                sql = f"UPDATE chat SET {', '.join(update_fields)} WHERE id = %s"
                 cursor.execute(sql, values)
                 connection.commit()
-                
-                return ChatController.get_chat_by_id(chat_id)
-        finally:
-            connection.close()
+        
+        return ChatController.get_chat_by_id(chat_id)
     
     @staticmethod
     def delete_chat(chat_id: int) -> bool:
         """Delete chat"""
-        connection = get_sync_connection()
-        try:
+        with get_pooled_connection() as connection:
             with connection.cursor() as cursor:
                 sql = "DELETE FROM chat WHERE id = %s"
                 cursor.execute(sql, (chat_id,))
                 connection.commit()
-                return cursor.rowcount > 0
-        finally:
-            connection.close()
+                deleted = cursor.rowcount > 0
+        
+        conversation_writer.forget_chat(chat_id)
+        return deleted
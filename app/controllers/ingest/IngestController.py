@@ -11,12 +11,14 @@ class IngestController:
     def __init__(self):
         self.data_sync_service = DataSyncService()
     
-    async def sync_all_data(self, force_full_sync: bool = False) -> Dict:
+    async def sync_all_data(self, force_full_sync: bool = False, workers: Optional[int] = None) -> Dict:
         """
         Endpoint for complete data synchronization
         
         Args:
-            force_full_sync: Force a complete resync even if data exists
+            force_full_sync: Force a complete resync even if data exists: every
+                document is re-encoded in a pool of worker processes
+            workers: Worker processes for the forced re-index
             
         Returns:
             Dict with sync results
@@ -24,7 +26,7 @@ class IngestController:
         try:
             logger.info(f"Starting full data sync (force: {force_full_sync})")
             
-            result = await self.data_sync_service.sync_all_data()
+            result = await self.data_sync_service.sync_all_data(reindex=force_full_sync, workers=workers)
             
             logger.info(f"Full sync completed: {result['synced_count']} documents")
             return result
@@ -1,15 +1,24 @@
-from typing import List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import re
 import pymysql
-from app.database import get_sync_connection
-from app.models.producto.ProductoModel import ProductoCreate, ProductoUpdate, ProductoResponse
+from app.database import get_pooled_connection
+from app.models.producto.ProductoModel import ProductoCreate, ProductoUpdate, ProductoBulkUpdate, ProductoResponse, ProductoSearch
+from app.services.serialization import construct_models
+from app.services.pagination import fetch_page, stream_rows, iter_ndjson
+from app.services.bulk import bulk_insert, bulk_update, bulk_delete
+from app.services.cache import catalog_cache
+from app.services.conditional import CatalogVersion, compute_version
+from app.services.facets import FACET_COLUMNS, apply_facet_delta, apply_facet_deltas, load_facets, rebuild_facets
+
+# InnoDB ignores FULLTEXT tokens shorter than innodb_ft_min_token_size (3)
+FULLTEXT_MIN_TOKEN = 3
 
 class ProductoController:
     
     @staticmethod
     def create_producto(producto: ProductoCreate) -> ProductoResponse:
         """Create a new producto"""
-        connection = get_sync_connection()
-        try:
+        with get_pooled_connection() as connection:
             with connection.cursor() as cursor:
                 sql = """
                 INSERT INTO producto (categoriaId, nombre, descripcion, talla, color, precio, stock) 
@@ -19,110 +28,253 @@ class ProductoController:
                     producto.categoriaId, producto.nombre, producto.descripcion,
                     producto.talla, producto.color, producto.precio, producto.stock
                 ))
-                connection.commit()
-                
                 producto_id = cursor.lastrowid
-                return ProductoController.get_producto_by_id(producto_id)
-        finally:
-            connection.close()
+                apply_facet_delta(cursor, None, producto.model_dump())
+                connection.commit()
+        
+        ProductoController._invalidate(producto_id, producto.categoriaId)
+        return ProductoController.get_producto_by_id(producto_id)
     
     @staticmethod
     def get_all_productos() -> List[ProductoResponse]:
         """Get all productos"""
-        connection = get_sync_connection()
-        try:
+        with get_pooled_connection() as connection:
             with connection.cursor() as cursor:
                 sql = "SELECT * FROM producto ORDER BY fechaCreacion DESC"
                 cursor.execute(sql)
                 result = cursor.fetchall()
-                return [ProductoResponse(**row) for row in result]
-        finally:
-            connection.close()
+                return construct_models(result, ProductoResponse)
+    
+    @staticmethod
+    def get_productos_page(limit: int, cursor: Optional[str] = None,
+                          categoria_id: Optional[int] = None) -> Tuple[List[ProductoResponse], Optional[str]]:
+        """Get one keyset page of productos and the cursor of the next page"""
+        where, params = ("categoriaId = %s", (categoria_id,)) if categoria_id is not None else ("", ())
+        rows, next_cursor = fetch_page("producto", "fechaCreacion", limit, cursor, where, params)
+        return construct_models(rows, ProductoResponse), next_cursor
+    
+    @staticmethod
+    def stream_productos(categoria_id: Optional[int] = None) -> Iterator[bytes]:
+        """Stream productos as NDJSON through a server-side cursor"""
+        where, params = ("categoriaId = %s", (categoria_id,)) if categoria_id is not None else ("", ())
+        return iter_ndjson(stream_rows("producto", "fechaCreacion", where, params), ProductoResponse)
+    
+    @staticmethod
+    def search_productos(filters: ProductoSearch, limit: int,
+                         cursor: Optional[str] = None) -> Tuple[List[ProductoResponse], Optional[str]]:
+        """Search productos by text and attributes, one keyset page ordered by precio"""
+        where, params = ProductoController._search_filter(filters)
+        rows, next_cursor = fetch_page("producto", "precio", limit, cursor, where, params,
+                                       descending=filters.descending)
+        return construct_models(rows, ProductoResponse), next_cursor
+    
+    @staticmethod
+    def _search_filter(filters: ProductoSearch) -> Tuple[str, List[Any]]:
+        """
+        Build the WHERE clause of a search
+        
+        Equality filters come first so they line up with the
+        (categoriaId, talla, color, precio, id) and (talla, color, precio, id)
+        indexes; text goes through the FULLTEXT index on nombre/descripcion.
+        """
+        conditions, params = [], []
+        for column, value in (("categoriaId", filters.categoriaId), ("talla", filters.talla), ("color", filters.color)):
+            if value is not None:
+                conditions.append(f"{column} = %s")
+                params.append(value)
+        
+        if filters.precioMin is not None:
+            conditions.append("precio >= %s")
+            params.append(filters.precioMin)
+        if filters.precioMax is not None:
+            conditions.append("precio <= %s")
+            params.append(filters.precioMax)
+        
+        text_query = ProductoController._fulltext_query(filters.q)
+        if text_query:
+            conditions.append("MATCH(nombre, descripcion) AGAINST (%s IN BOOLEAN MODE)")
+            params.append(text_query)
+        
+        return " AND ".join(conditions), params
+    
+    @staticmethod
+    def _fulltext_query(text: Optional[str]) -> Optional[str]:
+        """Turn free text into a boolean-mode query requiring every word as a prefix"""
+        terms = []
+        for word in re.findall(r"\w+", (text or "").lower()):
+            if len(word) < FULLTEXT_MIN_TOKEN:
+                continue
+            # "camisetas" -> "camiseta*" matches both singular and plural
+            if len(word) > 4 and word.endswith("s"):
+                word = word[:-1]
+            terms.append(f"+{word}*")
+        return " ".join(terms) or None
     
     @staticmethod
     def get_producto_by_id(producto_id: int) -> Optional[ProductoResponse]:
-        """Get producto by ID"""
-        connection = get_sync_connection()
-        try:
+        """Get producto by ID (cached)"""
+        return catalog_cache.get_or_load(
+            f"producto:{producto_id}",
+            lambda: ProductoController._fetch_producto_by_id(producto_id)
+        )
+    
+    @staticmethod
+    def _fetch_producto_by_id(producto_id: int) -> Optional[ProductoResponse]:
+        with get_pooled_connection() as connection:
             with connection.cursor() as cursor:
                 sql = "SELECT * FROM producto WHERE id = %s"
                 cursor.execute(sql, (producto_id,))
                 result = cursor.fetchone()
-                return ProductoResponse(**result) if result else None
-        finally:
-            connection.close()
+                return ProductoResponse.model_construct(**result) if result else None
     
     @staticmethod
     def get_productos_by_categoria(categoria_id: int) -> List[ProductoResponse]:
-        """Get productos by categoria"""
-        connection = get_sync_connection()
-        try:
+        """Get productos by categoria (cached)"""
+        return catalog_cache.get_or_load(
+            f"productos:categoria:{categoria_id}",
+            lambda: ProductoController._fetch_productos_by_categoria(categoria_id)
+        )
+    
+    @staticmethod
+    def _fetch_productos_by_categoria(categoria_id: int) -> List[ProductoResponse]:
+        with get_pooled_connection() as connection:
             with connection.cursor() as cursor:
                 sql = "SELECT * FROM producto WHERE categoriaId = %s ORDER BY fechaCreacion DESC"
                 cursor.execute(sql, (categoria_id,))
                 result = cursor.fetchall()
-                return [ProductoResponse(**row) for row in result]
-        finally:
-            connection.close()
+                return construct_models(result, ProductoResponse)
     
     @staticmethod
     def update_producto(producto_id: int, producto: ProductoUpdate) -> Optional[ProductoResponse]:
         """Update producto"""
-        connection = get_sync_connection()
-        try:
+        update_fields = []
+        values = []
+        
+        if producto.categoriaId is not None:
+            update_fields.append("categoriaId = %s")
+            values.append(producto.categoriaId)
+        
+        if producto.nombre is not None:
+            update_fields.append("nombre = %s")
+            values.append(producto.nombre)
+        
+        if producto.descripcion is not None:
+            update_fields.append("descripcion = %s")
+            values.append(producto.descripcion)
+        
+        if producto.talla is not None:
+            update_fields.append("talla = %s")
+            values.append(producto.talla)
+        
+        if producto.color is not None:
+            update_fields.append("color = %s")
+            values.append(producto.color)
+        
+        if producto.precio is not None:
+            update_fields.append("precio = %s")
+            values.append(producto.precio)
+        
+        if producto.stock is not None:
+            update_fields.append("stock = %s")
+            values.append(producto.stock)
+        
+        if not update_fields:
+            return ProductoController.get_producto_by_id(producto_id)
+        
+        values.append(producto_id)
+        sql = f"UPDATE producto SET {', '.join(update_fields)} WHERE id = %s"
+        
+        with get_pooled_connection() as connection:
             with connection.cursor() as cursor:
-                update_fields = []
-                values = []
-                
-                if producto.categoriaId is not None:
-                    update_fields.append("categoriaId = %s")
-                    values.append(producto.categoriaId)
-                
-                if producto.nombre is not None:
-                    update_fields.append("nombre = %s")
-                    values.append(producto.nombre)
-                
-                if producto.descripcion is not None:
-                    update_fields.append("descripcion = %s")
-                    values.append(producto.descripcion)
-                
-                if producto.talla is not None:
-                    update_fields.append("talla = %s")
-                    values.append(producto.talla)
-                
-                if producto.color is not None:
-                    update_fields.append("color = %s")
-                    values.append(producto.color)
-                
-                if producto.precio is not None:
-                    update_fields.append("precio = %s")
-                    values.append(producto.precio)
-                
-                if producto.stock is not None:
-                    update_fields.append("stock = %s")
-                    values.append(producto.stock)
-                
-                if not update_fields:
-                    return ProductoController.get_producto_by_id(producto_id)
-                
-                values.append(producto_id)
-                sql = f"UPDATE producto SET {', '.join(update_fields)} WHERE id = %s"
+                old_row = ProductoController._get_facet_row(cursor, producto_id)
                 cursor.execute(sql, values)
+                if old_row:
+                    apply_facet_delta(cursor, old_row, {**old_row, **producto.model_dump(exclude_none=True)})
                 connection.commit()
-                
-                return ProductoController.get_producto_by_id(producto_id)
-        finally:
-            connection.close()
+        
+        old_categoria_id = old_row["categoriaId"] if old_row else None
+        ProductoController._invalidate(producto_id, old_categoria_id, producto.categoriaId)
+        return ProductoController.get_producto_by_id(producto_id)
     
     @staticmethod
     def delete_producto(producto_id: int) -> bool:
         """Delete producto"""
-        connection = get_sync_connection()
-        try:
+        with get_pooled_connection() as connection:
             with connection.cursor() as cursor:
+                old_row = ProductoController._get_facet_row(cursor, producto_id)
                 sql = "DELETE FROM producto WHERE id = %s"
                 cursor.execute(sql, (producto_id,))
+                deleted = cursor.rowcount > 0
+                if deleted:
+                    apply_facet_delta(cursor, old_row, None)
                 connection.commit()
-                return cursor.rowcount > 0
+        
+        ProductoController._invalidate(producto_id, old_row["categoriaId"] if old_row else None)
+        return deleted
+    
+    @staticmethod
+    def _get_facet_row(cursor, producto_id: int) -> Optional[Dict]:
+        """Lock and read the faceted columns of a producto before changing it"""
+        cursor.execute(
+            "SELECT categoriaId, talla, color, precio FROM producto WHERE id = %s FOR UPDATE",
+            (producto_id,)
+        )
+        return cursor.fetchone()
+    
+    @staticmethod
+    def _invalidate(producto_id: int, *categoria_ids: Optional[int]) -> None:
+        """Drop the cached producto, the categoria listings it appears in and their versions"""
+        keys = [f"producto:{producto_id}", "productos:version", "productos:facets"]
+        for categoria_id in set(categoria_ids):
+            if categoria_id is not None:
+                keys.extend([f"productos:categoria:{categoria_id}", f"productos:categoria:{categoria_id}:version"])
+        catalog_cache.invalidate(*keys)
+    
+    @staticmethod
+    def get_catalog_version(categoria_id: Optional[int] = None) -> CatalogVersion:
+        """Get the (ETag, None) version of the producto listing (cached); ETag only, see compute_version"""
+        if categoria_id is None:
+            return catalog_cache.get_or_load("productos:version", lambda: compute_version("producto"))
+        return catalog_cache.get_or_load(
+            f"productos:categoria:{categoria_id}:version",
+            lambda: compute_version("producto", "categoriaId = %s", (categoria_id,))
+        )
+    
+    @staticmethod
+    def get_facets() -> Dict[str, List[Dict]]:
+        """Get producto counts per categoria, talla, color and precio bucket (cached)"""
+        return catalog_cache.get_or_load("productos:facets", load_facets)
+    
+    @staticmethod
+    def rebuild_facets() -> Dict[str, int]:
+        """Recount the facet counters from the producto table"""
+        summary = rebuild_facets()
+        catalog_cache.invalidate("productos:facets")
+        return summary
+    
+    @staticmethod
+    def bulk_create_productos(productos: List[ProductoCreate], atomic: bool = False) -> Dict:
+        """Create productos with executemany in chunked transactions"""
+        try:
+            return bulk_insert("producto", productos, atomic=atomic, on_change=apply_facet_deltas)
+        finally:
+            # Earlier chunks may have committed even if a later one raised
+            catalog_cache.invalidate_prefix("producto")
+    
+    @staticmethod
+    def bulk_update_productos(productos: List[ProductoBulkUpdate], atomic: bool = False) -> Dict:
+        """Update productos with executemany in chunked transactions"""
+        try:
+            return bulk_update("producto", productos, atomic=atomic,
+                               on_change=apply_facet_deltas, columns=FACET_COLUMNS)
+        finally:
+            catalog_cache.invalidate_prefix("producto")
+    
+    @staticmethod
+    def bulk_delete_productos(producto_ids: List[int], atomic: bool = False) -> Dict:
+        """Delete productos with executemany in chunked transactions"""
+        try:
+            return bulk_delete("producto", producto_ids, atomic=atomic,
+                               on_change=apply_facet_deltas, columns=FACET_COLUMNS)
         finally:
-            connection.close()
+            catalog_cache.invalidate_prefix("producto")
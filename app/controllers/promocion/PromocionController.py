@@ -1,15 +1,18 @@
-from typing import List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 import pymysql
-from app.database import get_sync_connection
-from app.models.promocion.PromocionModel import PromocionCreate, PromocionUpdate, PromocionResponse
+from app.database import get_pooled_connection
+from app.models.promocion.PromocionModel import PromocionCreate, PromocionUpdate, PromocionBulkUpdate, PromocionResponse
+from app.services.serialization import construct_models
+from app.services.pagination import fetch_page, stream_rows, iter_ndjson
+from app.services.bulk import bulk_insert, bulk_update, bulk_delete
+from app.services.cache import catalog_cache
 
 class PromocionController:
     
     @staticmethod
     def create_promocion(promocion: PromocionCreate) -> PromocionResponse:
         """Create a new promocion"""
-        connection = get_sync_connection()
-        try:
+        with get_pooled_connection() as connection:
             with connection.cursor() as cursor:
                 sql = """
                 INSERT INTO promocion (descripcion, descuentoPorcentaje, fechaInicio, fechaFin) 
@@ -22,82 +25,114 @@ class PromocionController:
                 connection.commit()
                 
                 promocion_id = cursor.lastrowid
-                return PromocionController.get_promocion_by_id(promocion_id)
-        finally:
-            connection.close()
+        
+        catalog_cache.invalidate(f"promocion:{promocion_id}")
+        return PromocionController.get_promocion_by_id(promocion_id)
     
     @staticmethod
     def get_all_promociones() -> List[PromocionResponse]:
         """Get all promociones"""
-        connection = get_sync_connection()
-        try:
+        with get_pooled_connection() as connection:
             with connection.cursor() as cursor:
                 sql = "SELECT * FROM promocion ORDER BY fechaInicio DESC"
                 cursor.execute(sql)
                 result = cursor.fetchall()
-                return [PromocionResponse(**row) for row in result]
-        finally:
-            connection.close()
+                return construct_models(result, PromocionResponse)
+    
+    @staticmethod
+    def get_promociones_page(limit: int, cursor: Optional[str] = None) -> Tuple[List[PromocionResponse], Optional[str]]:
+        """Get one keyset page of promociones and the cursor of the next page"""
+        rows, next_cursor = fetch_page("promocion", "fechaInicio", limit, cursor)
+        return construct_models(rows, PromocionResponse), next_cursor
+    
+    @staticmethod
+    def stream_promociones() -> Iterator[bytes]:
+        """Stream promociones as NDJSON through a server-side cursor"""
+        return iter_ndjson(stream_rows("promocion", "fechaInicio"), PromocionResponse)
     
     @staticmethod
     def get_promocion_by_id(promocion_id: int) -> Optional[PromocionResponse]:
-        """Get promocion by ID"""
-        connection = get_sync_connection()
-        try:
+        """Get promocion by ID (cached)"""
+        return catalog_cache.get_or_load(
+            f"promocion:{promocion_id}",
+            lambda: PromocionController._fetch_promocion_by_id(promocion_id)
+        )
+    
+    @staticmethod
+    def _fetch_promocion_by_id(promocion_id: int) -> Optional[PromocionResponse]:
+        with get_pooled_connection() as connection:
             with connection.cursor() as cursor:
                 sql = "SELECT * FROM promocion WHERE id = %s"
                 cursor.execute(sql, (promocion_id,))
                 result = cursor.fetchone()
-                return PromocionResponse(**result) if result else None
-        finally:
-            connection.close()
+                return PromocionResponse.model_construct(**result) if result else None
     
     @staticmethod
     def update_promocion(promocion_id: int, promocion: PromocionUpdate) -> Optional[PromocionResponse]:
         """Update promocion"""
-        connection = get_sync_connection()
-        try:
+        update_fields = []
+        values = []
+        
+        if promocion.descripcion is not None:
+            update_fields.append("descripcion = %s")
+            values.append(promocion.descripcion)
+        
+        if promocion.descuentoPorcentaje is not None:
+            update_fields.append("descuentoPorcentaje = %s")
+            values.append(promocion.descuentoPorcentaje)
+        
+        if promocion.fechaInicio is not None:
+            update_fields.append("fechaInicio = %s")
+            values.append(promocion.fechaInicio)
+        
+        if promocion.fechaFin is not None:
+            update_fields.append("fechaFin = %s")
+            values.append(promocion.fechaFin)
+        
+        if not update_fields:
+            return PromocionController.get_promocion_by_id(promocion_id)
+        
+        values.append(promocion_id)
+        sql = f"UPDATE promocion SET {', '.join(update_fields)} WHERE id = %s"
+        
+        with get_pooled_connection() as connection:
             with connection.cursor() as cursor:
-                update_fields = []
-                values = []
-                
-                if promocion.descripcion is not None:
-                    update_fields.append("descripcion = %s")
-                    values.append(promocion.descripcion)
-                
-                if promocion.descuentoPorcentaje is not None:
-                    update_fields.append("descuentoPorcentaje = %s")
-                    values.append(promocion.descuentoPorcentaje)
-                
-                if promocion.fechaInicio is not None:
-                    update_fields.append("fechaInicio = %s")
-                    values.append(promocion.fechaInicio)
-                
-                if promocion.fechaFin is not None:
-                    update_fields.append("fechaFin = %s")
-                    values.append(promocion.fechaFin)
-                
-                if not update_fields:
-                    return PromocionController.get_promocion_by_id(promocion_id)
-                
-                values.append(promocion_id)
-                sql = f"UPDATE promocion SET {', '.join(update_fields)} WHERE id = %s"
                 cursor.execute(sql, values)
                 connection.commit()
-                
-                return PromocionController.get_promocion_by_id(promocion_id)
-        finally:
-            connection.close()
+        
+        catalog_cache.invalidate(f"promocion:{promocion_id}")
+        return PromocionController.get_promocion_by_id(promocion_id)
     
     @staticmethod
     def delete_promocion(promocion_id: int) -> bool:
         """Delete promocion"""
-        connection = get_sync_connection()
-        try:
+        with get_pooled_connection() as connection:
             with connection.cursor() as cursor:
                 sql = "DELETE FROM promocion WHERE id = %s"
                 cursor.execute(sql, (promocion_id,))
                 connection.commit()
-                return cursor.rowcount > 0
-        finally:
-            connection.close()
+                deleted = cursor.rowcount > 0
+        
+        catalog_cache.invalidate(f"promocion:{promocion_id}")
+        return deleted
+    
+    @staticmethod
+    def bulk_create_promociones(promociones: List[PromocionCreate], atomic: bool = False) -> Dict:
+        """Create promociones with executemany in chunked transactions"""
+        result = bulk_insert("promocion", promociones, atomic=atomic)
+        catalog_cache.invalidate_prefix("promocion")
+        return result
+    
+    @staticmethod
+    def bulk_update_promociones(promociones: List[PromocionBulkUpdate], atomic: bool = False) -> Dict:
+        """Update promociones with executemany in chunked transactions"""
+        result = bulk_update("promocion", promociones, atomic=atomic)
+        catalog_cache.invalidate_prefix("promocion")
+        return result
+    
+    @staticmethod
+    def bulk_delete_promociones(promocion_ids: List[int], atomic: bool = False) -> Dict:
+        """Delete promociones with executemany in chunked transactions"""
+        result = bulk_delete("promocion", promocion_ids, atomic=atomic)
+        catalog_cache.invalidate_prefix("promocion")
+        return result
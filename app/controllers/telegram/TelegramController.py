@@ -14,6 +14,8 @@ from app.models.telegram.TelegramModel import (
 )
 from app.services.agent import TaekwondoAgent
 from app.config import Config
+from app.services.write_behind import ConversationTurn, conversation_writer
+from app.services.chat_history import chat_history
 
 # Configurar logger
 logger = logging.getLogger(__name__)
@@ -57,8 +59,9 @@ class TelegramController:
             # Enviar respuesta a Telegram
             await self._send_telegram_message(chat.id, response_text, message.message_id)
             
-            # Actualizar sesión
+            # Actualizar sesión e historial reciente
             await self._update_session(session)
+            await chat_history.append(self._chat_key(session), message.text, response_text)
             
             # Registrar interacción en la base de datos
             await self._log_interaction(session, message.text, response_text)
@@ -107,7 +110,7 @@ class TelegramController:
                 message_text, 
                 user_info=user_info,
                 context=None,       # Sin contexto vectorial por simplicidad
-                chat_history=[]     # Sin historial por simplicidad
+                chat_history=await self._get_recent_chat_history(session)
             )
         
             return response
@@ -125,9 +128,16 @@ class TelegramController:
     
     async def _get_recent_chat_history(self, session: ChatSession) -> list:
         
-        # Obtiene el historial reciente de chat para contexto
+        # Obtiene el historial reciente de chat para contexto (últimos turnos, acotado en tokens)
         
-        return []
+        return await chat_history.get(self._chat_key(session))
+    
+    @staticmethod
+    def _chat_key(session: ChatSession) -> str:
+        
+        # Clave del chat compartida por el historial y la tabla chat (chat.chatId)
+        
+        return f"telegram_{session.chat_id}"
     
     async def _send_telegram_message(self, chat_id: int, text: str, reply_to_message_id: Optional[int] = None) -> bool:
         
@@ -172,11 +182,15 @@ class TelegramController:
     
     async def _log_interaction(self, session: ChatSession, user_message: str, bot_response: str) -> None:
         
-        # Registra la interacción en la base de datos para logs y análisis
+        # Registra la interacción en las tablas chat y mensaje (escritura diferida por lotes)
         
         try:
-            # Aquí implementarías la lógica para guardar en la BD
-            # usando las tablas chat y mensaje del DDL proporcionado
+            await conversation_writer.record_turn(ConversationTurn(
+                chat_key=self._chat_key(session),
+                user_message=user_message,
+                bot_response=bot_response,
+                nombre=" ".join(filter(None, [session.first_name, session.last_name]))
+            ))
             logger.info(f"Interacción registrada - Usuario: {session.user_id}, Mensajes: {session.message_count}")
         except Exception as e:
             logger.error(f"Error registrando interacción: {str(e)}")
@@ -194,7 +208,8 @@ class TelegramController:
                 inactive_sessions.append(session_key)
         
         for session_key in inactive_sessions:
-            del self.active_sessions[session_key]
+            session = self.active_sessions.pop(session_key)
+            await chat_history.evict(self._chat_key(session))
             
         if inactive_sessions:
             logger.info(f"Limpiadas {len(inactive_sessions)} sesiones inactivas")
\ No newline at end of file
@@ -1,9 +1,21 @@
+import asyncio
+import logging
+import ssl
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Deque, Dict, Iterator, Optional, Tuple
+
 import pymysql
 import aiomysql
 from app.config import settings
 
-def get_sync_connection():
-    """Get synchronous database connection"""
+logger = logging.getLogger(__name__)
+
+
+def _sync_connection_params() -> dict:
+    """Build pymysql connection parameters from settings"""
     connection_params = {
         'host': settings.DB_HOST,
         'port': settings.DB_PORT,
@@ -13,7 +25,7 @@ def get_sync_connection():
         'charset': 'utf8mb4',
         'cursorclass': pymysql.cursors.DictCursor
     }
-    
+
     # Only add SSL parameters if SSL CA is provided
     if settings.DB_SSL_CA:
         connection_params.update({
@@ -21,11 +33,260 @@ def get_sync_connection():
             'ssl_verify_identity': True,
             'ssl_ca': settings.DB_SSL_CA
         })
-    
-    return pymysql.connect(**connection_params)
+
+    return connection_params
+
+def get_sync_connection():
+    """Get a new, unpooled synchronous database connection"""
+    return pymysql.connect(**_sync_connection_params())
+
+
+class PoolTimeoutError(pymysql.err.OperationalError):
+    """Raised when no pooled connection becomes available within the timeout"""
+
+
+class ConnectionPool:
+    """
+    Bounded, thread-safe pool of pymysql connections.
+
+    Idle connections are reused LIFO so the hottest connections stay warm,
+    checked with a ping before being handed out and retired once they exceed
+    their maximum lifetime. Borrowers block up to ``timeout`` seconds when
+    ``max_size`` connections are already in use.
+    """
+
+    def __init__(self, min_size: int = 1, max_size: int = 10, max_lifetime: float = 1800.0,
+                 timeout: float = 10.0, ping_interval: float = 0.0):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError("Invalid pool size: require 0 <= min_size <= max_size and max_size >= 1")
+
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_lifetime = max_lifetime
+        self.timeout = timeout
+        self.ping_interval = ping_interval
+
+        # Idle entries are (connection, created_at, last_used_at)
+        self._idle: Deque[Tuple[pymysql.connections.Connection, float, float]] = deque()
+        self._created_at: Dict[int, float] = {}
+        self._size = 0
+        self._closed = False
+        self._condition = threading.Condition()
+
+        # Statistics
+        self._borrows = 0
+        self._waits = 0
+        self._timeouts = 0
+        self._wait_time = 0.0
+        self._max_wait_time = 0.0
+        self._connections_created = 0
+        self._connections_discarded = 0
+
+    def _open_connection(self) -> pymysql.connections.Connection:
+        connection = get_sync_connection()
+        with self._condition:
+            self._created_at[id(connection)] = time.monotonic()
+            self._connections_created += 1
+        return connection
+
+    def _discard(self, connection: pymysql.connections.Connection) -> None:
+        """Close a connection and free its slot in the pool"""
+        try:
+            connection.close()
+        except Exception:
+            pass
+        with self._condition:
+            self._created_at.pop(id(connection), None)
+            self._size -= 1
+            self._connections_discarded += 1
+            self._condition.notify()
+
+    def _is_expired(self, created_at: float, now: float) -> bool:
+        return self.max_lifetime > 0 and now - created_at >= self.max_lifetime
+
+    def warm_up(self) -> None:
+        """Open connections until the pool holds at least ``min_size``"""
+        while True:
+            with self._condition:
+                if self._closed or self._size >= self.min_size:
+                    return
+                self._size += 1
+            try:
+                connection = self._open_connection()
+            except Exception:
+                with self._condition:
+                    self._size -= 1
+                    self._condition.notify()
+                raise
+            with self._condition:
+                now = time.monotonic()
+                self._idle.append((connection, now, now))
+                self._condition.notify()
+
+    def acquire(self) -> pymysql.connections.Connection:
+        """Borrow a healthy connection, opening one if below ``max_size``"""
+        start = time.monotonic()
+        deadline = start + self.timeout
+        waited = False
+
+        while True:
+            connection = None
+            with self._condition:
+                while True:
+                    if self._closed:
+                        raise pymysql.err.InterfaceError("Connection pool is closed")
+                    if self._idle:
+                        connection, created_at, last_used = self._idle.pop()
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise PoolTimeoutError(
+                            f"Timed out after {self.timeout}s waiting for a database connection"
+                        )
+                    waited = True
+                    self._condition.wait(remaining)
+
+            if connection is None:
+                try:
+                    connection = self._open_connection()
+                except Exception:
+                    with self._condition:
+                        self._size -= 1
+                        self._condition.notify()
+                    raise
+                break
+
+            now = time.monotonic()
+            if self._is_expired(created_at, now):
+                self._discard(connection)
+                continue
+            if now - last_used >= self.ping_interval:
+                try:
+                    connection.ping(reconnect=False)
+                except Exception:
+                    logger.warning("Discarding pooled connection that failed health check")
+                    self._discard(connection)
+                    continue
+            break
+
+        wait_time = time.monotonic() - start
+        with self._condition:
+            self._borrows += 1
+            self._wait_time += wait_time
+            self._max_wait_time = max(self._max_wait_time, wait_time)
+            if waited:
+                self._waits += 1
+        return connection
+
+    def release(self, connection: pymysql.connections.Connection, discard: bool = False) -> None:
+        """Return a borrowed connection to the pool"""
+        if not discard:
+            try:
+                # End any implicit transaction so the next borrower gets a fresh snapshot
+                connection.rollback()
+            except Exception:
+                discard = True
+
+        with self._condition:
+            created_at = self._created_at.get(id(connection))
+            now = time.monotonic()
+            if not discard and not self._closed and created_at is not None \
+                    and not self._is_expired(created_at, now):
+                self._idle.append((connection, created_at, now))
+                self._condition.notify()
+                return
+
+        self._discard(connection)
+
+    def close(self) -> None:
+        """Close idle connections and refuse new borrows"""
+        with self._condition:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._condition.notify_all()
+
+        for connection, _, _ in idle:
+            self._discard(connection)
+
+    def stats(self) -> dict:
+        """Get pool statistics"""
+        with self._condition:
+            idle = len(self._idle)
+            return {
+                'min_size': self.min_size,
+                'max_size': self.max_size,
+                'size': self._size,
+                'idle': idle,
+                'borrowed': self._size - idle,
+                'total_borrows': self._borrows,
+                'waits': self._waits,
+                'timeouts': self._timeouts,
+                'avg_wait_ms': round(self._wait_time / self._borrows * 1000, 3) if self._borrows else 0.0,
+                'max_wait_ms': round(self._max_wait_time * 1000, 3),
+                'connections_created': self._connections_created,
+                'connections_discarded': self._connections_discarded,
+                'closed': self._closed
+            }
+
+
+_pool: Optional[ConnectionPool] = None
+_pool_lock = threading.Lock()
+
+def get_pool() -> ConnectionPool:
+    """Get the process-wide synchronous connection pool"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(
+                    min_size=settings.DB_POOL_MIN_SIZE,
+                    max_size=settings.DB_POOL_MAX_SIZE,
+                    max_lifetime=settings.DB_POOL_MAX_LIFETIME,
+                    timeout=settings.DB_POOL_TIMEOUT,
+                    ping_interval=settings.DB_POOL_PING_INTERVAL
+                )
+    return _pool
+
+def close_pool() -> None:
+    """Close the synchronous connection pool if it was created"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+@contextmanager
+def get_pooled_connection() -> Iterator[pymysql.connections.Connection]:
+    """
+    Borrow a connection from the pool for the duration of a ``with`` block.
+
+    Uncommitted work is rolled back on release; connections that raised a
+    connection-level error are discarded instead of being reused.
+    """
+    pool = get_pool()
+    connection = pool.acquire()
+    broken = False
+    try:
+        yield connection
+    except (pymysql.err.OperationalError, pymysql.err.InterfaceError):
+        broken = True
+        raise
+    finally:
+        pool.release(connection, discard=broken)
+
+def _async_ssl_context() -> Optional[ssl.SSLContext]:
+    """Build the SSL context for aiomysql when a CA is configured"""
+    if not settings.DB_SSL_CA:
+        return None
+    return ssl.create_default_context(cafile=settings.DB_SSL_CA)
 
 async def get_async_connection():
-    """Get asynchronous database connection"""
+    """Get a new, unpooled asynchronous database connection"""
     return await aiomysql.connect(
         host=settings.DB_HOST,
         port=settings.DB_PORT,
@@ -33,5 +294,85 @@ async def get_async_connection():
         password=settings.DB_PASSWORD,
         db=settings.DB_NAME,
         charset='utf8mb4',
-        cursorclass=aiomysql.DictCursor
+        cursorclass=aiomysql.DictCursor,
+        ssl=_async_ssl_context()
     )
+
+
+_async_pool: Optional[aiomysql.Pool] = None
+_async_pool_lock: Optional[asyncio.Lock] = None
+
+async def init_async_pool() -> aiomysql.Pool:
+    """
+    Create the process-wide aiomysql pool (idempotent).
+
+    Pooled connections run in autocommit mode so plain reads never leave a
+    transaction open; multi-statement writes use ``async_transaction()``.
+    """
+    global _async_pool, _async_pool_lock
+    if _async_pool is not None:
+        return _async_pool
+
+    if _async_pool_lock is None:
+        _async_pool_lock = asyncio.Lock()
+
+    async with _async_pool_lock:
+        if _async_pool is None:
+            _async_pool = await aiomysql.create_pool(
+                minsize=settings.DB_ASYNC_POOL_MIN_SIZE,
+                maxsize=settings.DB_ASYNC_POOL_MAX_SIZE,
+                pool_recycle=int(settings.DB_POOL_MAX_LIFETIME),
+                host=settings.DB_HOST,
+                port=settings.DB_PORT,
+                user=settings.DB_USER,
+                password=settings.DB_PASSWORD,
+                db=settings.DB_NAME,
+                charset='utf8mb4',
+                cursorclass=aiomysql.DictCursor,
+                autocommit=True,
+                ssl=_async_ssl_context()
+            )
+            logger.info("Async database pool created")
+    return _async_pool
+
+async def close_async_pool() -> None:
+    """Close the aiomysql pool and wait for its connections to be released"""
+    global _async_pool
+    if _async_pool is not None:
+        pool = _async_pool
+        _async_pool = None
+        pool.close()
+        await pool.wait_closed()
+
+def get_async_pool_stats() -> dict:
+    """Get aiomysql pool statistics"""
+    if _async_pool is None:
+        return {'initialized': False}
+    return {
+        'initialized': True,
+        'min_size': _async_pool.minsize,
+        'max_size': _async_pool.maxsize,
+        'size': _async_pool.size,
+        'idle': _async_pool.freesize,
+        'borrowed': _async_pool.size - _async_pool.freesize
+    }
+
+@asynccontextmanager
+async def get_async_pooled_connection() -> AsyncIterator[aiomysql.Connection]:
+    """Borrow an autocommit connection from the async pool"""
+    pool = await init_async_pool()
+    async with pool.acquire() as connection:
+        yield connection
+
+@asynccontextmanager
+async def async_transaction() -> AsyncIterator[aiomysql.Connection]:
+    """Borrow an async connection and run the block inside one transaction"""
+    async with get_async_pooled_connection() as connection:
+        await connection.begin()
+        try:
+            yield connection
+        except BaseException:
+            await connection.rollback()
+            raise
+        else:
+            await connection.commit()
@@ -0,0 +1,17 @@
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
+
+class BulkItemResult(BaseModel):
+    index: int = Field(description="Position of the item in the request (line number for NDJSON uploads)")
+    id: Optional[int] = Field(None, description="Row id for updates and deletes; not reported for created rows")
+    status: Literal['created', 'updated', 'deleted', 'not_found', 'error']
+    error: Optional[str] = None
+
+class BulkResponse(BaseModel):
+    status: Literal['success', 'partial', 'error']
+    total: int
+    succeeded: int
+    failed: int
+    elapsed_ms: float
+    rows_per_second: float
+    results: List[BulkItemResult]
@@ -13,6 +13,9 @@ class CategoriaUpdate(BaseModel):
     nombre: Optional[str] = None
     descripcion: Optional[str] = None
 
+class CategoriaBulkUpdate(CategoriaUpdate):
+    id: int
+
 class CategoriaResponse(CategoriaBase):
     id: int
     fechaCreacion: datetime
@@ -12,6 +12,11 @@ class SyncRequest(BaseModel):
         default=None,
         description="Specific data sources to sync (productos, categorias, promociones)"
     )
+    workers: Optional[int] = Field(
+        default=None,
+        ge=1,
+        description="Encoder processes for a forced full re-index (default: EMBEDDING_REINDEX_WORKERS)"
+    )
 
 class SyncResponse(BaseModel):
     """Response model for synchronization operations"""
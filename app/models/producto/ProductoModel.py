@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 from decimal import Decimal
 
@@ -24,6 +24,9 @@ class ProductoUpdate(BaseModel):
     precio: Optional[Decimal] = Field(None, ge=0)
     stock: Optional[int] = Field(None, ge=0)
 
+class ProductoBulkUpdate(ProductoUpdate):
+    id: int
+
 class ProductoResponse(ProductoBase):
     id: int
     fechaCreacion: datetime
@@ -31,3 +34,22 @@ class ProductoResponse(ProductoBase):
     
     class Config:
         from_attributes = True
+
+class ProductoSearch(BaseModel):
+    q: Optional[str] = None
+    categoriaId: Optional[int] = None
+    talla: Optional[str] = None
+    color: Optional[str] = None
+    precioMin: Optional[Decimal] = Field(None, ge=0)
+    precioMax: Optional[Decimal] = Field(None, ge=0)
+    descending: bool = False
+
+class FacetCount(BaseModel):
+    value: str
+    count: int
+
+class ProductoFacets(BaseModel):
+    categoria: List[FacetCount] = []
+    talla: List[FacetCount] = []
+    color: List[FacetCount] = []
+    precio: List[FacetCount] = []
@@ -18,6 +18,9 @@ class PromocionUpdate(BaseModel):
     fechaInicio: Optional[date] = None
     fechaFin: Optional[date] = None
 
+class PromocionBulkUpdate(PromocionUpdate):
+    id: int
+
 class PromocionResponse(PromocionBase):
     id: int
     
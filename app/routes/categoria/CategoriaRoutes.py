@@ -1,7 +1,14 @@
-from fastapi import APIRouter, HTTPException, status
-from typing import List
+from fastapi import APIRouter, HTTPException, status, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
+from app.services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.services.serialization import FastJSONResponse
+from app.services.conditional import is_not_modified, model_version, not_modified_response, validator_headers
 from app.controllers.categoria.CategoriaController import CategoriaController
-from app.models.categoria.CategoriaModel import CategoriaCreate, CategoriaUpdate, CategoriaResponse
+from app.models.categoria.CategoriaModel import CategoriaCreate, CategoriaUpdate, CategoriaBulkUpdate, CategoriaResponse
+from app.models.bulk.BulkModel import BulkResponse
+from app.services.bulk import parse_ndjson, merge_parse_errors
 
 router = APIRouter(prefix="/categorias", tags=["categorias"])
 
@@ -13,18 +20,83 @@ def create_categoria(categoria: CategoriaCreate):
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
+# Bulk routes are declared before "/{categoria_id}" so "bulk" is not parsed as an id
+
+@router.post("/bulk", response_model=BulkResponse)
+def bulk_create_categorias(categorias: List[CategoriaCreate], atomic: bool = Query(False, description="Apply every item in a single transaction")):
+    """Create many categorias in chunked transactions"""
+    return CategoriaController.bulk_create_categorias(categorias, atomic=atomic)
+
+@router.post("/bulk/upload", response_model=BulkResponse)
+async def bulk_upload_categorias(request: Request, atomic: bool = Query(False, description="Apply every item in a single transaction")):
+    """Create categorias from an NDJSON body, one CategoriaCreate per line"""
+    categorias, positions, errors = parse_ndjson(await request.body(), CategoriaCreate)
+    result = await run_in_threadpool(CategoriaController.bulk_create_categorias, categorias, atomic)
+    return merge_parse_errors(result, positions, errors)
+
+@router.put("/bulk", response_model=BulkResponse)
+def bulk_update_categorias(categorias: List[CategoriaBulkUpdate], atomic: bool = Query(False, description="Apply every item in a single transaction")):
+    """Update many categorias in chunked transactions"""
+    return CategoriaController.bulk_update_categorias(categorias, atomic=atomic)
+
+@router.put("/bulk/upload", response_model=BulkResponse)
+async def bulk_upload_update_categorias(request: Request, atomic: bool = Query(False, description="Apply every item in a single transaction")):
+    """Update categorias from an NDJSON body, one CategoriaBulkUpdate per line"""
+    categorias, positions, errors = parse_ndjson(await request.body(), CategoriaBulkUpdate)
+    result = await run_in_threadpool(CategoriaController.bulk_update_categorias, categorias, atomic)
+    return merge_parse_errors(result, positions, errors)
+
+@router.post("/bulk/delete", response_model=BulkResponse)
+def bulk_delete_categorias(categoria_ids: List[int], atomic: bool = Query(False, description="Apply every item in a single transaction")):
+    """Delete many categorias by ID in chunked transactions"""
+    return CategoriaController.bulk_delete_categorias(categoria_ids, atomic=atomic)
+
+@router.post("/bulk/delete/upload", response_model=BulkResponse)
+async def bulk_upload_delete_categorias(request: Request, atomic: bool = Query(False, description="Apply every item in a single transaction")):
+    """Delete categorias from an NDJSON body, one ID per line"""
+    categoria_ids, positions, errors = parse_ndjson(await request.body(), int)
+    result = await run_in_threadpool(CategoriaController.bulk_delete_categorias, categoria_ids, atomic)
+    return merge_parse_errors(result, positions, errors)
+
 @router.get("/", response_model=List[CategoriaResponse])
-def get_all_categorias():
+def get_all_categorias(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Page size; enables keyset pagination"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor header value from the previous page"),
+    stream: bool = Query(False, description="Stream every row as NDJSON instead of a JSON array")
+):
     """Get all categorias"""
-    return CategoriaController.get_all_categorias()
+    if stream:
+        return StreamingResponse(CategoriaController.stream_categorias(), media_type="application/x-ndjson")
+    
+    version = CategoriaController.get_catalog_version()
+    if is_not_modified(request, version):
+        return not_modified_response(version)
+    headers = validator_headers(version)
+    
+    if limit is None and cursor is None:
+        return FastJSONResponse(CategoriaController.get_all_categorias(), headers=headers)
+    
+    try:
+        categorias, next_cursor = CategoriaController.get_categorias_page(limit or DEFAULT_PAGE_SIZE, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    return FastJSONResponse(categorias, headers=headers)
 
 @router.get("/{categoria_id}", response_model=CategoriaResponse)
-def get_categoria(categoria_id: int):
+def get_categoria(categoria_id: int, request: Request):
     """Get categoria by ID"""
     categoria = CategoriaController.get_categoria_by_id(categoria_id)
     if not categoria:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Categoria not found")
-    return categoria
+    
+    version = model_version(categoria)
+    if is_not_modified(request, version):
+        return not_modified_response(version)
+    return FastJSONResponse(categoria, headers=validator_headers(version))
 
 @router.put("/{categoria_id}", response_model=CategoriaResponse)
 def update_categoria(categoria_id: int, categoria: CategoriaUpdate):
@@ -1,5 +1,8 @@
-from fastapi import APIRouter, HTTPException, status
-from typing import List
+from fastapi import APIRouter, HTTPException, status, Query
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
+from app.services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.services.serialization import FastJSONResponse
 from app.controllers.chat.ChatController import ChatController
 from app.models.chat.ChatModel import ChatCreate, ChatUpdate, ChatResponse
 from app.models.ingest.IngestModel import ChatMessageRequest, ChatMessageResponse
@@ -49,9 +52,25 @@ def create_chat(chat: ChatCreate):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 @admin_router.get("/", response_model=List[ChatResponse])
-def get_all_chats():
+def get_all_chats(
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Page size; enables keyset pagination"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor header value from the previous page"),
+    stream: bool = Query(False, description="Stream every row as NDJSON instead of a JSON array")
+):
     """Get all chats"""
-    return ChatController.get_all_chats()
+    if stream:
+        return StreamingResponse(ChatController.stream_chats(), media_type="application/x-ndjson")
+    
+    if limit is None and cursor is None:
+        return FastJSONResponse(ChatController.get_all_chats())
+    
+    try:
+        chats, next_cursor = ChatController.get_chats_page(limit or DEFAULT_PAGE_SIZE, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    return FastJSONResponse(chats, headers=headers)
 
 @admin_router.get("/{chat_id}", response_model=ChatResponse)
 def get_chat(chat_id: int):
@@ -62,9 +81,26 @@ def get_chat(chat_id: int):
     return chat
 
 @admin_router.get("/usuario/{usuario_id}", response_model=List[ChatResponse])
-def get_chats_by_usuario(usuario_id: int):
+def get_chats_by_usuario(
+    usuario_id: int,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Page size; enables keyset pagination"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor header value from the previous page"),
+    stream: bool = Query(False, description="Stream every row as NDJSON instead of a JSON array")
+):
     """Get chats by usuario"""
-    return ChatController.get_chats_by_usuario(usuario_id)
+    if stream:
+        return StreamingResponse(ChatController.stream_chats(usuario_id=usuario_id), media_type="application/x-ndjson")
+    
+    if limit is None and cursor is None:
+        return FastJSONResponse(ChatController.get_chats_by_usuario(usuario_id))
+    
+    try:
+        chats, next_cursor = ChatController.get_chats_page(limit or DEFAULT_PAGE_SIZE, cursor, usuario_id=usuario_id)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    return FastJSONResponse(chats, headers=headers)
 
 @router.put("/{chat_id}", response_model=ChatResponse)
 def update_chat(chat_id: int, chat: ChatUpdate):
@@ -13,12 +13,14 @@ async def sync_all_data(request: SyncRequest):
     """
     Perform complete data synchronization from MySQL to Qdrant
     
-    - **force_full_sync**: Force complete resync even if data exists
+    - **force_full_sync**: Force complete resync even if data exists (re-encodes everything in worker processes)
     - **sources**: Specific data sources to sync (optional)
+    - **workers**: Encoder processes for the forced re-index (optional)
     """
     try:
         result = await ingest_controller.sync_all_data(
-            force_full_sync=request.force_full_sync
+            force_full_sync=request.force_full_sync,
+            workers=request.workers
         )
         
         if result["status"] == "error":
@@ -1,7 +1,15 @@
-from fastapi import APIRouter, HTTPException, status
-from typing import List
+from fastapi import APIRouter, HTTPException, status, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from typing import Dict, List, Literal, Optional
+from decimal import Decimal
+from app.services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.services.serialization import FastJSONResponse
+from app.services.conditional import content_version, is_not_modified, model_version, not_modified_response, validator_headers
 from app.controllers.producto.ProductoController import ProductoController
-from app.models.producto.ProductoModel import ProductoCreate, ProductoUpdate, ProductoResponse
+from app.models.producto.ProductoModel import ProductoCreate, ProductoUpdate, ProductoBulkUpdate, ProductoResponse, ProductoSearch, ProductoFacets
+from app.models.bulk.BulkModel import BulkResponse
+from app.services.bulk import parse_ndjson, merge_parse_errors
 
 router = APIRouter(prefix="/productos", tags=["productos"])
 
@@ -13,23 +21,163 @@ def create_producto(producto: ProductoCreate):
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
+# Bulk routes are declared before "/{producto_id}" so "bulk" is not parsed as an id
+
+@router.post("/bulk", response_model=BulkResponse)
+def bulk_create_productos(productos: List[ProductoCreate], atomic: bool = Query(False, description="Apply every item in a single transaction")):
+    """Create many productos in chunked transactions"""
+    return ProductoController.bulk_create_productos(productos, atomic=atomic)
+
+@router.post("/bulk/upload", response_model=BulkResponse)
+async def bulk_upload_productos(request: Request, atomic: bool = Query(False, description="Apply every item in a single transaction")):
+    """Create productos from an NDJSON body, one ProductoCreate per line"""
+    productos, positions, errors = parse_ndjson(await request.body(), ProductoCreate)
+    result = await run_in_threadpool(ProductoController.bulk_create_productos, productos, atomic)
+    return merge_parse_errors(result, positions, errors)
+
+@router.put("/bulk", response_model=BulkResponse)
+def bulk_update_productos(productos: List[ProductoBulkUpdate], atomic: bool = Query(False, description="Apply every item in a single transaction")):
+    """Update many productos in chunked transactions"""
+    return ProductoController.bulk_update_productos(productos, atomic=atomic)
+
+@router.put("/bulk/upload", response_model=BulkResponse)
+async def bulk_upload_update_productos(request: Request, atomic: bool = Query(False, description="Apply every item in a single transaction")):
+    """Update productos from an NDJSON body, one ProductoBulkUpdate per line"""
+    productos, positions, errors = parse_ndjson(await request.body(), ProductoBulkUpdate)
+    result = await run_in_threadpool(ProductoController.bulk_update_productos, productos, atomic)
+    return merge_parse_errors(result, positions, errors)
+
+@router.post("/bulk/delete", response_model=BulkResponse)
+def bulk_delete_productos(producto_ids: List[int], atomic: bool = Query(False, description="Apply every item in a single transaction")):
+    """Delete many productos by ID in chunked transactions"""
+    return ProductoController.bulk_delete_productos(producto_ids, atomic=atomic)
+
+@router.post("/bulk/delete/upload", response_model=BulkResponse)
+async def bulk_upload_delete_productos(request: Request, atomic: bool = Query(False, description="Apply every item in a single transaction")):
+    """Delete productos from an NDJSON body, one ID per line"""
+    producto_ids, positions, errors = parse_ndjson(await request.body(), int)
+    result = await run_in_threadpool(ProductoController.bulk_delete_productos, producto_ids, atomic)
+    return merge_parse_errors(result, positions, errors)
+
 @router.get("/", response_model=List[ProductoResponse])
-def get_all_productos():
+def get_all_productos(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Page size; enables keyset pagination"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor header value from the previous page"),
+    stream: bool = Query(False, description="Stream every row as NDJSON instead of a JSON array")
+):
     """Get all productos"""
-    return ProductoController.get_all_productos()
+    if stream:
+        return StreamingResponse(ProductoController.stream_productos(), media_type="application/x-ndjson")
+    
+    version = ProductoController.get_catalog_version()
+    if is_not_modified(request, version):
+        return not_modified_response(version)
+    headers = validator_headers(version)
+    
+    if limit is None and cursor is None:
+        return FastJSONResponse(ProductoController.get_all_productos(), headers=headers)
+    
+    try:
+        productos, next_cursor = ProductoController.get_productos_page(limit or DEFAULT_PAGE_SIZE, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    return FastJSONResponse(productos, headers=headers)
+
+@router.get("/search", response_model=List[ProductoResponse])
+def search_productos(
+    request: Request,
+    q: Optional[str] = Query(None, max_length=200, description="Words to match in nombre/descripcion"),
+    categoria_id: Optional[int] = Query(None),
+    talla: Optional[str] = Query(None),
+    color: Optional[str] = Query(None),
+    precio_min: Optional[Decimal] = Query(None, ge=0),
+    precio_max: Optional[Decimal] = Query(None, ge=0),
+    order: Literal["asc", "desc"] = Query("asc", description="Order by precio"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor header value from the previous page")
+):
+    """Search productos by text, categoria, talla, color and precio range"""
+    if precio_min is not None and precio_max is not None and precio_min > precio_max:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="precio_min must not exceed precio_max")
+    
+    # Results only change when some producto does, so the listing version applies
+    version = ProductoController.get_catalog_version()
+    if is_not_modified(request, version):
+        return not_modified_response(version)
+    headers = validator_headers(version)
+    
+    filters = ProductoSearch(
+        q=q, categoriaId=categoria_id, talla=talla, color=color,
+        precioMin=precio_min, precioMax=precio_max, descending=order == "desc"
+    )
+    try:
+        productos, next_cursor = ProductoController.search_productos(filters, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    return FastJSONResponse(productos, headers=headers)
+
+@router.get("/facets", response_model=ProductoFacets)
+def get_producto_facets(request: Request):
+    """Get producto counts per categoria, talla, color and precio bucket"""
+    # Versioned by the counters themselves so a rebuild that corrects them is seen
+    facets = ProductoController.get_facets()
+    version = content_version("producto_facet", facets)
+    if is_not_modified(request, version):
+        return not_modified_response(version)
+    return FastJSONResponse(facets, headers=validator_headers(version))
+
+@router.post("/facets/rebuild", response_model=Dict[str, int])
+def rebuild_producto_facets():
+    """Recount the facet counters from the producto table"""
+    return ProductoController.rebuild_facets()
 
 @router.get("/{producto_id}", response_model=ProductoResponse)
-def get_producto(producto_id: int):
+def get_producto(producto_id: int, request: Request):
     """Get producto by ID"""
     producto = ProductoController.get_producto_by_id(producto_id)
     if not producto:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Producto not found")
-    return producto
+    
+    version = model_version(producto)
+    if is_not_modified(request, version):
+        return not_modified_response(version)
+    return FastJSONResponse(producto, headers=validator_headers(version))
 
 @router.get("/categoria/{categoria_id}", response_model=List[ProductoResponse])
-def get_productos_by_categoria(categoria_id: int):
+def get_productos_by_categoria(
+    categoria_id: int,
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Page size; enables keyset pagination"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor header value from the previous page"),
+    stream: bool = Query(False, description="Stream every row as NDJSON instead of a JSON array")
+):
     """Get productos by categoria"""
-    return ProductoController.get_productos_by_categoria(categoria_id)
+    if stream:
+        return StreamingResponse(ProductoController.stream_productos(categoria_id=categoria_id), media_type="application/x-ndjson")
+    
+    version = ProductoController.get_catalog_version(categoria_id)
+    if is_not_modified(request, version):
+        return not_modified_response(version)
+    headers = validator_headers(version)
+    
+    if limit is None and cursor is None:
+        return FastJSONResponse(ProductoController.get_productos_by_categoria(categoria_id), headers=headers)
+    
+    try:
+        productos, next_cursor = ProductoController.get_productos_page(limit or DEFAULT_PAGE_SIZE, cursor, categoria_id=categoria_id)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    return FastJSONResponse(productos, headers=headers)
 
 @router.put("/{producto_id}", response_model=ProductoResponse)
 def update_producto(producto_id: int, producto: ProductoUpdate):
@@ -1,7 +1,13 @@
-from fastapi import APIRouter, HTTPException, status
-from typing import List
+from fastapi import APIRouter, HTTPException, status, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
+from app.services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.services.serialization import FastJSONResponse
 from app.controllers.promocion.PromocionController import PromocionController
-from app.models.promocion.PromocionModel import PromocionCreate, PromocionUpdate, PromocionResponse
+from app.models.promocion.PromocionModel import PromocionCreate, PromocionUpdate, PromocionBulkUpdate, PromocionResponse
+from app.models.bulk.BulkModel import BulkResponse
+from app.services.bulk import parse_ndjson, merge_parse_errors
 
 router = APIRouter(prefix="/promociones", tags=["promociones"])
 
@@ -13,10 +19,64 @@ def create_promocion(promocion: PromocionCreate):
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
+# Bulk routes are declared before "/{promocion_id}" so "bulk" is not parsed as an id
+
+@router.post("/bulk", response_model=BulkResponse)
+def bulk_create_promociones(promociones: List[PromocionCreate], atomic: bool = Query(False, description="Apply every item in a single transaction")):
+    """Create many promociones in chunked transactions"""
+    return PromocionController.bulk_create_promociones(promociones, atomic=atomic)
+
+@router.post("/bulk/upload", response_model=BulkResponse)
+async def bulk_upload_promociones(request: Request, atomic: bool = Query(False, description="Apply every item in a single transaction")):
+    """Create promociones from an NDJSON body, one PromocionCreate per line"""
+    promociones, positions, errors = parse_ndjson(await request.body(), PromocionCreate)
+    result = await run_in_threadpool(PromocionController.bulk_create_promociones, promociones, atomic)
+    return merge_parse_errors(result, positions, errors)
+
+@router.put("/bulk", response_model=BulkResponse)
+def bulk_update_promociones(promociones: List[PromocionBulkUpdate], atomic: bool = Query(False, description="Apply every item in a single transaction")):
+    """Update many promociones in chunked transactions"""
+    return PromocionController.bulk_update_promociones(promociones, atomic=atomic)
+
+@router.put("/bulk/upload", response_model=BulkResponse)
+async def bulk_upload_update_promociones(request: Request, atomic: bool = Query(False, description="Apply every item in a single transaction")):
+    """Update promociones from an NDJSON body, one PromocionBulkUpdate per line"""
+    promociones, positions, errors = parse_ndjson(await request.body(), PromocionBulkUpdate)
+    result = await run_in_threadpool(PromocionController.bulk_update_promociones, promociones, atomic)
+    return merge_parse_errors(result, positions, errors)
+
+@router.post("/bulk/delete", response_model=BulkResponse)
+def bulk_delete_promociones(promocion_ids: List[int], atomic: bool = Query(False, description="Apply every item in a single transaction")):
+    """Delete many promociones by ID in chunked transactions"""
+    return PromocionController.bulk_delete_promociones(promocion_ids, atomic=atomic)
+
+@router.post("/bulk/delete/upload", response_model=BulkResponse)
+async def bulk_upload_delete_promociones(request: Request, atomic: bool = Query(False, description="Apply every item in a single transaction")):
+    """Delete promociones from an NDJSON body, one ID per line"""
+    promocion_ids, positions, errors = parse_ndjson(await request.body(), int)
+    result = await run_in_threadpool(PromocionController.bulk_delete_promociones, promocion_ids, atomic)
+    return merge_parse_errors(result, positions, errors)
+
 @router.get("/", response_model=List[PromocionResponse])
-def get_all_promociones():
+def get_all_promociones(
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Page size; enables keyset pagination"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor header value from the previous page"),
+    stream: bool = Query(False, description="Stream every row as NDJSON instead of a JSON array")
+):
     """Get all promociones"""
-    return PromocionController.get_all_promociones()
+    if stream:
+        return StreamingResponse(PromocionController.stream_promociones(), media_type="application/x-ndjson")
+    
+    if limit is None and cursor is None:
+        return FastJSONResponse(PromocionController.get_all_promociones())
+    
+    try:
+        promociones, next_cursor = PromocionController.get_promociones_page(limit or DEFAULT_PAGE_SIZE, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    return FastJSONResponse(promociones, headers=headers)
 
 @router.get("/{promocion_id}", response_model=PromocionResponse)
 def get_promocion(promocion_id: int):
@@ -1,5 +1,8 @@
-from fastapi import APIRouter, HTTPException, status
-from typing import List
+from fastapi import APIRouter, HTTPException, status, Query
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
+from app.services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.services.serialization import FastJSONResponse
 from app.controllers.usuario.UsuarioController import UsuarioController
 from app.models.usuario.UsuarioModel import UsuarioCreate, UsuarioUpdate, UsuarioResponse
 
@@ -14,9 +17,25 @@ def create_usuario(usuario: UsuarioCreate):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 @router.get("/", response_model=List[UsuarioResponse])
-def get_all_usuarios():
+def get_all_usuarios(
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Page size; enables keyset pagination"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor header value from the previous page"),
+    stream: bool = Query(False, description="Stream every row as NDJSON instead of a JSON array")
+):
     """Get all usuarios"""
-    return UsuarioController.get_all_usuarios()
+    if stream:
+        return StreamingResponse(UsuarioController.stream_usuarios(), media_type="application/x-ndjson")
+    
+    if limit is None and cursor is None:
+        return FastJSONResponse(UsuarioController.get_all_usuarios())
+    
+    try:
+        usuarios, next_cursor = UsuarioController.get_usuarios_page(limit or DEFAULT_PAGE_SIZE, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    return FastJSONResponse(usuarios, headers=headers)
 
 @router.get("/{usuario_id}", response_model=UsuarioResponse)
 def get_usuario(usuario_id: int):
@@ -0,0 +1,284 @@
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+import logging
+import time
+
+import pymysql
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from app.config import settings
+from app.database import get_pooled_connection
+
+logger = logging.getLogger(__name__)
+
+# pymysql splits executemany() INSERTs into several statements past
+# max_stmt_length; keep each chunk in one multi-row statement (one round trip)
+BULK_MAX_STATEMENT_BYTES = 16 * 1024 * 1024
+
+# (old row, new row) of one written item: None as old for an insert, None as new for a delete
+RowChange = Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]
+
+# Called with the chunk's cursor and changes inside the chunk's transaction,
+# e.g. to keep derived counters in step with the rows they count
+ChangeHook = Callable[[Any, List[RowChange]], None]
+
+
+def _chunks(items: Sequence[Any], size: int) -> Iterable[Tuple[int, Sequence[Any]]]:
+    for start in range(0, len(items), size):
+        yield start, items[start:start + size]
+
+def _error_result(index: int, error: Exception, item_id: Optional[int] = None) -> Dict:
+    return {"index": index, "id": item_id, "status": "error", "error": str(error)}
+
+
+def parse_ndjson(body: bytes, item_type: Any) -> Tuple[List[Any], List[int], List[Dict]]:
+    """
+    Parse an NDJSON upload, validating each line against ``item_type``
+
+    Returns:
+        Valid items, the line index of each valid item, and error results
+        for the lines that failed validation
+    """
+    adapter = TypeAdapter(item_type)
+    items, positions, errors = [], [], []
+    for index, line in enumerate(body.splitlines()):
+        if not line.strip():
+            continue
+        try:
+            items.append(adapter.validate_json(line))
+            positions.append(index)
+        except ValidationError as e:
+            errors.append(_error_result(index, e))
+    return items, positions, errors
+
+def merge_parse_errors(result: Dict, positions: List[int], errors: List[Dict]) -> Dict:
+    """Map result indexes back to NDJSON line numbers and merge parse errors"""
+    results = result["results"]
+    for item in results:
+        item["index"] = positions[item["index"]]
+    merged = sorted(results + errors, key=lambda item: item["index"])
+    return summarize(merged, result["elapsed_ms"] / 1000)
+
+def summarize(results: List[Dict], elapsed: float) -> Dict:
+    """Build the bulk response payload with throughput figures"""
+    failed = sum(1 for result in results if result["status"] in ("error", "not_found"))
+    return {
+        "status": "success" if failed == 0 else ("error" if failed == len(results) else "partial"),
+        "total": len(results),
+        "succeeded": len(results) - failed,
+        "failed": failed,
+        "elapsed_ms": round(elapsed * 1000, 2),
+        "rows_per_second": round(len(results) / elapsed, 2) if elapsed > 0 else 0.0,
+        "results": results
+    }
+
+
+def _run_chunks(chunks: List[Tuple[int, Sequence[Any]]], apply_chunk, apply_row, atomic: bool) -> List[Dict]:
+    """
+    Apply chunks on one pooled connection, one transaction per chunk
+
+    When a chunk fails it is rolled back and replayed row by row so that only
+    the offending items are reported as errors. With ``atomic`` everything
+    runs in a single transaction and any failure rolls the whole batch back.
+    """
+    results: List[Dict] = []
+    with get_pooled_connection() as connection:
+        with connection.cursor() as cursor:
+            cursor.max_stmt_length = BULK_MAX_STATEMENT_BYTES
+            for start, chunk in chunks:
+                try:
+                    results.extend(apply_chunk(cursor, start, chunk))
+                    if not atomic:
+                        connection.commit()
+                except pymysql.err.MySQLError as e:
+                    connection.rollback()
+                    if atomic:
+                        logger.warning(f"Atomic bulk operation rolled back: {str(e)}")
+                        total = sum(len(c) for _, c in chunks)
+                        return [_error_result(index, e) for index in range(total)]
+                    for offset, item in enumerate(chunk):
+                        try:
+                            results.append(apply_row(cursor, start + offset, item))
+                        except pymysql.err.MySQLError as row_error:
+                            results.append(_error_result(start + offset, row_error))
+                    connection.commit()
+            if atomic:
+                connection.commit()
+    return results
+
+def _lock_rows(cursor, table: str, ids: Sequence[int], columns: Sequence[str] = ()) -> Dict[int, Dict]:
+    """Rows among ``ids`` that exist (id plus ``columns``), locked until the chunk's transaction ends"""
+    placeholders = ", ".join(["%s"] * len(ids))
+    selected = ", ".join(["id", *columns])
+    cursor.execute(f"SELECT {selected} FROM {table} WHERE id IN ({placeholders}) FOR UPDATE", list(ids))
+    return {row["id"]: row for row in cursor.fetchall()}
+
+def _first_positions(ids: Sequence[int]) -> Dict[int, int]:
+    """Index of the first occurrence of each id in the request"""
+    first: Dict[int, int] = {}
+    for index, item_id in enumerate(ids):
+        first.setdefault(item_id, index)
+    return first
+
+def _duplicate_result(index: int, item_id: int, first: int) -> Dict:
+    return {"index": index, "id": item_id, "status": "error",
+            "error": f"Duplicate id {item_id}; already applied at index {first}"}
+
+
+def bulk_insert(table: str, items: List[BaseModel], chunk_size: Optional[int] = None,
+                atomic: bool = False, on_change: Optional[ChangeHook] = None) -> Dict:
+    """
+    Insert create models with executemany, chunk by chunk
+
+    ``on_change`` gets (None, fields) for every inserted item, after the
+    INSERT and in the same transaction.
+
+    Created rows are reported without ids: a multi-row INSERT does not get
+    a contiguous auto-increment block under innodb_autoinc_lock_mode=2 with
+    concurrent writers, nor on TiDB (per-node id caches), so lastrowid + n
+    would name the wrong rows.
+    """
+    if not items:
+        return summarize([], 0.0)
+
+    columns = list(type(items[0]).model_fields)
+    sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})"
+
+    def row_values(item: BaseModel) -> list:
+        return [getattr(item, column) for column in columns]
+
+    def apply_chunk(cursor, start, chunk):
+        cursor.executemany(sql, [row_values(item) for item in chunk])
+        if on_change:
+            on_change(cursor, [(None, item.model_dump()) for item in chunk])
+        return [
+            {"index": start + offset, "id": None, "status": "created", "error": None}
+            for offset in range(len(chunk))
+        ]
+
+    def apply_row(cursor, index, item):
+        cursor.execute(sql, row_values(item))
+        if on_change:
+            on_change(cursor, [(None, item.model_dump())])
+        # Same shape as the chunk path whichever path a row took
+        return {"index": index, "id": None, "status": "created", "error": None}
+
+    start_time = time.perf_counter()
+    results = _run_chunks(list(_chunks(items, chunk_size or settings.BULK_CHUNK_SIZE)), apply_chunk, apply_row, atomic)
+    return summarize(results, time.perf_counter() - start_time)
+
+def bulk_update(table: str, items: List[BaseModel], chunk_size: Optional[int] = None,
+                atomic: bool = False, on_change: Optional[ChangeHook] = None,
+                columns: Sequence[str] = ()) -> Dict:
+    """
+    Apply update models carrying an ``id`` field with executemany
+
+    Items are grouped by the set of non-null fields they change so each
+    group shares one UPDATE statement. An id repeated in the request is
+    applied once, at its first occurrence; the others are reported as errors.
+
+    ``on_change`` gets (old, new) for every updated row, after the UPDATEs
+    and in the same transaction; old holds the id and ``columns`` as read
+    (and locked) before the update, new is old with the changes applied.
+    """
+    if not items:
+        return summarize([], 0.0)
+
+    first = _first_positions([item.id for item in items])
+
+    def changes(item: BaseModel) -> Dict[str, Any]:
+        fields = item.model_dump(exclude_none=True)
+        fields.pop("id", None)
+        return fields
+
+    def apply_chunk(cursor, start, chunk):
+        existing = _lock_rows(cursor, table, [item.id for item in chunk], columns)
+        groups: Dict[Tuple[str, ...], List[list]] = {}
+        results, row_changes = [], []
+        for offset, item in enumerate(chunk):
+            fields = changes(item)
+            if first[item.id] != start + offset:
+                results.append(_duplicate_result(start + offset, item.id, first[item.id]))
+                continue
+            if item.id not in existing:
+                results.append({"index": start + offset, "id": item.id, "status": "not_found", "error": None})
+                continue
+            if fields:
+                groups.setdefault(tuple(fields), []).append([*fields.values(), item.id])
+                row_changes.append((existing[item.id], {**existing[item.id], **fields}))
+            results.append({"index": start + offset, "id": item.id, "status": "updated", "error": None})
+
+        for group, values in groups.items():
+            assignments = ", ".join(f"{column} = %s" for column in group)
+            cursor.executemany(f"UPDATE {table} SET {assignments} WHERE id = %s", values)
+        if on_change and row_changes:
+            on_change(cursor, row_changes)
+        return results
+
+    def apply_row(cursor, index, item):
+        if first[item.id] != index:
+            return _duplicate_result(index, item.id, first[item.id])
+        old_row = _lock_rows(cursor, table, [item.id], columns).get(item.id)
+        if old_row is None:
+            return {"index": index, "id": item.id, "status": "not_found", "error": None}
+        fields = changes(item)
+        if fields:
+            assignments = ", ".join(f"{column} = %s" for column in fields)
+            cursor.execute(f"UPDATE {table} SET {assignments} WHERE id = %s", [*fields.values(), item.id])
+            if on_change:
+                on_change(cursor, [(old_row, {**old_row, **fields})])
+        return {"index": index, "id": item.id, "status": "updated", "error": None}
+
+    start_time = time.perf_counter()
+    results = _run_chunks(list(_chunks(items, chunk_size or settings.BULK_CHUNK_SIZE)), apply_chunk, apply_row, atomic)
+    return summarize(results, time.perf_counter() - start_time)
+
+def bulk_delete(table: str, ids: List[int], chunk_size: Optional[int] = None,
+                atomic: bool = False, on_change: Optional[ChangeHook] = None,
+                columns: Sequence[str] = ()) -> Dict:
+    """
+    Delete rows by id with executemany, reporting ids that did not exist
+
+    An id repeated in the request is deleted once, at its first occurrence;
+    the others are reported as errors.
+
+    ``on_change`` gets (old, None) for every row about to be deleted, with
+    old holding the id and ``columns``. It runs in the same transaction but
+    before the DELETE, while rows a foreign key would cascade to can still
+    be read.
+    """
+    if not ids:
+        return summarize([], 0.0)
+
+    sql = f"DELETE FROM {table} WHERE id = %s"
+    first = _first_positions(ids)
+
+    def apply_chunk(cursor, start, chunk):
+        existing = _lock_rows(cursor, table, chunk, columns)
+        results, deleted = [], []
+        for offset, item_id in enumerate(chunk):
+            if first[item_id] != start + offset:
+                results.append(_duplicate_result(start + offset, item_id, first[item_id]))
+                continue
+            if item_id in existing:
+                deleted.append((item_id,))
+            results.append({"index": start + offset, "id": item_id,
+                            "status": "deleted" if item_id in existing else "not_found", "error": None})
+        if deleted:
+            if on_change:
+                on_change(cursor, [(existing[item_id], None) for item_id, in deleted])
+            cursor.executemany(sql, deleted)
+        return results
+
+    def apply_row(cursor, index, item_id):
+        if first[item_id] != index:
+            return _duplicate_result(index, item_id, first[item_id])
+        old_row = _lock_rows(cursor, table, [item_id], columns).get(item_id)
+        if old_row is None:
+            return {"index": index, "id": item_id, "status": "not_found", "error": None}
+        if on_change:
+            on_change(cursor, [(old_row, None)])
+        cursor.execute(sql, (item_id,))
+        return {"index": index, "id": item_id, "status": "deleted", "error": None}
+
+    start_time = time.perf_counter()
+    results = _run_chunks(list(_chunks(ids, chunk_size or settings.BULK_CHUNK_SIZE)), apply_chunk, apply_row, atomic)
+    return summarize(results, time.perf_counter() - start_time)
@@ -0,0 +1,270 @@
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+from collections import OrderedDict
+import logging
+import pickle
+import threading
+import time
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class MemoryCacheBackend:
+    """
+    In-process cache with per-entry TTL and LRU eviction
+
+    Like every backend it keeps a generation number, bumped by each delete,
+    so set() can refuse values loaded before an invalidation.
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.evictions = 0
+
+    def generation(self) -> int:
+        with self._lock:
+            return self._generation
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return _MISSING
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return _MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: float, generation: Optional[int] = None) -> None:
+        """Store ``value``; with ``generation``, only if nothing was deleted since it was read"""
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, keys: Iterable[str]) -> None:
+        with self._lock:
+            self._generation += 1
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def delete_prefix(self, prefix: str) -> None:
+        with self._lock:
+            self._generation += 1
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                del self._entries[key]
+
+    def info(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "backend": "memory",
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "evictions": self.evictions
+            }
+
+
+# SET only while the generation key still holds the value read before the load
+_SET_IF_GENERATION = """
+if (redis.call('GET', KEYS[1]) or '0') == ARGV[1] then
+    redis.call('SET', KEYS[2], ARGV[2], 'PX', ARGV[3])
+    return 1
+end
+return 0
+"""
+
+
+class RedisCacheBackend:
+    """
+    Redis-backed cache shared by every uvicorn worker (eviction via Redis maxmemory policy)
+
+    The generation lives in Redis too (INCR on every delete, compared in a
+    Lua script before SET), so a load racing with a write in another worker
+    cannot store the pre-write value for every worker.
+    """
+
+    def __init__(self, host: str, port: int, prefix: str = "sportbot:cache:"):
+        import redis
+
+        self.client = redis.Redis(host=host, port=port, socket_timeout=1.0, socket_connect_timeout=1.0)
+        self.prefix = prefix
+        self._generation_key = prefix + "__generation__"
+        self._set_if_generation = self.client.register_script(_SET_IF_GENERATION)
+
+    def generation(self) -> int:
+        return int(self.client.get(self._generation_key) or 0)
+
+    def get(self, key: str) -> Any:
+        raw = self.client.get(self.prefix + key)
+        return _MISSING if raw is None else pickle.loads(raw)
+
+    def set(self, key: str, value: Any, ttl: float, generation: Optional[int] = None) -> None:
+        """Store ``value``; with ``generation``, only if nothing was deleted since it was read"""
+        raw = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        px = max(1, int(ttl * 1000))
+        if generation is None:
+            self.client.set(self.prefix + key, raw, px=px)
+        else:
+            self._set_if_generation(keys=[self._generation_key, self.prefix + key], args=[generation, raw, px])
+
+    def delete(self, keys: Iterable[str]) -> None:
+        names = [self.prefix + key for key in keys]
+        # INCR before DEL: a SET that passed the check before the INCR is deleted after it
+        pipeline = self.client.pipeline(transaction=True)
+        pipeline.incr(self._generation_key)
+        if names:
+            pipeline.delete(*names)
+        pipeline.execute()
+
+    def delete_prefix(self, prefix: str) -> None:
+        # INCR before the scan, so every value stored with the old generation is seen by it
+        self.client.incr(self._generation_key)
+        names = list(self.client.scan_iter(match=f"{self.prefix}{prefix}*", count=500))
+        names = [name for name in names if name != self._generation_key.encode()]
+        if names:
+            self.client.delete(*names)
+
+    def info(self) -> Dict[str, Any]:
+        return {"backend": "redis", "entries": self.client.dbsize()}
+
+
+class _InFlight:
+    def __init__(self):
+        self.event = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class ReadThroughCache:
+    """
+    Read-through cache in front of the catalog controllers.
+
+    Concurrent misses for the same key are coalesced: one thread runs the
+    loader while the others wait for its result. Loads that race with an
+    invalidation (in any worker sharing the backend) return their value but
+    do not store it, so a write is never shadowed by the read that was in
+    flight when it happened.
+    """
+
+    def __init__(self, backend, default_ttl: float = 60.0, enabled: bool = True):
+        self.backend = backend
+        self.default_ttl = default_ttl
+        self.enabled = enabled
+        self._inflight: Dict[str, _InFlight] = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.invalidations = 0
+        self.errors = 0
+
+    def _backend_call(self, method: str, *args) -> Any:
+        try:
+            return getattr(self.backend, method)(*args)
+        except Exception as e:
+            # A cache outage must never fail the request; fall back to the database
+            with self._lock:
+                self.errors += 1
+            logger.warning(f"Cache backend error on {method}: {str(e)}")
+            return _MISSING
+
+    def get_or_load(self, key: str, loader: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        """Return the cached value for ``key`` or load, store and return it"""
+        if not self.enabled:
+            return loader()
+
+        value = self._backend_call("get", key)
+        if value is not _MISSING:
+            with self._lock:
+                self.hits += 1
+            return value
+
+        with self._lock:
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = self._inflight[key] = _InFlight()
+            self.misses += 1 if leader else 0
+            self.coalesced += 0 if leader else 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value
+
+        try:
+            # Read before loading; the backend refuses the value if a delete bumped it meanwhile
+            generation = self._backend_call("generation")
+            call.value = loader()
+            if generation is not _MISSING:
+                self._backend_call("set", key, call.value, ttl or self.default_ttl, generation)
+            return call.value
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            call.event.set()
+
+    def invalidate(self, *keys: str) -> None:
+        """Drop specific keys"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.invalidations += len(keys)
+        self._backend_call("delete", keys)
+
+    def invalidate_prefix(self, prefix: str) -> None:
+        """Drop every key starting with ``prefix`` (used by bulk writes)"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.invalidations += 1
+        self._backend_call("delete_prefix", prefix)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and backend information"""
+        lookups = self.hits + self.misses + self.coalesced
+        backend_info = self._backend_call("info")
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "errors": self.errors,
+            "default_ttl": self.default_ttl,
+            **(backend_info if isinstance(backend_info, dict) else {})
+        }
+
+
+def _create_backend():
+    if settings.CACHE_BACKEND == "redis":
+        try:
+            return RedisCacheBackend(settings.REDIS_HOST, settings.REDIS_PORT, settings.CACHE_REDIS_PREFIX)
+        except ImportError:
+            logger.warning("CACHE_BACKEND=redis but the redis package is not installed; using memory cache")
+    return MemoryCacheBackend(max_entries=settings.CACHE_MAX_ENTRIES)
+
+# Process-wide catalog cache
+catalog_cache = ReadThroughCache(
+    _create_backend(),
+    default_ttl=settings.CACHE_TTL_SECONDS,
+    enabled=settings.CACHE_BACKEND != "none"
+)
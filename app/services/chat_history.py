@@ -0,0 +1,222 @@
+from typing import Any, Dict, List, Optional, Tuple
+from collections import OrderedDict, deque
+import json
+import logging
+
+from app.config import settings
+from app.services.repository import fetch_all
+
+logger = logging.getLogger(__name__)
+
+# (role, content, approximate tokens)
+HistoryEntry = Tuple[str, str, int]
+
+_ROLES = {"usuario": "user", "bot": "assistant"}
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token) computed once per message"""
+    return len(text) // 4 + 1
+
+
+class MemoryHistoryBackend:
+    """Per-process ring buffers, LRU-bounded in the number of chats"""
+
+    def __init__(self, max_messages: int, max_chats: int = 10000):
+        self.max_messages = max_messages
+        self.max_chats = max_chats
+        self._chats: "OrderedDict[str, deque]" = OrderedDict()
+
+    async def get(self, chat_key: str) -> Optional[List[HistoryEntry]]:
+        buffer = self._chats.get(chat_key)
+        if buffer is None:
+            return None
+        self._chats.move_to_end(chat_key)
+        return list(buffer)
+
+    async def replace(self, chat_key: str, entries: List[HistoryEntry]) -> None:
+        self._chats[chat_key] = deque(entries, maxlen=self.max_messages)
+        self._chats.move_to_end(chat_key)
+        while len(self._chats) > self.max_chats:
+            self._chats.popitem(last=False)
+
+    async def append(self, chat_key: str, entries: List[HistoryEntry]) -> bool:
+        buffer = self._chats.get(chat_key)
+        if buffer is None:
+            return False
+        buffer.extend(entries)
+        return True
+
+    async def evict(self, chat_key: str) -> None:
+        self._chats.pop(chat_key, None)
+
+    def info(self) -> Dict[str, Any]:
+        return {"backend": "memory", "chats": len(self._chats), "max_chats": self.max_chats}
+
+
+class RedisHistoryBackend:
+    """Ring buffers in Redis lists (RPUSH + LTRIM), shared by every worker"""
+
+    def __init__(self, host: str, port: int, max_messages: int, ttl: float, prefix: str = "sportbot:history:"):
+        import redis.asyncio
+
+        self.client = redis.asyncio.Redis(host=host, port=port, socket_timeout=1.0, socket_connect_timeout=1.0)
+        self.max_messages = max_messages
+        self.ttl = int(ttl)
+        self.prefix = prefix
+
+    async def get(self, chat_key: str) -> Optional[List[HistoryEntry]]:
+        key = self.prefix + chat_key
+        async with self.client.pipeline(transaction=False) as pipe:
+            # The flag marks the chat as hydrated even when its history is empty
+            pipe.exists(key + ":h")
+            pipe.lrange(key, 0, -1)
+            hydrated, raw = await pipe.execute()
+        if not hydrated:
+            return None
+        return [tuple(json.loads(item)) for item in raw]
+
+    async def replace(self, chat_key: str, entries: List[HistoryEntry]) -> None:
+        key = self.prefix + chat_key
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.delete(key)
+            if entries:
+                pipe.rpush(key, *[json.dumps(entry) for entry in entries[-self.max_messages:]])
+                pipe.expire(key, self.ttl)
+            pipe.set(key + ":h", 1, ex=self.ttl)
+            await pipe.execute()
+
+    async def append(self, chat_key: str, entries: List[HistoryEntry]) -> bool:
+        key = self.prefix + chat_key
+        if not await self.client.exists(key + ":h"):
+            return False
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.rpush(key, *[json.dumps(entry) for entry in entries])
+            pipe.ltrim(key, -self.max_messages, -1)
+            pipe.expire(key, self.ttl)
+            pipe.expire(key + ":h", self.ttl)
+            await pipe.execute()
+        return True
+
+    async def evict(self, chat_key: str) -> None:
+        key = self.prefix + chat_key
+        await self.client.delete(key, key + ":h")
+
+    def info(self) -> Dict[str, Any]:
+        return {"backend": "redis", "ttl": self.ttl}
+
+
+class ChatHistoryStore:
+    """
+    Recent conversation history per chat.
+
+    A chat is hydrated from the mensaje table the first time it is read,
+    then kept up to date in O(1) per turn with append(); the buffer keeps
+    the last ``max_turns`` turns and reads are trimmed to ``max_tokens``.
+    """
+
+    def __init__(self, backend, max_turns: int = 10, max_tokens: int = 1500):
+        self.backend = backend
+        self.max_turns = max_turns
+        self.max_tokens = max_tokens
+
+        self.hits = 0
+        self.hydrations = 0
+        self.errors = 0
+
+    async def get(self, chat_key: str) -> List[Dict[str, str]]:
+        """Get the most recent messages of a chat that fit in the token budget, oldest first"""
+        try:
+            entries = await self.backend.get(chat_key)
+            if entries is None:
+                entries = await self._hydrate(chat_key)
+            else:
+                self.hits += 1
+        except Exception as e:
+            # History is an enhancement; a failure must not block the reply
+            self.errors += 1
+            logger.warning(f"Chat history unavailable for {chat_key}: {str(e)}")
+            return []
+        return self._within_budget(entries)
+
+    async def append(self, chat_key: str, user_message: str, bot_response: str) -> None:
+        """Record a completed turn; chats that are not loaded are left to hydrate later"""
+        entries = [
+            ("user", user_message, estimate_tokens(user_message)),
+            ("assistant", bot_response, estimate_tokens(bot_response))
+        ]
+        try:
+            await self.backend.append(chat_key, entries)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Could not append chat history for {chat_key}: {str(e)}")
+
+    async def evict(self, chat_key: str) -> None:
+        """Forget a chat, e.g. when its session expires"""
+        try:
+            await self.backend.evict(chat_key)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Could not evict chat history for {chat_key}: {str(e)}")
+
+    async def _hydrate(self, chat_key: str) -> List[HistoryEntry]:
+        rows = await fetch_all(
+            """
+            SELECT m.tipo, m.contenido FROM mensaje m
+            JOIN chat c ON c.id = m.chatId
+            WHERE c.chatId = %s
+            ORDER BY m.id DESC
+            LIMIT %s
+            """,
+            (chat_key, self.max_turns * 2)
+        )
+        entries = [
+            (_ROLES.get(row["tipo"], "user"), row["contenido"], estimate_tokens(row["contenido"]))
+            for row in reversed(rows)
+        ]
+        await self.backend.replace(chat_key, entries)
+        self.hydrations += 1
+        return entries
+
+    def _within_budget(self, entries: List[HistoryEntry]) -> List[Dict[str, str]]:
+        selected: List[Dict[str, str]] = []
+        budget = self.max_tokens
+        for role, content, tokens in reversed(entries):
+            if tokens > budget:
+                break
+            budget -= tokens
+            selected.append({"role": role, "content": content})
+        # Never start with a reply whose question did not fit
+        if selected and selected[-1]["role"] == "assistant":
+            selected.pop()
+        selected.reverse()
+        return selected
+
+    def stats(self) -> Dict[str, Any]:
+        """Get hit/hydration counters and backend information"""
+        return {
+            "hits": self.hits,
+            "hydrations": self.hydrations,
+            "errors": self.errors,
+            "max_turns": self.max_turns,
+            "max_tokens": self.max_tokens,
+            **self.backend.info()
+        }
+
+
+def _create_backend():
+    max_messages = settings.CHAT_HISTORY_MAX_TURNS * 2
+    if settings.CHAT_HISTORY_BACKEND == "redis":
+        try:
+            return RedisHistoryBackend(settings.REDIS_HOST, settings.REDIS_PORT, max_messages,
+                                       settings.CHAT_HISTORY_TTL_SECONDS)
+        except ImportError:
+            logger.warning("CHAT_HISTORY_BACKEND=redis but the redis package is not installed; using memory")
+    return MemoryHistoryBackend(max_messages, max_chats=settings.CHAT_HISTORY_MAX_CHATS)
+
+# Process-wide recent history store
+chat_history = ChatHistoryStore(
+    _create_backend(),
+    max_turns=settings.CHAT_HISTORY_MAX_TURNS,
+    max_tokens=settings.CHAT_HISTORY_MAX_TOKENS
+)
@@ -0,0 +1,105 @@
+from typing import Any, Dict, Optional, Sequence, Tuple
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+import hashlib
+
+from fastapi import Request, Response, status
+from app.database import get_pooled_connection
+from app.services.serialization import dumps
+
+CatalogVersion = Tuple[str, Optional[datetime]]
+
+
+def _weak_etag(token: bytes) -> str:
+    # Weak: GZipMiddleware sends a different body, with the same tag, to clients accepting gzip
+    return 'W/"' + hashlib.sha1(token).hexdigest()[:20] + '"'
+
+
+def compute_version(table: str, where: str = "", params: Sequence[Any] = ()) -> CatalogVersion:
+    """
+    Derive a version token for a table (or a filtered slice of it)
+
+    Inserts change MAX(id), deletes change COUNT(*) and updates bump
+    fechaActualizacion, so the triple changes whenever the listing does.
+
+    No Last-Modified is derived: MAX(fechaActualizacion) does not move on
+    a DELETE, so If-Modified-Since would answer 304 with rows missing.
+    Listings revalidate by ETag only.
+
+    Returns:
+        A weak ETag value and None (no Last-Modified)
+    """
+    where_clause = f"WHERE {where}" if where else ""
+    sql = f"""
+    SELECT COUNT(*) AS total, MAX(id) AS max_id, MAX(fechaActualizacion) AS last_update
+    FROM {table} {where_clause}
+    """
+    with get_pooled_connection() as connection:
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            row = cursor.fetchone()
+
+    token = f"{table}:{where}:{list(params)}:{row['total']}:{row['max_id']}:{row['last_update']}"
+    return _weak_etag(token.encode()), None
+
+
+def model_version(model: Any) -> CatalogVersion:
+    """Version of a single row, from its id and fechaActualizacion"""
+    token = f"{type(model).__name__}:{model.id}:{model.fechaActualizacion}"
+    return _weak_etag(token.encode()), model.fechaActualizacion
+
+
+def content_version(name: str, content: Any) -> CatalogVersion:
+    """
+    Version of a derived payload (aggregates, counters) from its content
+
+    For data that no table's COUNT/MAX/fechaActualizacion tracks, e.g. the
+    facet counters, which POST /productos/facets/rebuild can change without
+    touching producto.
+    """
+    return _weak_etag(name.encode() + b":" + dumps(content)), None
+
+
+def _http_date(value: datetime) -> str:
+    # Database timestamps are naive and stored in UTC
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+def validator_headers(version: CatalogVersion) -> Dict[str, str]:
+    """ETag/Last-Modified headers; no-cache makes clients revalidate on every poll"""
+    etag, last_modified = version
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if last_modified is not None:
+        headers["Last-Modified"] = _http_date(last_modified)
+    return headers
+
+def is_not_modified(request: Request, version: CatalogVersion) -> bool:
+    """Evaluate If-None-Match (preferred) or If-Modified-Since against a version"""
+    etag, last_modified = version
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        # Weak comparison (RFC 9110 13.1.2): W/"x" and "x" match each other
+        candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return etag.removeprefix("W/") in candidates
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        modified = last_modified if last_modified.tzinfo else last_modified.replace(tzinfo=timezone.utc)
+        # HTTP dates have one-second resolution
+        return modified.replace(microsecond=0) <= since
+
+    return False
+
+def not_modified_response(version: CatalogVersion) -> Response:
+    """Empty 304 response carrying the current validators"""
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=validator_headers(version))
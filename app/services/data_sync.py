@@ -1,32 +1,69 @@
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 import asyncio
 from datetime import datetime
-from app.database import get_sync_connection
-from app.services.qdrant import QdrantService
+
+from app.services.repository import fetch_all
+from app.services.qdrant import get_qdrant_service
 from app.services.embedding import EmbeddingService
+from app.services.embedding_cache import embedding_cache
+from app.services.embedding_pool import EmbeddingProcessPool
+from app.services.sparse_encoder import BM25SparseEncoder, get_sparse_encoder, save_sparse_encoder
+from app.config import Config
 import logging
 
 logger = logging.getLogger(__name__)
 
+# (document ids, searchable contents, Qdrant payloads) of one source table
+Documents = Tuple[List[str], List[str], List[Dict]]
+
 class DataSyncService:
     """Service for synchronizing MySQL data with Qdrant vector database"""
     
     def __init__(self):
-        self.qdrant_service = QdrantService()
+        self.qdrant_service = get_qdrant_service()
         self.embedding_service = EmbeddingService()
+        # Process pool used while a re-index is running
+        self._pool: Optional[EmbeddingProcessPool] = None
     
-    async def sync_all_data(self) -> Dict:
-        """Perform complete data synchronization from MySQL to Qdrant"""
+    async def sync_all_data(self, reindex: bool = False, workers: Optional[int] = None) -> Dict:
+        """
+        Perform complete data synchronization from MySQL to Qdrant
+        
+        Args:
+            reindex: Re-encode every document, ignoring cached embeddings, in
+                a pool of worker processes (see EmbeddingProcessPool)
+            workers: Worker processes for the re-index (default: EMBEDDING_REINDEX_WORKERS)
+        """
+        pool = None
         try:
-            logger.info("Starting complete data synchronization")
+            logger.info(f"Starting complete data synchronization (reindex: {reindex})")
+            
+            # Initialize Qdrant collection if not exists (a re-index may rebuild it)
+            await self.qdrant_service.create_collection_if_not_exists(recreate=reindex)
+            self.embedding_service.reset_encoding_stats()
+            self.qdrant_service.reset_upsert_stats()
             
-            # Initialize Qdrant collection if not exists
-            self.qdrant_service.create_collection_if_not_exists()
+            if reindex:
+                if embedding_cache is not None:
+                    await asyncio.to_thread(embedding_cache.clear, self.embedding_service.cache_key)
+                pool = EmbeddingProcessPool(
+                    self.embedding_service.model_name,
+                    workers=workers or Config.EMBEDDING_REINDEX_WORKERS,
+                    threads_per_worker=Config.EMBEDDING_REINDEX_THREADS,
+                    chunk_size=Config.EMBEDDING_REINDEX_CHUNK_SIZE
+                ).start()
+            self._pool = pool
+            
+            # Load every document first: BM25 statistics are computed over the whole catalog
+            productos = await self._load_productos()
+            categorias = await self._load_categorias()
+            promociones = await self._load_promociones()
+            await self._fit_sparse_encoder(productos[1] + categorias[1] + promociones[1])
             
             # Sync all data types
-            productos_count = await self._sync_productos()
-            categorias_count = await self._sync_categorias()
-            promociones_count = await self._sync_promociones()
+            productos_count = await self._index(*productos)
+            categorias_count = await self._index(*categorias)
+            promociones_count = await self._index(*promociones)
             
             total_synced = productos_count + categorias_count + promociones_count
             
@@ -39,7 +76,10 @@ class DataSyncService:
                 "details": {
                     "productos": productos_count,
                     "categorias": categorias_count,
-                    "promociones": promociones_count
+                    "promociones": promociones_count,
+                    "embedding_cache": embedding_cache.stats() if embedding_cache else None,
+                    "encoding": pool.stats() if pool else self.embedding_service.encoding_stats(),
+                    "upsert": self.qdrant_service.upsert_stats()
                 },
                 "timestamp": datetime.now().isoformat()
             }
@@ -52,6 +92,10 @@ class DataSyncService:
                 "synced_count": 0,
                 "errors": [str(e)]
             }
+        finally:
+            self._pool = None
+            if pool is not None:
+                await asyncio.to_thread(pool.close)
     
     async def sync_incremental(self, last_sync_time: Optional[datetime] = None) -> Dict:
         """Perform incremental synchronization based on modification timestamps"""
@@ -62,6 +106,8 @@ class DataSyncService:
                 # If no timestamp provided, sync last 24 hours
                 from datetime import timedelta
                 last_sync_time = datetime.now() - timedelta(hours=24)
+            self.embedding_service.reset_encoding_stats()
+            self.qdrant_service.reset_upsert_stats()
             
             # Sync only modified data
             productos_count = await self._sync_productos_incremental(last_sync_time)
@@ -75,6 +121,10 @@ class DataSyncService:
                 "message": "Sincronización incremental exitosa",
                 "synced_count": total_synced,
                 "last_sync_time": last_sync_time.isoformat(),
+                "details": {
+                    "encoding": self.embedding_service.encoding_stats(),
+                    "upsert": self.qdrant_service.upsert_stats()
+                },
                 "timestamp": datetime.now().isoformat()
             }
             
@@ -89,115 +139,116 @@ class DataSyncService:
     
     async def _sync_productos(self) -> int:
         """Sync all productos to Qdrant"""
-        connection = get_sync_connection()
-        try:
-            with connection.cursor() as cursor:
-                sql = """
-                SELECT p.*, c.nombre as categoria_nombre 
-                FROM producto p 
-                LEFT JOIN categoria c ON p.categoriaId = c.id
-                """
-                cursor.execute(sql)
-                productos = cursor.fetchall()
-                
-                synced_count = 0
-                for producto in productos:
-                    # Create searchable text content
-                    content = self._create_producto_content(producto)
-                    
-                    # Generate embedding
-                    embedding = await self.embedding_service.generate_embedding(content)
-                    
-                    # Store in Qdrant
-                    await self.qdrant_service.upsert_document(
-                        doc_id=f"producto_{producto['id']}",
-                        content=content,
-                        embedding=embedding,
-                        metadata={
-                            "type": "producto",
-                            "id": producto['id'],
-                            "nombre": producto['nombre'],
-                            "categoria": producto.get('categoria_nombre', ''),
-                            "precio": float(producto['precio']) if producto['precio'] else 0.0,
-                            "disponible": bool(producto['disponible'])
-                        }
-                    )
-                    synced_count += 1
-                
-                return synced_count
-                
-        finally:
-            connection.close()
+        return await self._index(*await self._load_productos())
     
     async def _sync_categorias(self) -> int:
         """Sync all categorias to Qdrant"""
-        connection = get_sync_connection()
-        try:
-            with connection.cursor() as cursor:
-                sql = "SELECT * FROM categoria"
-                cursor.execute(sql)
-                categorias = cursor.fetchall()
-                
-                synced_count = 0
-                for categoria in categorias:
-                    content = self._create_categoria_content(categoria)
-                    embedding = await self.embedding_service.generate_embedding(content)
-                    
-                    await self.qdrant_service.upsert_document(
-                        doc_id=f"categoria_{categoria['id']}",
-                        content=content,
-                        embedding=embedding,
-                        metadata={
-                            "type": "categoria",
-                            "id": categoria['id'],
-                            "nombre": categoria['nombre'],
-                            "descripcion": categoria.get('descripcion', '')
-                        }
-                    )
-                    synced_count += 1
-                
-                return synced_count
-                
-        finally:
-            connection.close()
+        return await self._index(*await self._load_categorias())
     
     async def _sync_promociones(self) -> int:
         """Sync all promociones to Qdrant"""
-        connection = get_sync_connection()
-        try:
-            with connection.cursor() as cursor:
-                sql = """
-                SELECT p.*, pr.nombre as producto_nombre 
-                FROM promocion p 
-                LEFT JOIN producto pr ON p.productoId = pr.id
-                """
-                cursor.execute(sql)
-                promociones = cursor.fetchall()
-                
-                synced_count = 0
-                for promocion in promociones:
-                    content = self._create_promocion_content(promocion)
-                    embedding = await self.embedding_service.generate_embedding(content)
-                    
-                    await self.qdrant_service.upsert_document(
-                        doc_id=f"promocion_{promocion['id']}",
-                        content=content,
-                        embedding=embedding,
-                        metadata={
-                            "type": "promocion",
-                            "id": promocion['id'],
-                            "titulo": promocion['titulo'],
-                            "descuento": float(promocion['descuento']) if promocion['descuento'] else 0.0,
-                            "producto": promocion.get('producto_nombre', ''),
-                            "activa": bool(promocion['activa'])
-                        }
-                    )
-                    synced_count += 1
-                
-                return synced_count
-                
-        finally:
-            connection.close()
+        return await self._index(*await self._load_promociones())
+    
+    async def _load_productos(self) -> Documents:
+        """Document ids, searchable contents and payloads of all productos"""
+        sql = """
+        SELECT p.*, c.nombre as categoria_nombre 
+        FROM producto p 
+        LEFT JOIN categoria c ON p.categoriaId = c.id
+        """
+        productos = await fetch_all(sql)
+        
+        # Create searchable text content
+        contents = [self._create_producto_content(producto) for producto in productos]
+        
+        payloads = []
+        for producto, content in zip(productos, contents):
+            metadata = {
+                "type": "producto",
+                "id": producto['id'],
+                "nombre": producto['nombre'],
+                "categoria": producto.get('categoria_nombre', ''),
+                "precio": float(producto['precio']) if producto['precio'] else 0.0,
+                "disponible": bool(producto['disponible'])
+            }
+            payloads.append(self._payload(
+                content, "producto", metadata, categoria_id=producto.get('categoriaId'),
+                precio=metadata["precio"], disponible=metadata["disponible"]
+            ))
+        return [f"producto_{producto['id']}" for producto in productos], contents, payloads
+    
+    async def _load_categorias(self) -> Documents:
+        """Document ids, searchable contents and payloads of all categorias"""
+        sql = "SELECT * FROM categoria"
+        categorias = await fetch_all(sql)
+        
+        contents = [self._create_categoria_content(categoria) for categoria in categorias]
+        
+        payloads = [
+            self._payload(content, "categoria", {
+                "type": "categoria",
+                "id": categoria['id'],
+                "nombre": categoria['nombre'],
+                "descripcion": categoria.get('descripcion', '')
+            }, categoria_id=categoria['id'])
+            for categoria, content in zip(categorias, contents)
+        ]
+        return [f"categoria_{categoria['id']}" for categoria in categorias], contents, payloads
+    
+    async def _load_promociones(self) -> Documents:
+        """Document ids, searchable contents and payloads of all promociones"""
+        sql = """
+        SELECT p.*, pr.nombre as producto_nombre 
+        FROM promocion p 
+        LEFT JOIN producto pr ON p.productoId = pr.id
+        """
+        promociones = await fetch_all(sql)
+        
+        contents = [self._create_promocion_content(promocion) for promocion in promociones]
+        
+        payloads = [
+            self._payload(content, "promocion", {
+                "type": "promocion",
+                "id": promocion['id'],
+                "titulo": promocion['titulo'],
+                "descuento": float(promocion['descuento']) if promocion['descuento'] else 0.0,
+                "producto": promocion.get('producto_nombre', ''),
+                "activa": bool(promocion['activa'])
+            }, disponible=bool(promocion['activa']))
+            for promocion, content in zip(promociones, contents)
+        ]
+        return [f"promocion_{promocion['id']}" for promocion in promociones], contents, payloads
+    
+    @staticmethod
+    def _payload(content: str, tipo: str, metadata: Dict, categoria_id: Optional[int] = None,
+                 precio: Optional[float] = None, disponible: bool = True) -> Dict:
+        """Qdrant payload in the shape QdrantService.search_similar returns"""
+        return {
+            "content": content,
+            "metadata": metadata,
+            "tipo": tipo,
+            "categoria_id": categoria_id,
+            "precio": precio,
+            "disponible": disponible
+        }
+    
+    async def _fit_sparse_encoder(self, contents: List[str]) -> None:
+        """Fit the BM25 encoder on the catalog texts and publish it to every worker"""
+        if not Config.HYBRID_SEARCH_ENABLED:
+            return
+        encoder = await asyncio.to_thread(BM25SparseEncoder().fit, contents)
+        await asyncio.to_thread(save_sparse_encoder, encoder)
+        logger.info(f"Fitted BM25 encoder on {encoder.document_count} documents")
+    
+    async def _index(self, doc_ids: List[str], contents: List[str], payloads: List[Dict]) -> int:
+        """Embed documents and write them to Qdrant in one matrix upsert"""
+        # Unchanged texts reuse their cached embedding
+        embeddings = await self.embedding_service.embed_documents(contents, pool=self._pool)
+        encoder = get_sparse_encoder() if Config.HYBRID_SEARCH_ENABLED else None
+        sparse_vectors = await asyncio.to_thread(encoder.encode_documents, contents) if encoder else None
+        return await self.qdrant_service.upsert_embeddings(
+            doc_ids, embeddings, payloads, sparse_vectors=sparse_vectors
+        )
     
     def _create_producto_content(self, producto: Dict) -> str:
         """Create searchable content for producto"""
@@ -246,14 +297,16 @@ class DataSyncService:
     async def get_sync_status(self) -> Dict:
         """Get current synchronization status"""
         try:
-            collection_info = self.qdrant_service.get_collection_info()
+            collection_info = await self.qdrant_service.get_collection_info()
             
             return {
                 "status": "success",
                 "message": "Estado de sincronización obtenido",
                 "data": {
                     "collection_exists": collection_info is not None,
-                    "total_documents": collection_info.get("vectors_count", 0) if collection_info else 0,
+                    "total_documents": collection_info.get("points_count", 0) if collection_info else 0,
+                    "backend": collection_info.get("backend") if collection_info else None,
+                    "failover": collection_info.get("failover") if collection_info else None,
                     "last_check": datetime.now().isoformat()
                 }
             }
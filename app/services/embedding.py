@@ -1,60 +1,101 @@
-from sentence_transformers import SentenceTransformer
-from typing import List, Union
+from typing import Any, Dict, List, Sequence, Tuple, Union
+import asyncio
 import logging
+import time
 import numpy as np
 from app.config import Config
+from app.services.model_registry import model_registry
+from app.services.embedding_executor import get_embedding_executor
+from app.services.embedding_cache import content_hash, embedding_cache
 
 logger = logging.getLogger(__name__)
 
+
+def plan_length_buckets(lengths: Sequence[int], token_budget: int, max_batch_size: int) -> List[List[int]]:
+    """
+    Group text indices into batches of similar token length
+    
+    Indices are sorted by length and cut into batches whose padded size
+    (texts x longest text) stays within ``token_budget``, so short texts go
+    through in large batches and long ones in small batches.
+    
+    Returns:
+        Batches of indices into ``lengths``, shortest texts first
+    """
+    batches: List[List[int]] = []
+    batch: List[int] = []
+    for index in sorted(range(len(lengths)), key=lengths.__getitem__):
+        # Sorted ascending, so the newest text is the longest in its batch
+        if batch and (len(batch) >= max_batch_size or (len(batch) + 1) * lengths[index] > token_budget):
+            batches.append(batch)
+            batch = []
+        batch.append(index)
+    if batch:
+        batches.append(batch)
+    return batches
+
+
 class EmbeddingService:
-    def __init__(self):
-        """Initialize embedding model"""
+    def __init__(self, model_name: str = None):
+        """Initialize embedding service; the model itself is shared and loaded on first use"""
+        self.model_name = model_name or Config.EMBEDDING_MODEL
+        self.dimension = Config.EMBEDDING_DIMENSION
+        self.reset_encoding_stats()
+    
+    @property
+    def cache_key(self) -> str:
+        """Model identity for the embedding cache; backends produce slightly different vectors"""
+        if Config.EMBEDDING_BACKEND == "onnx":
+            return f"{self.model_name}@onnx{'-int8' if Config.EMBEDDING_ONNX_QUANTIZE else ''}"
+        return self.model_name
+    
+    @property
+    def model(self):
+        """The process-wide SentenceTransformer for this service's model"""
         try:
-            self.model = SentenceTransformer(Config.EMBEDDING_MODEL)
-            self.dimension = Config.EMBEDDING_DIMENSION
-            logger.info(f"Loaded embedding model: {Config.EMBEDDING_MODEL}")
+            return model_registry.get(self.model_name)
         except Exception as e:
             logger.error(f"Error loading embedding model: {str(e)}")
             raise
 
-    async def generate_embedding(self, text: str) -> List[float]:
+    async def generate_embedding(self, text: str) -> np.ndarray:
         """
         Generates an embedding for a given text using a pre-trained model.
+        
+        Runs off the event loop; concurrent calls are batched into one forward pass.
+        
+        Returns:
+            float32 vector of shape (dimension,)
         """
         # Encode the text to a numerical vector
-        embedding = self.model.encode(text)
-        
-        # Convert the numpy array to a list of floats
-        return embedding.tolist()
+        embedding = await get_embedding_executor(self.model_name).encode(text)
+        return np.asarray(embedding, dtype=np.float32)
     
-    def encode_text(self, text: Union[str, List[str]]) -> Union[List[float], List[List[float]]]:
+    def encode_text(self, text: Union[str, List[str]]) -> np.ndarray:
         """
         Encode text into embeddings
         
+        Vectors stay contiguous float32 arrays; convert with .tolist() only
+        at boundaries that need plain Python lists.
+        
         Args:
             text: Single text string or list of text strings
             
         Returns:
-            Single embedding vector or list of embedding vectors
+            float32 array of shape (dimension,) for a string, (len(text), dimension) for a list
         """
         try:
-            if isinstance(text, str):
-                # Single text
-                embedding = self.model.encode(text, convert_to_tensor=False)
-                return embedding.tolist()
-            else:
-                # List of texts
-                embeddings = self.model.encode(text, convert_to_tensor=False)
-                return [emb.tolist() for emb in embeddings]
+            embeddings = self.model.encode(text, convert_to_numpy=True, convert_to_tensor=False)
+            return np.ascontiguousarray(embeddings, dtype=np.float32)
                 
         except Exception as e:
             logger.error(f"Error encoding text: {str(e)}")
             if isinstance(text, str):
-                return [0.0] * self.dimension
+                return np.zeros(self.dimension, dtype=np.float32)
             else:
-                return [[0.0] * self.dimension] * len(text)
+                return np.zeros((len(text), self.dimension), dtype=np.float32)
     
-    def encode_query(self, query: str) -> List[float]:
+    def encode_query(self, query: str) -> np.ndarray:
         """
         Encode a search query into embedding
         
@@ -62,23 +103,134 @@ class EmbeddingService:
             query: Search query string
             
         Returns:
-            Embedding vector for the query
+            float32 embedding vector for the query
         """
         return self.encode_text(query)
     
-    def encode_documents(self, documents: List[str]) -> List[List[float]]:
+    def encode_documents(self, documents: List[str], raise_errors: bool = False) -> np.ndarray:
         """
         Encode multiple documents into embeddings
         
+        Documents are bucketed by token length and encoded bucket by bucket
+        (see plan_length_buckets) to keep padding low; rows come back in
+        input order and the token counts are added to encoding_stats.
+        
         Args:
             documents: List of document texts
+            raise_errors: Raise when encoding fails instead of logging and
+                returning zero rows (callers that persist vectors need this)
             
         Returns:
-            List of embedding vectors
+            float32 matrix with one row per document
         """
-        return self.encode_text(documents)
+        if not documents:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+        
+        try:
+            start_time = time.perf_counter()
+            model = self.model
+            lengths = self._token_lengths(model, documents)
+            batches = plan_length_buckets(
+                lengths, Config.EMBEDDING_BATCH_TOKENS, Config.EMBEDDING_DOCUMENT_BATCH_SIZE
+            )
+            
+            matrix = None
+            padded_tokens = 0
+            for batch in batches:
+                vectors = model.encode(
+                    [documents[i] for i in batch], batch_size=len(batch),
+                    convert_to_numpy=True, convert_to_tensor=False, show_progress_bar=False
+                )
+                if matrix is None:
+                    matrix = np.empty((len(documents), vectors.shape[1]), dtype=np.float32)
+                matrix[batch] = vectors
+                padded_tokens += len(batch) * max(lengths[i] for i in batch)
+            
+            stats = self._encoding_stats
+            stats["documents"] += len(documents)
+            stats["batches"] += len(batches)
+            stats["tokens"] += sum(lengths)
+            stats["padded_tokens"] += padded_tokens
+            stats["seconds"] += time.perf_counter() - start_time
+            return matrix
+                
+        except Exception as e:
+            logger.error(f"Error encoding documents: {str(e)}")
+            if raise_errors:
+                raise
+            return np.zeros((len(documents), self.dimension), dtype=np.float32)
+    
+    @staticmethod
+    def _token_lengths(model: Any, documents: List[str]) -> List[int]:
+        # Lengths as the model sees them: special tokens included, truncated to max_seq_length
+        max_length = getattr(model, "max_seq_length", None) or 512
+        tokenizer = getattr(model, "tokenizer", None)
+        if tokenizer is None:
+            return [min(len(document.split()) + 2, max_length) for document in documents]
+        encoded = tokenizer(documents, add_special_tokens=True, truncation=True, max_length=max_length)
+        return [len(ids) for ids in encoded["input_ids"]]
+    
+    def reset_encoding_stats(self) -> None:
+        """Start a new count of bulk-encoding work (e.g. at the start of a sync)"""
+        self._encoding_stats = {"documents": 0, "batches": 0, "tokens": 0, "padded_tokens": 0, "seconds": 0.0}
     
-    def similarity(self, embedding1: List[float], embedding2: List[float]) -> float:
+    def encoding_stats(self) -> Dict[str, Any]:
+        """Token counts and throughput of encode_documents since the last reset"""
+        stats = self._encoding_stats
+        seconds = stats["seconds"]
+        return {
+            **stats,
+            "seconds": round(seconds, 3),
+            # Share of the computed positions that were padding
+            "padding_ratio": round(1 - stats["tokens"] / stats["padded_tokens"], 4) if stats["padded_tokens"] else 0.0,
+            "documents_per_second": round(stats["documents"] / seconds, 1) if seconds else 0.0,
+            "tokens_per_second": round(stats["tokens"] / seconds, 1) if seconds else 0.0
+        }
+    
+    async def embed_documents(self, documents: List[str], pool: Any = None) -> np.ndarray:
+        """
+        Encode documents through the persistent content-hash cache
+        
+        Only texts whose (model, hash) is not cached go through the model,
+        in one batched call off the event loop; the rest cost a lookup.
+        Encoding failures raise, so no placeholder vector is ever cached.
+        
+        Args:
+            documents: List of document texts
+            pool: Optional EmbeddingProcessPool that encodes the misses in
+                worker processes instead of this process
+            
+        Returns:
+            float32 matrix with one row per document, in input order
+        """
+        if not documents:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+        if embedding_cache is None:
+            return await self._encode_misses(documents, pool)
+        
+        hashes = [content_hash(document) for document in documents]
+        cached = await asyncio.to_thread(embedding_cache.get_many, self.cache_key, hashes)
+        
+        missing = {digest: document for digest, document in zip(hashes, documents) if digest not in cached}
+        if missing:
+            encoded = await self._encode_misses(list(missing.values()), pool)
+            fresh = dict(zip(missing, encoded))
+            await asyncio.to_thread(embedding_cache.put_many, self.cache_key, fresh.items())
+            cached.update(fresh)
+        
+        # Fill one preallocated matrix; rows are float32 views, nothing is boxed
+        dimension = len(next(iter(cached.values())))
+        matrix = np.empty((len(hashes), dimension), dtype=np.float32)
+        for row, digest in enumerate(hashes):
+            matrix[row] = cached[digest]
+        return matrix
+    
+    async def _encode_misses(self, documents: List[str], pool: Any) -> np.ndarray:
+        if pool is not None:
+            return await pool.encode_documents(documents)
+        return await asyncio.to_thread(self.encode_documents, documents, True)
+    
+    def similarity(self, embedding1: Union[np.ndarray, List[float]], embedding2: Union[np.ndarray, List[float]]) -> float:
         """
         Calculate cosine similarity between two embeddings
         
@@ -90,24 +242,96 @@ class EmbeddingService:
             Cosine similarity score between -1 and 1
         """
         try:
-            vec1 = np.array(embedding1)
-            vec2 = np.array(embedding2)
-            
-            # Calculate cosine similarity
-            dot_product = np.dot(vec1, vec2)
-            norm1 = np.linalg.norm(vec1)
-            norm2 = np.linalg.norm(vec2)
-            
-            if norm1 == 0 or norm2 == 0:
-                return 0.0
-                
-            similarity = dot_product / (norm1 * norm2)
-            return float(similarity)
+            return float(self.similarity_to_many(embedding1, np.asarray(embedding2, dtype=np.float32)[None, :])[0])
             
         except Exception as e:
             logger.error(f"Error calculating similarity: {str(e)}")
             return 0.0
     
+    @staticmethod
+    def normalize(vectors: Union[np.ndarray, List[float], List[List[float]]]) -> np.ndarray:
+        """
+        L2-normalize a vector or the rows of a matrix
+        
+        Normalize candidate matrices once and pass normalized=True to the
+        batch methods below; cosine similarity is then a plain dot product.
+        Zero vectors stay zero (similarity 0 with everything).
+        
+        Returns:
+            Contiguous float32 array of the same shape
+        """
+        vectors = np.array(vectors, dtype=np.float32, copy=True, order="C")
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        np.divide(vectors, norms, out=vectors, where=norms > 0)
+        return vectors
+    
+    def similarity_to_many(self, query: Union[np.ndarray, List[float]], candidates: np.ndarray,
+                           normalized: bool = False) -> np.ndarray:
+        """
+        Cosine similarity of one vector against every row of a matrix
+        
+        Args:
+            query: Vector of shape (dimension,)
+            candidates: Matrix of shape (n, dimension)
+            normalized: Both inputs are already L2-normalized float32
+            
+        Returns:
+            float32 scores of shape (n,)
+        """
+        if not normalized:
+            query, candidates = self.normalize(query), self.normalize(candidates)
+        return candidates @ query
+    
+    def similarity_matrix(self, left: np.ndarray, right: np.ndarray, normalized: bool = False) -> np.ndarray:
+        """
+        Cosine similarity of every row of ``left`` against every row of ``right``
+        
+        Args:
+            left: Matrix of shape (n, dimension)
+            right: Matrix of shape (m, dimension); pass ``left`` again for all pairs within one set
+            normalized: Both inputs are already L2-normalized float32
+            
+        Returns:
+            float32 scores of shape (n, m)
+        """
+        if not normalized:
+            left = self.normalize(left)
+            right = left if right is left else self.normalize(right)
+        return left @ right.T
+    
+    def top_k(self, query: np.ndarray, candidates: np.ndarray, k: int = 10,
+              normalized: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Indices and scores of the k candidates most similar to the query
+        
+        Uses argpartition (linear time) and only sorts the k winners.
+        
+        Args:
+            query: Vector of shape (dimension,) or a batch of shape (q, dimension)
+            candidates: Matrix of shape (n, dimension)
+            k: Number of results (capped at n)
+            normalized: Both inputs are already L2-normalized float32
+            
+        Returns:
+            (indices, scores), best first; shape (k,) or (q, k) for a batch
+        """
+        query = np.asarray(query, dtype=np.float32)
+        if query.ndim == 1:
+            indices, scores = self.top_k(query[None, :], candidates, k, normalized)
+            return indices[0], scores[0]
+        
+        scores = self.similarity_matrix(query, candidates, normalized)
+        k = min(k, scores.shape[1])
+        if k <= 0:
+            return np.zeros((len(query), 0), dtype=np.intp), np.zeros((len(query), 0), dtype=np.float32)
+        if k < scores.shape[1]:
+            indices = np.argpartition(scores, -k, axis=1)[:, -k:]
+        else:
+            indices = np.broadcast_to(np.arange(k), scores.shape).copy()
+        top_scores = np.take_along_axis(scores, indices, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        return np.take_along_axis(indices, order, axis=1), np.take_along_axis(top_scores, order, axis=1)
+    
     def get_model_info(self) -> dict:
         """
         Get information about the loaded model
@@ -116,7 +340,8 @@ class EmbeddingService:
             Dictionary with model information
         """
         return {
-            'model_name': Config.EMBEDDING_MODEL,
+            'model_name': self.model_name,
+            'backend': Config.EMBEDDING_BACKEND,
             'dimension': self.dimension,
             'max_seq_length': getattr(self.model, 'max_seq_length', 'Unknown')
         }
@@ -0,0 +1,183 @@
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# last_used is refreshed at most this often (seconds); LRU order only needs coarse timestamps
+TOUCH_INTERVAL = 3600
+
+
+def content_hash(text: str) -> bytes:
+    """128-bit digest identifying a document text"""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+class EmbeddingCache:
+    """
+    Persistent embedding cache keyed by (model name, content hash).
+
+    Vectors are stored as raw float32 blobs in a WAL-mode sqlite file, so a
+    384-dimension embedding costs 1.5 KB on disk and survives restarts.
+    When the cache grows past ``max_entries`` the least recently used
+    entries are evicted.
+    """
+
+    def __init__(self, path: str, max_entries: int = 200000):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS embedding (
+                    model TEXT NOT NULL,
+                    hash BLOB NOT NULL,
+                    dim INTEGER NOT NULL,
+                    vector BLOB NOT NULL,
+                    last_used INTEGER NOT NULL,
+                    PRIMARY KEY (model, hash)
+                ) WITHOUT ROWID
+            """)
+            connection.execute("CREATE INDEX IF NOT EXISTS idx_embedding_last_used ON embedding (last_used)")
+            self._connection = connection
+        return self._connection
+
+    def get_many(self, model: str, hashes: Sequence[bytes]) -> Dict[bytes, np.ndarray]:
+        """Look up vectors by content hash; missing hashes are absent from the result"""
+        found: Dict[bytes, np.ndarray] = {}
+        unique = list(dict.fromkeys(hashes))
+        now = int(time.time())
+        stale = []
+        with self._lock:
+            connection = self._connect()
+            # Stay under SQLite's bound-parameter limit
+            for start in range(0, len(unique), 500):
+                chunk = unique[start:start + 500]
+                placeholders = ", ".join("?" * len(chunk))
+                rows = connection.execute(
+                    f"SELECT hash, vector, last_used FROM embedding WHERE model = ? AND hash IN ({placeholders})",
+                    [model, *chunk]
+                ).fetchall()
+                for digest, blob, last_used in rows:
+                    found[digest] = np.frombuffer(blob, dtype=np.float32)
+                    if last_used < now - TOUCH_INTERVAL:
+                        stale.append(digest)
+            if stale:
+                self._touch(connection, model, stale, now)
+            self.hits += len(found)
+            self.misses += len(unique) - len(found)
+        return found
+
+    @staticmethod
+    def _touch(connection: sqlite3.Connection, model: str, hashes: Sequence[bytes], now: int) -> None:
+        # One transaction (one WAL commit) for the whole lookup, not one per hit
+        connection.execute("BEGIN")
+        try:
+            for start in range(0, len(hashes), 500):
+                chunk = hashes[start:start + 500]
+                placeholders = ", ".join("?" * len(chunk))
+                connection.execute(
+                    f"UPDATE embedding SET last_used = ? WHERE model = ? AND hash IN ({placeholders})",
+                    [now, model, *chunk]
+                )
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+
+    def put_many(self, model: str, items: Iterable[Tuple[bytes, Any]]) -> None:
+        """Store vectors (any float sequence) as float32 and evict beyond max_entries"""
+        now = int(time.time())
+        rows = []
+        for digest, vector in items:
+            array = np.asarray(vector, dtype=np.float32)
+            rows.append((model, digest, array.shape[-1], array.tobytes(), now))
+        if not rows:
+            return
+
+        with self._lock:
+            connection = self._connect()
+            connection.execute("BEGIN")
+            try:
+                connection.executemany(
+                    "INSERT OR REPLACE INTO embedding (model, hash, dim, vector, last_used) VALUES (?, ?, ?, ?, ?)",
+                    rows
+                )
+                self._evict(connection)
+                connection.execute("COMMIT")
+            except Exception:
+                connection.execute("ROLLBACK")
+                raise
+
+    def _evict(self, connection: sqlite3.Connection) -> None:
+        total = connection.execute("SELECT COUNT(*) FROM embedding").fetchone()[0]
+        excess = total - self.max_entries
+        if excess > 0:
+            connection.execute(
+                """
+                DELETE FROM embedding WHERE (model, hash) IN (
+                    SELECT model, hash FROM embedding ORDER BY last_used LIMIT ?
+                )
+                """,
+                (excess,)
+            )
+            self.evictions += excess
+
+    def clear(self, model: Optional[str] = None) -> None:
+        """Drop every cached vector, or only those of one model"""
+        with self._lock:
+            connection = self._connect()
+            if model is None:
+                connection.execute("DELETE FROM embedding")
+            else:
+                connection.execute("DELETE FROM embedding WHERE model = ?", (model,))
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and the on-disk size"""
+        with self._lock:
+            entries = self._connect().execute("SELECT COUNT(*) FROM embedding").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "path": self.path,
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "size_mb": round(os.path.getsize(self.path) / 1024 / 1024, 2) if os.path.exists(self.path) else 0.0
+        }
+
+
+# Process-wide embedding cache (None when disabled)
+embedding_cache: Optional[EmbeddingCache] = (
+    EmbeddingCache(settings.EMBEDDING_CACHE_PATH, max_entries=settings.EMBEDDING_CACHE_MAX_ENTRIES)
+    if settings.EMBEDDING_CACHE_ENABLED else None
+)
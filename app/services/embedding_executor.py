@@ -0,0 +1,143 @@
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import logging
+import threading
+import time
+
+from app.config import settings
+from app.services.model_registry import model_registry
+
+logger = logging.getLogger(__name__)
+
+
+class BatchingEmbeddingExecutor:
+    """
+    Coalesces concurrent encode requests into batched forward passes.
+
+    Requests arriving within ``max_wait_ms`` of the first pending one are
+    encoded together (up to ``max_batch_size`` texts) in a thread pool, so
+    the event loop never runs inference and 50 concurrent queries cost a
+    couple of batched passes instead of 50 sequential ones.
+    """
+
+    def __init__(self, encode_batch: Callable[[List[str]], Sequence[Any]], max_batch_size: int = 32,
+                 max_wait_ms: float = 5.0, workers: int = 1, name: str = "embedding"):
+        self.encode_batch = encode_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"{name}-encoder")
+
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        self.requests = 0
+        self.batches = 0
+        self.max_observed_batch = 0
+        self.encode_seconds = 0.0
+
+    async def encode(self, text: str) -> Any:
+        """Encode one text; resolves once its batch has been through the model"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Pending futures belong to one loop; a new loop starts clean
+            self._loop, self._pending, self._timer = loop, [], None
+
+        future = loop.create_future()
+        self._pending.append((text, future))
+        self.requests += 1
+
+        if len(self._pending) >= self.max_batch_size:
+            self._dispatch()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._dispatch)
+        return await future
+
+    def _dispatch(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch = [(text, future) for text, future in self._pending[:self.max_batch_size] if not future.done()]
+        self._pending = self._pending[self.max_batch_size:]
+        if self._pending:
+            # Overflow beyond one batch goes out right away
+            self._timer = self._loop.call_soon(self._dispatch)
+        if batch:
+            self._loop.create_task(self._run_batch(batch))
+
+    async def _run_batch(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        texts = [text for text, _ in batch]
+        try:
+            vectors, elapsed = await self._loop.run_in_executor(self._pool, self._timed_encode, texts)
+        except Exception as e:
+            logger.error(f"Embedding batch of {len(texts)} failed: {str(e)}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        self.batches += 1
+        self.max_observed_batch = max(self.max_observed_batch, len(batch))
+        self.encode_seconds += elapsed
+        for (_, future), vector in zip(batch, vectors):
+            if not future.done():
+                future.set_result(vector)
+
+    def _timed_encode(self, texts: List[str]) -> Tuple[Sequence[Any], float]:
+        # Timed in the worker thread so queueing for the pool is not counted
+        start_time = time.perf_counter()
+        vectors = self.encode_batch(texts)
+        return vectors, time.perf_counter() - start_time
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get batching counters"""
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "avg_batch_size": round(self.requests / self.batches, 2) if self.batches else 0.0,
+            "max_batch_size": self.max_batch_size,
+            "max_observed_batch": self.max_observed_batch,
+            "max_wait_ms": self.max_wait * 1000,
+            "avg_batch_ms": round(self.encode_seconds / self.batches * 1000, 2) if self.batches else 0.0,
+            "pending": len(self._pending)
+        }
+
+
+_executors: Dict[str, BatchingEmbeddingExecutor] = {}
+_executors_lock = threading.Lock()
+
+
+def get_embedding_executor(model_name: Optional[str] = None) -> BatchingEmbeddingExecutor:
+    """Shared executor for a model (one per model and process)"""
+    model_name = model_name or settings.EMBEDDING_MODEL
+    with _executors_lock:
+        executor = _executors.get(model_name)
+        if executor is None:
+            def encode_batch(texts: List[str]) -> Sequence[Any]:
+                return model_registry.get(model_name).encode(
+                    texts, batch_size=len(texts), convert_to_numpy=True, show_progress_bar=False
+                )
+
+            executor = _executors[model_name] = BatchingEmbeddingExecutor(
+                encode_batch,
+                max_batch_size=settings.EMBEDDING_MAX_BATCH_SIZE,
+                max_wait_ms=settings.EMBEDDING_MAX_WAIT_MS,
+                workers=settings.EMBEDDING_EXECUTOR_WORKERS
+            )
+        return executor
+
+def shutdown_embedding_executors() -> None:
+    """Stop every encoder thread pool"""
+    with _executors_lock:
+        for executor in _executors.values():
+            executor.shutdown()
+        _executors.clear()
+
+def embedding_executor_stats() -> Dict[str, Dict[str, Any]]:
+    """Batching counters per model"""
+    with _executors_lock:
+        return {name: executor.stats() for name, executor in _executors.items()}
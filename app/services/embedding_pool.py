@@ -0,0 +1,155 @@
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+
+import numpy as np
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Per worker process: the EmbeddingService built by _init_worker
+_worker_service = None
+
+
+def _init_worker(model_name: str, threads: int, cores: Any) -> None:
+    global _worker_service
+
+    # Pin this worker to its own cores before torch/onnxruntime create their thread pools
+    core_set = cores.get() if cores is not None else None
+    if core_set and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, core_set)
+    for variable in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[variable] = str(threads)
+    os.environ["TOKENIZERS_PARALLELISM"] = "false"
+    try:
+        import torch
+
+        torch.set_num_threads(threads)
+        torch.set_num_interop_threads(1)
+    except ImportError:
+        pass
+
+    from app.services.embedding import EmbeddingService
+
+    settings.EMBEDDING_ONNX_THREADS = threads
+    _worker_service = EmbeddingService(model_name)
+    _worker_service.model  # load now, not on the first chunk
+
+
+def _encode_chunk(documents: List[str]) -> Tuple[np.ndarray, Dict[str, Any]]:
+    _worker_service.reset_encoding_stats()
+    vectors = _worker_service.encode_documents(documents, raise_errors=True)
+    return vectors, _worker_service.encoding_stats()
+
+
+class EmbeddingProcessPool:
+    """
+    Pool of worker processes for full catalog re-indexing.
+
+    Each worker loads its own copy of the model with a fixed number of
+    torch/ONNX threads and, where the OS allows, its own set of cores, so N
+    workers use N cores' worth of inference instead of sharing one model in
+    the API process. Documents go out in chunks and vectors come back as
+    float32 matrices as soon as each chunk is done.
+    """
+
+    def __init__(self, model_name: Optional[str] = None, workers: int = 0, threads_per_worker: int = 0,
+                 chunk_size: int = 256):
+        cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+        self.model_name = model_name or settings.EMBEDDING_MODEL
+        self.workers = workers or cpus
+        self.threads_per_worker = threads_per_worker or max(1, cpus // self.workers)
+        self.chunk_size = chunk_size
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+        self.documents = 0
+        self.tokens = 0
+        self.seconds = 0.0
+
+    def start(self) -> "EmbeddingProcessPool":
+        if self._executor is None:
+            # spawn: torch and its thread pools are not fork-safe once initialised in the parent
+            context = multiprocessing.get_context("spawn")
+            cores = None
+            if hasattr(os, "sched_getaffinity"):
+                available = sorted(os.sched_getaffinity(0))
+                cores = context.Queue()
+                for worker in range(self.workers):
+                    first = worker * self.threads_per_worker % len(available)
+                    cores.put(set(available[first:first + self.threads_per_worker]) or set(available))
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=context, initializer=_init_worker,
+                initargs=(self.model_name, self.threads_per_worker, cores)
+            )
+            logger.info(
+                f"Started embedding pool: {self.workers} workers x {self.threads_per_worker} threads"
+            )
+        return self
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def __enter__(self) -> "EmbeddingProcessPool":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def _submit(self, documents: List[str]) -> List[Tuple[int, Future]]:
+        executor = self.start()._executor
+        return [
+            (start, executor.submit(_encode_chunk, documents[start:start + self.chunk_size]))
+            for start in range(0, len(documents), self.chunk_size)
+        ]
+
+    def imap(self, documents: List[str]) -> Iterator[Tuple[int, np.ndarray]]:
+        """Yield (offset, vectors) per chunk as soon as each one is encoded"""
+        start_time = time.perf_counter()
+        futures = {future: start for start, future in self._submit(documents)}
+        try:
+            for future in as_completed(futures):
+                vectors, stats = future.result()
+                self.documents += len(vectors)
+                self.tokens += stats["tokens"]
+                yield futures[future], vectors
+        finally:
+            self.seconds += time.perf_counter() - start_time
+
+    async def encode_documents(self, documents: List[str]) -> np.ndarray:
+        """Encode documents across the pool; rows come back in input order"""
+        if not documents:
+            return np.zeros((0, settings.EMBEDDING_DIMENSION), dtype=np.float32)
+
+        start_time = time.perf_counter()
+        chunks = [(start, asyncio.wrap_future(future)) for start, future in self._submit(documents)]
+        matrix = None
+        try:
+            for start, chunk in chunks:
+                vectors, stats = await chunk
+                if matrix is None:
+                    matrix = np.empty((len(documents), vectors.shape[1]), dtype=np.float32)
+                matrix[start:start + len(vectors)] = vectors
+                self.documents += len(vectors)
+                self.tokens += stats["tokens"]
+        finally:
+            self.seconds += time.perf_counter() - start_time
+        return matrix
+
+    def stats(self) -> Dict[str, Any]:
+        """Throughput of everything encoded through the pool"""
+        return {
+            "workers": self.workers,
+            "threads_per_worker": self.threads_per_worker,
+            "chunk_size": self.chunk_size,
+            "documents": self.documents,
+            "tokens": self.tokens,
+            "seconds": round(self.seconds, 3),
+            "documents_per_second": round(self.documents / self.seconds, 1) if self.seconds else 0.0
+        }
@@ -0,0 +1,141 @@
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+from collections import Counter
+from decimal import Decimal
+import logging
+
+from app.database import get_pooled_connection
+
+logger = logging.getLogger(__name__)
+
+FACETS = ("categoria", "talla", "color", "precio")
+
+# producto columns facet_values() reads
+FACET_COLUMNS = ("categoriaId", "talla", "color", "precio")
+
+# Lower bounds of the precio buckets; changing them requires rebuild_facets()
+PRICE_BUCKETS = (Decimal("0"), Decimal("25"), Decimal("50"), Decimal("100"), Decimal("200"))
+
+_UPSERT_SQL = """
+INSERT INTO producto_facet (facet, value, total) VALUES (%s, %s, %s)
+ON DUPLICATE KEY UPDATE total = total + VALUES(total)
+"""
+
+
+def price_bucket(precio: Any) -> str:
+    """Label of the bucket containing ``precio``, e.g. "25-50" or "200+" """
+    precio = Decimal(str(precio))
+    index = max((i for i, lower in enumerate(PRICE_BUCKETS) if precio >= lower), default=0)
+    if index + 1 < len(PRICE_BUCKETS):
+        return f"{PRICE_BUCKETS[index]}-{PRICE_BUCKETS[index + 1]}"
+    return f"{PRICE_BUCKETS[index]}+"
+
+def facet_values(row: Mapping[str, Any]) -> List[Tuple[str, str]]:
+    """(facet, value) pairs a producto row counts towards; NULL attributes count nowhere"""
+    values = [("categoria", str(row["categoriaId"]))]
+    for facet in ("talla", "color"):
+        if row.get(facet) is not None:
+            values.append((facet, row[facet]))
+    values.append(("precio", price_bucket(row["precio"])))
+    return values
+
+
+def apply_facet_delta(cursor, old_row: Optional[Mapping[str, Any]], new_row: Optional[Mapping[str, Any]]) -> None:
+    """
+    Move the counters of one producto from ``old_row`` to ``new_row``
+
+    Pass None as ``old_row`` for an insert and as ``new_row`` for a delete.
+    Runs on the caller's cursor so the counters commit (or roll back) with
+    the producto write itself.
+    """
+    apply_facet_deltas(cursor, [(old_row, new_row)])
+
+def apply_facet_deltas(cursor, changes: Iterable[Tuple[Optional[Mapping[str, Any]], Optional[Mapping[str, Any]]]]) -> None:
+    """
+    apply_facet_delta for many productos, summed into one upsert per counter
+
+    Matches the ChangeHook signature of the bulk helpers, which call it
+    once per chunk inside the chunk's transaction.
+    """
+    delta: Counter = Counter()
+    for old_row, new_row in changes:
+        if old_row is not None:
+            delta.subtract(facet_values(old_row))
+        if new_row is not None:
+            delta.update(facet_values(new_row))
+
+    # Sorted so concurrent writers lock the counter rows in the same order
+    upserts = [(facet, value, total) for (facet, value), total in sorted(delta.items()) if total]
+    if upserts:
+        cursor.executemany(_UPSERT_SQL, upserts)
+
+def remove_categoria_facets(cursor, categoria_ids: Sequence[int]) -> None:
+    """
+    Subtract the productos of categorias about to be deleted
+
+    The FOREIGN KEY cascade deletes them without going through the
+    producto code, so call this in the same transaction, after locking
+    the categoria rows and before the DELETE.
+    """
+    if not categoria_ids:
+        return
+    placeholders = ", ".join(["%s"] * len(categoria_ids))
+    cursor.execute(
+        f"SELECT {', '.join(FACET_COLUMNS)} FROM producto WHERE categoriaId IN ({placeholders}) FOR UPDATE",
+        list(categoria_ids)
+    )
+    apply_facet_deltas(cursor, [(row, None) for row in cursor.fetchall()])
+
+
+def rebuild_facets() -> Dict[str, int]:
+    """
+    Recount every facet from the producto table in one transaction
+
+    Writes keep the counters up to date incrementally; this is only for
+    POST /productos/facets/rebuild, when they are suspected to have drifted
+    (e.g. after rows were changed outside the API or PRICE_BUCKETS moved).
+    """
+    bucket_cases = " ".join("WHEN precio >= %s THEN %s" for _ in PRICE_BUCKETS)
+    bucket_params: List[Any] = []
+    for lower in reversed(PRICE_BUCKETS):
+        bucket_params.extend([lower, price_bucket(lower)])
+
+    with get_pooled_connection() as connection:
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM producto_facet")
+            cursor.execute("""
+            INSERT INTO producto_facet (facet, value, total)
+            SELECT 'categoria', CAST(categoriaId AS CHAR), COUNT(*) FROM producto GROUP BY categoriaId
+            UNION ALL
+            SELECT 'talla', talla, COUNT(*) FROM producto WHERE talla IS NOT NULL GROUP BY talla
+            UNION ALL
+            SELECT 'color', color, COUNT(*) FROM producto WHERE color IS NOT NULL GROUP BY color
+            """)
+            cursor.execute(f"""
+            INSERT INTO producto_facet (facet, value, total)
+            SELECT 'precio', bucket, COUNT(*) FROM (
+                SELECT CASE {bucket_cases} ELSE %s END AS bucket FROM producto
+            ) AS buckets GROUP BY bucket
+            """, [*bucket_params, price_bucket(PRICE_BUCKETS[0])])
+            cursor.execute("SELECT facet, COUNT(*) AS total FROM producto_facet GROUP BY facet")
+            summary = {row["facet"]: row["total"] for row in cursor.fetchall()}
+            connection.commit()
+
+    logger.info(f"Facet counters rebuilt: {summary}")
+    return summary
+
+
+def load_facets() -> Dict[str, List[Dict[str, Any]]]:
+    """Read every non-empty counter, grouped by facet and sorted by count"""
+    with get_pooled_connection() as connection:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT facet, value, total FROM producto_facet WHERE total > 0 ORDER BY facet, total DESC, value"
+            )
+            rows = cursor.fetchall()
+
+    facets: Dict[str, List[Dict[str, Any]]] = {facet: [] for facet in FACETS}
+    for row in rows:
+        facets.setdefault(row["facet"], []).append({"value": row["value"], "count": row["total"]})
+    # Price buckets read better in ascending order than by count
+    facets["precio"].sort(key=lambda item: Decimal(item["value"].split("-")[0].rstrip("+")))
+    return facets
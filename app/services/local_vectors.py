@@ -0,0 +1,567 @@
+# Índice vectorial en proceso: mismo interfaz que QdrantService, sin servidor
+
+import os
+import json
+import time
+import shutil
+import asyncio
+import logging
+from typing import List, Dict, Any, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from app.config import settings
+from app.services.qdrant import (
+    PAYLOAD_INDEXES, QDRANT_COLLECTION_NAME, SEARCH_MODES, SPARSE_VECTOR_NAME, VECTOR_SIZE,
+    VectorIndexConfig, documents_to_points, point_id, search_result
+)
+from app.services.sparse_encoder import SparseVector, get_sparse_encoder
+
+logger = logging.getLogger(__name__)
+
+# Rank constant of reciprocal rank fusion: score = sum(1 / (RRF_K + rank))
+RRF_K = 60
+
+
+class LocalVectorStore:
+    """
+    In-process stand-in for QdrantService.
+
+    Points live in a float32 matrix of unit-length rows, so cosine
+    similarity is one matrix-vector product over the rows that pass the
+    payload filter. Above LOCAL_VECTOR_HNSW_MIN_POINTS points, with
+    LOCAL_VECTOR_HNSW and hnswlib installed, an HNSW graph is built in the
+    background and used once ready. BM25 sparse vectors are kept in an
+    inverted index, so sparse and hybrid (RRF) modes work as with Qdrant.
+
+    The collection persists to LOCAL_VECTOR_PATH/<collection>/<version>/ as
+    vectors.npy, opened memory-mapped, and points.json (document ids,
+    payloads and sparse vectors). Every write saves a new version
+    directory and then switches <collection>/CURRENT to it, so other
+    processes, which reload when CURRENT changes, always read a matching
+    pair of files. Each write rewrites the whole collection.
+    """
+
+    def __init__(self, path: Optional[str] = None, collection_name: str = QDRANT_COLLECTION_NAME,
+                 index_config: Optional[VectorIndexConfig] = None, hnsw: Optional[bool] = None):
+        self.collection_name = collection_name
+        self.directory = os.path.join(path or settings.LOCAL_VECTOR_PATH, collection_name)
+        self.vector_size = VECTOR_SIZE
+        self.index_config = index_config or VectorIndexConfig.from_settings()
+        self.hnsw_enabled = settings.LOCAL_VECTOR_HNSW if hnsw is None else hnsw
+        self.sparse_enabled = settings.HYBRID_SEARCH_ENABLED
+        self._write_lock = asyncio.Lock()
+        self._loaded_mtime: Optional[float] = None
+        self._loaded_version: Optional[str] = None
+        self._reset_points()
+        self.reset_upsert_stats()
+        self._load()
+
+    @property
+    def _current_path(self) -> str:
+        """File naming the version directory that holds the collection"""
+        return os.path.join(self.directory, "CURRENT")
+
+    def _reset_points(self) -> None:
+        self._set_points(np.zeros((0, self.vector_size), dtype=np.float32), [], [], [])
+
+    def _set_points(self, vectors: np.ndarray, doc_ids: List[str], payloads: List[Dict[str, Any]],
+                    sparse: List[Optional[SparseVector]]) -> None:
+        """
+        Swap in a new set of points
+
+        Writers build new arrays and lists instead of changing these in
+        place, so a search or save running meanwhile sees a consistent
+        snapshot.
+        """
+        self._vectors = vectors
+        self._doc_ids = doc_ids
+        self._payloads = payloads
+        self._sparse = sparse
+        self._rows = {point_id(doc_id): row for row, doc_id in enumerate(doc_ids)}
+        self._point_ids = list(self._rows)
+        # Derived structures, rebuilt on demand
+        self._columns: Dict[str, np.ndarray] = {}
+        self._postings: Optional[Dict[int, Any]] = None
+        self._hnsw = None
+        self._hnsw_task: Optional[asyncio.Future] = None
+
+    # Persistence
+
+    def _load(self, attempts: int = 3) -> None:
+        for _ in range(attempts):
+            try:
+                mtime = os.path.getmtime(self._current_path)
+                with open(self._current_path) as source:
+                    version = source.read().strip()
+            except OSError:
+                return
+            if version == self._loaded_version:
+                self._loaded_mtime = mtime
+                return
+            version_directory = os.path.join(self.directory, version)
+            try:
+                with open(os.path.join(version_directory, "points.json")) as source:
+                    points = json.load(source)
+                vectors = np.load(os.path.join(version_directory, "vectors.npy"), mmap_mode="r")
+            except FileNotFoundError:
+                # Superseded and removed by further writes while opening it; read CURRENT again
+                continue
+            except (OSError, ValueError) as e:
+                logger.error(f"Error loading local vector store {version_directory}: {str(e)}")
+                return
+            try:
+                if len(vectors) != len(points["doc_ids"]):
+                    raise ValueError(f"{len(vectors)} vectors for {len(points['doc_ids'])} points")
+                sparse = [
+                    (np.asarray(item[0], dtype=np.uint32), np.asarray(item[1], dtype=np.float32)) if item else None
+                    for item in points["sparse"]
+                ]
+            except (ValueError, KeyError) as e:
+                logger.error(f"Error loading local vector store {version_directory}: {str(e)}")
+                return
+            self._set_points(vectors, points["doc_ids"], points["payloads"], sparse)
+            self.vector_size = vectors.shape[1]
+            self._loaded_mtime = mtime
+            self._loaded_version = version
+            logger.info(f"Loaded {len(vectors)} points from {version_directory}")
+            return
+
+    def _maybe_reload(self) -> None:
+        """Pick up a collection saved by another process (e.g. the worker that ran the sync)"""
+        if self._write_lock.locked():
+            return
+        try:
+            mtime = os.path.getmtime(self._current_path)
+        except OSError:
+            return
+        if mtime != self._loaded_mtime:
+            self._load()
+
+    def _save(self, vectors: np.ndarray, doc_ids: List[str], payloads: List[Dict[str, Any]],
+              sparse: List[Optional[SparseVector]]) -> Tuple[str, float]:
+        version = f"{time.time_ns()}-{os.getpid()}"
+        version_directory = os.path.join(self.directory, version)
+        os.makedirs(version_directory)
+        np.save(os.path.join(version_directory, "vectors.npy"), np.ascontiguousarray(vectors, dtype=np.float32))
+        points = {
+            "doc_ids": doc_ids,
+            "payloads": payloads,
+            "sparse": [[item[0].tolist(), item[1].tolist()] if item is not None else None for item in sparse]
+        }
+        with open(os.path.join(version_directory, "points.json"), "w") as output:
+            json.dump(points, output)
+
+        # Both files are complete before CURRENT names them; the rename is atomic
+        pending = f"{self._current_path}.{version}.tmp"
+        with open(pending, "w") as output:
+            output.write(version)
+        os.replace(pending, self._current_path)
+        self._remove_old_versions(keep={version, self._loaded_version})
+        return version, os.path.getmtime(self._current_path)
+
+    def _remove_old_versions(self, keep: set) -> None:
+        """Drop superseded versions, keeping the previous one for readers that are still opening it"""
+        for entry in os.scandir(self.directory):
+            if entry.is_dir() and entry.name not in keep:
+                shutil.rmtree(entry.path, ignore_errors=True)
+
+    async def _commit(self, vectors: np.ndarray, doc_ids: List[str], payloads: List[Dict[str, Any]],
+                      sparse: List[Optional[SparseVector]]) -> None:
+        self._set_points(vectors, doc_ids, payloads, sparse)
+        self._loaded_version, self._loaded_mtime = await asyncio.to_thread(
+            self._save, vectors, doc_ids, payloads, sparse
+        )
+
+    def points(self) -> Tuple[List[str], np.ndarray, List[Dict[str, Any]], List[Optional[SparseVector]]]:
+        """Document ids, unit-length vectors, payloads and sparse vectors of every point"""
+        return self._doc_ids, self._vectors, self._payloads, self._sparse
+
+    # Collection management (QdrantService interface)
+
+    async def create_collection_if_not_exists(self, payload_indexes: bool = True, recreate: bool = False) -> None:
+        """Nothing to create: the collection is the directory, written on first upsert"""
+        if len(self._vectors) and self._vectors.shape[1] != self.vector_size:
+            logger.warning(
+                f"{self.directory} holds {self._vectors.shape[1]}-d vectors, expected {self.vector_size}; "
+                f"they are replaced on the next full sync"
+            )
+        logger.info(f"Local vector collection {self.collection_name}: {len(self._doc_ids)} points")
+
+    initialize_collection = create_collection_if_not_exists
+
+    async def ensure_payload_indexes(self) -> List[str]:
+        # Filter columns are built on first use
+        return []
+
+    async def migrate_collection_config(self) -> Dict[str, Any]:
+        return {}
+
+    point_id = staticmethod(point_id)
+
+    # Writes
+
+    async def upsert_documents(self, documents: List[Dict[str, Any]]) -> bool:
+        """Insert or update documents (dicts with doc_id or id, vector, content, metadata...)"""
+        try:
+            await self.upsert_embeddings(*documents_to_points(documents))
+            return True
+        except Exception as e:
+            logger.error(f"Error upserting documents: {str(e)}")
+            return False
+
+    async def upsert_embeddings(self, doc_ids: Sequence[str], vectors: np.ndarray,
+                                payloads: Sequence[Dict[str, Any]], batch_size: Optional[int] = None,
+                                parallelism: Optional[int] = None,
+                                sparse_vectors: Optional[Sequence[SparseVector]] = None) -> int:
+        """
+        Insert or replace points (same ids as QdrantService) and save the collection
+
+        batch_size and parallelism are accepted for interface compatibility;
+        the whole matrix is written at once.
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if len(vectors) == 0:
+            return 0
+        start_time = time.perf_counter()
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.where(norms == 0, 1, norms)
+
+        async with self._write_lock:
+            current = self._vectors
+            if current.shape[1] != vectors.shape[1]:
+                if len(current):
+                    logger.warning(f"Vector size changed to {vectors.shape[1]}; dropping {len(current)} local points")
+                self.vector_size = vectors.shape[1]
+                self._reset_points()
+                current = self._vectors
+            doc_id_list = list(self._doc_ids)
+            payload_list = list(self._payloads)
+            sparse_list = list(self._sparse)
+            rows = dict(self._rows)
+
+            # Last occurrence wins when a document appears twice in one call
+            latest = {str(doc_id): index for index, doc_id in enumerate(doc_ids)}
+            updates, appended = [], []
+            for doc_id, index in latest.items():
+                row = rows.get(point_id(doc_id))
+                if row is None:
+                    rows[point_id(doc_id)] = len(doc_id_list)
+                    doc_id_list.append(doc_id)
+                    payload_list.append(dict(payloads[index]))
+                    sparse_list.append(sparse_vectors[index] if sparse_vectors is not None else None)
+                    appended.append(index)
+                else:
+                    payload_list[row] = dict(payloads[index])
+                    sparse_list[row] = sparse_vectors[index] if sparse_vectors is not None else None
+                    updates.append((row, index))
+
+            matrix = np.empty((len(doc_id_list), vectors.shape[1]), dtype=np.float32)
+            matrix[:len(current)] = current
+            if updates:
+                targets, sources = zip(*updates)
+                matrix[list(targets)] = vectors[list(sources)]
+            if appended:
+                matrix[len(current):] = vectors[appended]
+            await self._commit(matrix, doc_id_list, payload_list, sparse_list)
+            self.vector_size = matrix.shape[1]
+
+        elapsed = time.perf_counter() - start_time
+        self.upserted_points += len(vectors)
+        self.upsert_batches += 1
+        self.upsert_seconds += elapsed
+        logger.info(f"Upserted {len(vectors)} embeddings to local store ({len(vectors) / elapsed:.0f} points/s)")
+        return len(vectors)
+
+    def reset_upsert_stats(self) -> None:
+        """Start a new count of upserted points (e.g. at the start of a sync)"""
+        self.upserted_points = 0
+        self.upsert_batches = 0
+        self.upsert_retries = 0
+        self.upsert_seconds = 0.0
+
+    def upsert_stats(self) -> Dict[str, Any]:
+        """Points written and ingest throughput since the last reset"""
+        return {
+            "points": self.upserted_points,
+            "batches": self.upsert_batches,
+            "retries": self.upsert_retries,
+            "seconds": round(self.upsert_seconds, 3),
+            "points_per_second": round(self.upserted_points / self.upsert_seconds, 1) if self.upsert_seconds else 0.0
+        }
+
+    async def delete_documents(self, document_ids: List[str]) -> bool:
+        """Delete documents by point id (or document id)"""
+        try:
+            async with self._write_lock:
+                removed = {
+                    self._rows.get(str(doc_id), self._rows.get(point_id(str(doc_id))))
+                    for doc_id in document_ids
+                } - {None}
+                keep = [row for row in range(len(self._doc_ids)) if row not in removed]
+                await self._commit(
+                    np.asarray(self._vectors[keep], dtype=np.float32),
+                    [self._doc_ids[row] for row in keep],
+                    [self._payloads[row] for row in keep],
+                    [self._sparse[row] for row in keep]
+                )
+            logger.info(f"Deleted {len(removed)} documents from local store")
+            return True
+        except Exception as e:
+            logger.error(f"Error deleting documents: {str(e)}")
+            return False
+
+    async def clear_collection(self) -> bool:
+        """Clear all documents from collection"""
+        try:
+            async with self._write_lock:
+                self._reset_points()
+                await self._commit(self._vectors, [], [], [])
+            logger.info(f"Cleared local collection: {self.collection_name}")
+            return True
+        except Exception as e:
+            logger.error(f"Error clearing collection: {str(e)}")
+            return False
+
+    # Filters
+
+    def _column(self, key: str) -> np.ndarray:
+        """Payload values of one field (dotted paths reach nested keys), cached until the next write"""
+        column = self._columns.get(key)
+        if column is None:
+            path = key.split(".")
+            values = []
+            for payload in self._payloads:
+                value = payload
+                for part in path:
+                    value = value.get(part) if isinstance(value, dict) else None
+                values.append(value)
+            column = np.empty(len(values), dtype=object)
+            column[:] = values
+            self._columns[key] = column
+        return column
+
+    def _numeric_column(self, key: str) -> np.ndarray:
+        column = self._columns.get(f"{key}#numeric")
+        if column is None:
+            column = np.array([
+                float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else np.nan
+                for value in self._column(key)
+            ], dtype=np.float64)
+            self._columns[f"{key}#numeric"] = column
+        return column
+
+    def _filter_mask(self, filters: Optional[Dict[str, Any]] = None, precio_min: Optional[float] = None,
+                     precio_max: Optional[float] = None,
+                     disponible: Optional[bool] = None) -> Optional[np.ndarray]:
+        """
+        Rows passing the filter, with QdrantService._build_filter semantics
+
+        A list matches any of its values, a dict with gt/gte/lt/lte is a
+        numeric range, anything else must match exactly. None means no filter.
+        """
+        conditions = dict(filters or {})
+        if precio_min is not None or precio_max is not None:
+            conditions["precio"] = {**(conditions.get("precio") or {}), "gte": precio_min, "lte": precio_max}
+        if disponible is not None:
+            conditions["disponible"] = disponible
+        if not conditions:
+            return None
+
+        mask = np.ones(len(self._doc_ids), dtype=bool)
+        for key, value in conditions.items():
+            if isinstance(value, dict):
+                column = self._numeric_column(key)
+                with np.errstate(invalid="ignore"):
+                    for operator, bound in value.items():
+                        if bound is None:
+                            continue
+                        if operator == "gte":
+                            mask &= column >= bound
+                        elif operator == "gt":
+                            mask &= column > bound
+                        elif operator == "lte":
+                            mask &= column <= bound
+                        elif operator == "lt":
+                            mask &= column < bound
+                        else:
+                            raise ValueError(f"Unknown range operator: {operator}")
+            elif isinstance(value, (list, tuple, set)):
+                column, accepted = self._column(key), list(value)
+                mask &= np.fromiter((item in accepted for item in column), dtype=bool, count=len(column))
+            else:
+                mask &= self._column(key) == value
+        return mask
+
+    # Search
+
+    def _dense_ranking(self, query: np.ndarray, limit: int, mask: Optional[np.ndarray]) -> List[tuple]:
+        """(row, cosine score) of the best ``limit`` rows, best first"""
+        if self._hnsw is not None and (mask is None or mask.mean() >= 0.1):
+            try:
+                return self._hnsw_ranking(query, limit, mask)
+            except RuntimeError:
+                pass  # fewer than limit matches reachable in the graph: scan instead
+        if mask is None or mask.mean() >= 0.3:
+            # Broad filter: scoring every row beats gathering most of them first
+            rows = None
+            scores = self._vectors @ query
+            if mask is not None:
+                scores[~mask] = -np.inf
+            matches = len(scores) if mask is None else int(mask.sum())
+        else:
+            rows = np.flatnonzero(mask)
+            scores = self._vectors[rows] @ query
+            matches = len(rows)
+        if matches == 0:
+            return []
+        limit = min(limit, matches)
+        top = np.argpartition(-scores, limit - 1)[:limit]
+        top = top[np.argsort(-scores[top])]
+        return [(int(rows[i]) if rows is not None else int(i), float(scores[i])) for i in top]
+
+    def _hnsw_ranking(self, query: np.ndarray, limit: int, mask: Optional[np.ndarray]) -> List[tuple]:
+        index = self._hnsw
+        index.set_ef(max(self.index_config.hnsw_ef or 64, limit))
+        labels, distances = index.knn_query(
+            query, k=min(limit, len(self._doc_ids)),
+            filter=(lambda label: bool(mask[label])) if mask is not None else None
+        )
+        # Inner-product space: distance = 1 - dot product
+        return [(int(label), 1.0 - float(distance)) for label, distance in zip(labels[0], distances[0])]
+
+    def _sparse_ranking(self, query: SparseVector, limit: int, mask: Optional[np.ndarray]) -> List[tuple]:
+        """(row, BM25 score) of the best ``limit`` rows sharing a term with the query"""
+        postings = self._build_postings()
+        scores = np.zeros(len(self._doc_ids), dtype=np.float32)
+        for index, weight in zip(*query):
+            posting = postings.get(int(index))
+            if posting is not None:
+                scores[posting[0]] += weight * posting[1]
+        matched = scores > 0
+        if mask is not None:
+            matched &= mask
+        rows = np.flatnonzero(matched)
+        if len(rows) == 0:
+            return []
+        limit = min(limit, len(rows))
+        top = rows[np.argpartition(-scores[rows], limit - 1)[:limit]]
+        top = top[np.argsort(-scores[top])]
+        return [(int(row), float(scores[row])) for row in top]
+
+    def _build_postings(self) -> Dict[int, Any]:
+        """Inverted index of the sparse vectors: token index -> (rows, weights)"""
+        if self._postings is None:
+            entries: Dict[int, List[tuple]] = {}
+            for row, item in enumerate(self._sparse):
+                if item is None:
+                    continue
+                for index, value in zip(item[0].tolist(), item[1].tolist()):
+                    entries.setdefault(index, []).append((row, value))
+            self._postings = {
+                index: (np.array([row for row, _ in pairs], dtype=np.int64),
+                        np.array([value for _, value in pairs], dtype=np.float32))
+                for index, pairs in entries.items()
+            }
+        return self._postings
+
+    def _start_hnsw_build(self) -> None:
+        """Build the HNSW graph in a thread; searches scan until it is ready"""
+        if (not self.hnsw_enabled or self._hnsw is not None or self._hnsw_task is not None
+                or len(self._doc_ids) < settings.LOCAL_VECTOR_HNSW_MIN_POINTS):
+            return
+        try:
+            import hnswlib
+        except ImportError:
+            logger.warning("LOCAL_VECTOR_HNSW=true but hnswlib is not installed; using brute-force search")
+            self.hnsw_enabled = False
+            return
+
+        vectors = self._vectors
+        config = self.index_config
+
+        def build():
+            index = hnswlib.Index(space="ip", dim=vectors.shape[1])
+            index.init_index(max_elements=len(vectors), ef_construction=config.ef_construct, M=config.m)
+            index.add_items(np.asarray(vectors), np.arange(len(vectors)))
+            return index
+
+        def done(task: asyncio.Future) -> None:
+            # Ignore graphs built from points replaced in the meantime
+            if task is self._hnsw_task and self._vectors is vectors:
+                if task.exception() is None:
+                    self._hnsw = task.result()
+                    logger.info(f"Built local HNSW index over {len(vectors)} points")
+                else:
+                    logger.error(f"Error building local HNSW index: {str(task.exception())}")
+
+        self._hnsw_task = asyncio.ensure_future(asyncio.to_thread(build))
+        self._hnsw_task.add_done_callback(done)
+
+    async def search_similar(self, query_vector: Union[np.ndarray, List[float]], limit: int = 5,
+                             filters: Optional[Dict[str, Any]] = None, precio_min: Optional[float] = None,
+                             precio_max: Optional[float] = None, disponible: Optional[bool] = None,
+                             query_text: Optional[str] = None, mode: Optional[str] = None,
+                             prefetch_limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Search for similar documents; same arguments and results as QdrantService.search_similar"""
+        try:
+            mode = mode or settings.SEARCH_MODE
+            if mode not in SEARCH_MODES:
+                raise ValueError(f"Unknown search mode: {mode}")
+            self._maybe_reload()
+            if not self._doc_ids:
+                return []
+            self._start_hnsw_build()
+            mask = self._filter_mask(filters, precio_min, precio_max, disponible)
+            query = np.asarray(query_vector, dtype=np.float32).reshape(-1)
+            query = query / (np.linalg.norm(query) or 1)
+            sparse = self._sparse_query(query_text) if mode != "dense" else None
+
+            if sparse is None or mode == "dense":
+                ranking = self._dense_ranking(query, limit, mask)
+            elif mode == "sparse":
+                ranking = self._sparse_ranking(sparse, limit, mask)
+            else:
+                candidates = max(limit, prefetch_limit or settings.HYBRID_PREFETCH_LIMIT)
+                fused: Dict[int, float] = {}
+                for side in (self._dense_ranking(query, candidates, mask),
+                             self._sparse_ranking(sparse, candidates, mask)):
+                    for rank, (row, _) in enumerate(side, start=1):
+                        fused[row] = fused.get(row, 0.0) + 1.0 / (RRF_K + rank)
+                ranking = sorted(fused.items(), key=lambda item: item[1], reverse=True)[:limit]
+
+            return [search_result(self._point_ids[row], score, self._payloads[row]) for row, score in ranking]
+
+        except Exception as e:
+            logger.error(f"Error searching documents: {str(e)}")
+            return []
+
+    def _sparse_query(self, query_text: Optional[str]) -> Optional[SparseVector]:
+        encoder = get_sparse_encoder() if query_text and self.sparse_enabled else None
+        if encoder is None or not any(item is not None for item in self._sparse):
+            return None
+        indices, values = encoder.encode_query(query_text)
+        return (indices, values) if len(indices) else None
+
+    async def get_collection_info(self) -> Dict[str, Any]:
+        """Get collection information (same keys as QdrantService.get_collection_info)"""
+        self._maybe_reload()
+        config = self.index_config
+        return {
+            'backend': 'local',
+            'name': self.collection_name,
+            'path': self.directory,
+            'vector_size': self.vector_size,
+            'points_count': len(self._doc_ids),
+            'payload_indexes': sorted(PAYLOAD_INDEXES),
+            'indexed_vectors_count': len(self._doc_ids) if self._hnsw is not None else 0,
+            'hnsw': {'m': config.m, 'ef_construct': config.ef_construct} if self.hnsw_enabled else None,
+            'on_disk': isinstance(self._vectors, np.memmap),
+            'quantization': 'none',
+            'sparse_vectors': [SPARSE_VECTOR_NAME] if any(item is not None for item in self._sparse) else [],
+            'status': 'green'
+        }
+
+    async def close(self) -> None:
+        if self._hnsw_task is not None:
+            self._hnsw_task.cancel()
@@ -0,0 +1,112 @@
+from typing import Any, Callable, Dict, Optional
+import gc
+import logging
+import os
+import threading
+import time
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def process_rss_mb() -> float:
+    """Resident set size of the current process in MB"""
+    try:
+        with open("/proc/self/statm") as statm:
+            return round(int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024, 1)
+    except (OSError, ValueError, IndexError):
+        # Non-Linux: peak RSS is the closest portable figure
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return round(peak / 1024 / (1024 if os.uname().sysname == "Darwin" else 1), 1)
+
+
+def _load_embedding_model(name: str) -> Any:
+    # EMBEDDING_BACKEND picks the runtime; both expose SentenceTransformer.encode
+    if settings.EMBEDDING_BACKEND == "onnx":
+        from app.services.onnx_embedding import load_onnx_model
+
+        return load_onnx_model(
+            name, settings.EMBEDDING_ONNX_DIR,
+            quantize=settings.EMBEDDING_ONNX_QUANTIZE,
+            intra_op_threads=settings.EMBEDDING_ONNX_THREADS
+        )
+
+    from sentence_transformers import SentenceTransformer
+
+    return SentenceTransformer(name)
+
+
+class ModelRegistry:
+    """
+    Process-wide registry of loaded models.
+
+    Each model is loaded at most once per process, on first use or through
+    preload(); every service asks the registry instead of loading its own
+    copy. Loading the models before the server forks its workers
+    (gunicorn --preload) lets them share the read-only weights copy-on-write.
+    """
+
+    def __init__(self, loader: Callable[[str], Any] = _load_embedding_model):
+        self.loader = loader
+        self._models: Dict[str, Any] = {}
+        self._load_info: Dict[str, Dict[str, Any]] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self.loaded_in_pid: Optional[int] = None
+
+    def get(self, name: str) -> Any:
+        """Return the model called ``name``, loading it on first use"""
+        model = self._models.get(name)
+        if model is not None:
+            return model
+
+        with self._lock:
+            name_lock = self._locks.setdefault(name, threading.Lock())
+        # Concurrent first calls wait for the one load instead of repeating it
+        with name_lock:
+            model = self._models.get(name)
+            if model is None:
+                rss_before = process_rss_mb()
+                start_time = time.perf_counter()
+                model = self.loader(name)
+                self._models[name] = model
+                self._load_info[name] = {
+                    "load_seconds": round(time.perf_counter() - start_time, 2),
+                    "rss_delta_mb": round(process_rss_mb() - rss_before, 1),
+                    "pid": os.getpid()
+                }
+                logger.info(f"Loaded model {name} in {self._load_info[name]['load_seconds']} s")
+        return model
+
+    def preload(self, *names: str, freeze: bool = False) -> None:
+        """
+        Load models up front
+
+        Args:
+            names: Models to load
+            freeze: Move everything allocated so far to the GC's permanent
+                generation so collections in forked workers do not touch
+                (and copy) the inherited pages
+        """
+        for name in names:
+            self.get(name)
+        self.loaded_in_pid = os.getpid()
+        if freeze:
+            gc.freeze()
+
+    def stats(self) -> Dict[str, Any]:
+        """Loaded models and the RSS of this worker"""
+        pid = os.getpid()
+        return {
+            "pid": pid,
+            "rss_mb": process_rss_mb(),
+            # True in forked workers that inherited the models from the master
+            "inherited": self.loaded_in_pid is not None and self.loaded_in_pid != pid,
+            "models": dict(self._load_info)
+        }
+
+
+# Process-wide model registry
+model_registry = ModelRegistry()
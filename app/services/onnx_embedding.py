@@ -0,0 +1,166 @@
+from typing import Any, Dict, List, Union
+import json
+import logging
+import os
+import re
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def _model_dir(base_dir: str, name: str) -> str:
+    return os.path.join(base_dir, re.sub(r"[^A-Za-z0-9_.-]+", "__", name))
+
+
+def _available_cpus() -> int:
+    # CPUs this process may run on (respects container/taskset limits, unlike cpu_count)
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def export_onnx_model(name: str, base_dir: str, quantize: bool = False) -> str:
+    """
+    Export a SentenceTransformer model to ONNX (once) and return its directory
+
+    Needs torch and sentence-transformers, so run it where those are
+    installed; serving only needs onnxruntime and transformers. The
+    tokenizer and the pooling setup of the original model are saved next to
+    model.onnx so the ONNX backend reproduces the same embeddings.
+    """
+    target = _model_dir(base_dir, name)
+    fp32_path = os.path.join(target, "model.onnx")
+    int8_path = os.path.join(target, "model.int8.onnx")
+
+    if not os.path.exists(fp32_path):
+        import torch
+        from sentence_transformers import SentenceTransformer
+        from sentence_transformers.models import Normalize, Pooling
+
+        os.makedirs(target, exist_ok=True)
+        st_model = SentenceTransformer(name, device="cpu")
+        transformer = st_model[0]
+        pooling = next(module for module in st_model if isinstance(module, Pooling))
+
+        transformer.tokenizer.save_pretrained(target)
+        with open(os.path.join(target, "pooling.json"), "w") as config:
+            json.dump({
+                "mode": "cls" if pooling.pooling_mode_cls_token else "mean",
+                "normalize": any(isinstance(module, Normalize) for module in st_model),
+                "max_seq_length": st_model.max_seq_length
+            }, config)
+
+        auto_model = transformer.auto_model.eval()
+        sample = transformer.tokenizer(["export"], return_tensors="pt")
+        input_names = [key for key in ("input_ids", "attention_mask", "token_type_ids") if key in sample]
+        dynamic_axes = {key: {0: "batch", 1: "sequence"} for key in input_names}
+        dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+
+        class _Encoder(torch.nn.Module):
+            def __init__(self, model):
+                super().__init__()
+                self.model = model
+
+            def forward(self, *inputs):
+                return self.model(**dict(zip(input_names, inputs))).last_hidden_state
+
+        with torch.no_grad():
+            torch.onnx.export(
+                _Encoder(auto_model), tuple(sample[key] for key in input_names), fp32_path,
+                input_names=input_names, output_names=["last_hidden_state"],
+                dynamic_axes=dynamic_axes, opset_version=14
+            )
+        logger.info(f"Exported {name} to {fp32_path}")
+
+    if quantize and not os.path.exists(int8_path):
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+        logger.info(f"Quantized {name} to {int8_path}")
+
+    return target
+
+
+class OnnxEmbeddingModel:
+    """
+    ONNX Runtime replacement for SentenceTransformer.encode on CPU.
+
+    Tokenization, pooling and normalization follow the exported
+    SentenceTransformer configuration, so vectors match the torch backend
+    (to ~1e-6 in fp32, ~0.99+ cosine with int8 weights).
+    """
+
+    def __init__(self, model_dir: str, quantized: bool = False, intra_op_threads: int = 0):
+        import onnxruntime
+        from transformers import AutoTokenizer
+
+        self.model_dir = model_dir
+        self.quantized = quantized
+        with open(os.path.join(model_dir, "pooling.json")) as config:
+            pooling = json.load(config)
+        self.pooling_mode = pooling["mode"]
+        self.normalize = pooling["normalize"]
+        self.max_seq_length = pooling["max_seq_length"]
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        # One inference at a time per session; parallelism comes from intra-op threads
+        options.execution_mode = onnxruntime.ExecutionMode.ORT_SEQUENTIAL
+        options.intra_op_num_threads = intra_op_threads or _available_cpus()
+        options.inter_op_num_threads = 1
+        model_file = "model.int8.onnx" if quantized else "model.onnx"
+        self.session = onnxruntime.InferenceSession(
+            os.path.join(model_dir, model_file), options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {node.name for node in self.session.get_inputs()}
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        encoded = self.tokenizer(
+            texts, padding=True, truncation=True, max_length=self.max_seq_length, return_tensors="np"
+        )
+        feeds = {name: encoded[name].astype(np.int64) for name in self.input_names if name in encoded}
+        hidden = self.session.run(None, feeds)[0]
+
+        if self.pooling_mode == "cls":
+            pooled = hidden[:, 0]
+        else:
+            mask = encoded["attention_mask"][..., None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        if self.normalize:
+            pooled = pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+        return pooled.astype(np.float32)
+
+    def encode(self, sentences: Union[str, List[str]], batch_size: int = 32, **kwargs: Any) -> np.ndarray:
+        """SentenceTransformer.encode-compatible: 1-D for a string, 2-D for a list"""
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        if not texts:
+            dimension = self.session.get_outputs()[0].shape[-1]
+            return np.zeros((0, dimension if isinstance(dimension, int) else 0), dtype=np.float32)
+
+        # Like SentenceTransformer.encode, batch texts of similar length to limit padding
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        output = None
+        for start in range(0, len(order), batch_size):
+            indices = order[start:start + batch_size]
+            vectors = self._encode_batch([texts[i] for i in indices])
+            if output is None:
+                output = np.empty((len(texts), vectors.shape[1]), dtype=np.float32)
+            output[indices] = vectors
+        return output[0] if single else output
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "backend": "onnx",
+            "quantized": self.quantized,
+            "model_dir": self.model_dir,
+            "intra_op_threads": self.session.get_session_options().intra_op_num_threads
+        }
+
+
+def load_onnx_model(name: str, base_dir: str, quantize: bool = False, intra_op_threads: int = 0) -> OnnxEmbeddingModel:
+    """Export (if needed) and open the ONNX version of ``name``"""
+    model_dir = export_onnx_model(name, base_dir, quantize=quantize)
+    return OnnxEmbeddingModel(model_dir, quantized=quantize, intra_op_threads=intra_op_threads)
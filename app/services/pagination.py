@@ -0,0 +1,150 @@
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Type
+from datetime import date, datetime
+from decimal import Decimal
+import base64
+import json
+import logging
+
+import pymysql
+from pydantic import BaseModel
+from app.database import get_pooled_connection
+from app.services.serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 1000
+STREAM_FETCH_SIZE = 500
+
+
+def encode_cursor(sort_value: Any, row_id: int) -> str:
+    """Encode the (sort column, id) of the last row of a page as an opaque cursor"""
+    if isinstance(sort_value, (datetime, date)):
+        payload = [sort_value.isoformat(), row_id]
+    elif isinstance(sort_value, Decimal):
+        # Tagged so it is not mistaken for a timestamp and keeps its exact value
+        payload = [str(sort_value), row_id, "n"]
+    else:
+        payload = [sort_value, row_id]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[Any, int]:
+    """
+    Decode a cursor produced by encode_cursor
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id, *tag = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if tag == ["n"]:
+            sort_value = Decimal(sort_value)
+        elif isinstance(sort_value, str):
+            sort_value = datetime.fromisoformat(sort_value)
+        return sort_value, int(row_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def build_page_query(table: str, sort_column: str, limit: int, cursor: Optional[str] = None,
+                     where: str = "", params: Sequence[Any] = (),
+                     descending: bool = True) -> Tuple[str, List[Any]]:
+    """
+    Build the SQL and parameters of one keyset page (see fetch_page)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    conditions = [where] if where else []
+    values = list(params)
+    comparison, direction = ("<", "DESC") if descending else (">", "ASC")
+
+    if cursor:
+        sort_value, last_id = decode_cursor(cursor)
+        conditions.append(f"({sort_column} {comparison} %s OR ({sort_column} = %s AND id {comparison} %s))")
+        values.extend([sort_value, sort_value, last_id])
+
+    where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    sql = f"""
+    SELECT * FROM {table} {where_clause}
+    ORDER BY {sort_column} {direction}, id {direction}
+    LIMIT %s
+    """
+    # Fetch one extra row to know whether another page exists
+    values.append(limit + 1)
+    return sql, values
+
+def fetch_page(table: str, sort_column: str, limit: int, cursor: Optional[str] = None,
+               where: str = "", params: Sequence[Any] = (),
+               descending: bool = True) -> Tuple[List[Dict], Optional[str]]:
+    """
+    Fetch one keyset page ordered by (sort_column, id)
+
+    Args:
+        table: Table name
+        sort_column: Column the listing is ordered by (e.g. fechaCreacion)
+        limit: Page size, capped at MAX_PAGE_SIZE
+        cursor: Cursor returned with the previous page
+        where: Optional extra filter (without WHERE keyword)
+        params: Parameters for ``where``
+        descending: Newest/highest first (default) or ascending order
+
+    Returns:
+        The page rows and the cursor for the next page (None on the last page)
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    sql, values = build_page_query(table, sort_column, limit, cursor, where, params, descending)
+
+    with get_pooled_connection() as connection:
+        with connection.cursor() as db_cursor:
+            db_cursor.execute(sql, values)
+            rows = db_cursor.fetchall()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last[sort_column], last["id"])
+    return list(rows), next_cursor
+
+
+def stream_rows(table: str, sort_column: str, where: str = "",
+                params: Sequence[Any] = ()) -> Iterator[Dict]:
+    """
+    Yield rows through an unbuffered server-side cursor (SSDictCursor)
+
+    Memory stays constant regardless of table size. The pooled connection is
+    held until the generator is exhausted or closed, so consumers must drive
+    it to completion (StreamingResponse does).
+    """
+    where_clause = f"WHERE {where}" if where else ""
+    sql = f"SELECT * FROM {table} {where_clause} ORDER BY {sort_column} DESC, id DESC"
+
+    with get_pooled_connection() as connection:
+        db_cursor = connection.cursor(pymysql.cursors.SSDictCursor)
+        completed = False
+        try:
+            db_cursor.execute(sql, params)
+            while True:
+                rows = db_cursor.fetchmany(STREAM_FETCH_SIZE)
+                if not rows:
+                    break
+                yield from rows
+            completed = True
+        finally:
+            if completed:
+                db_cursor.close()
+            else:
+                # Draining the rest of an abandoned export could take minutes;
+                # closing the connection makes the pool discard it instead
+                connection.close()
+
+
+def iter_ndjson(rows: Iterator[Dict], response_model: Type[BaseModel]) -> Iterator[bytes]:
+    """Serialize trusted rows as newline-delimited JSON, restricted to the model's fields"""
+    fields = list(response_model.model_fields)
+    for row in rows:
+        yield dumps({field: row.get(field) for field in fields}) + b"\n"
@@ -1,212 +1,575 @@
 # Si se requiere recuperar contexto desde la base vectorial antes de enviar al LLM
 
 import os
+import time
+import uuid
+import asyncio
 import logging
-from typing import List, Dict, Any, Optional
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, Sequence, Tuple, Union
 
-import anyio
-from qdrant_client import QdrantClient
-from qdrant_client.models import Filter, FieldCondition, MatchValue, SearchRequest, PointStruct, VectorParams, Distance, PointStruct
-from app.config import *
+import numpy as np
+
+from qdrant_client import AsyncQdrantClient, models
+from app.config import settings
+from app.services.sparse_encoder import SparseVector, get_sparse_encoder
 
 logger = logging.getLogger(__name__)
 
-QDRANT_HOST = os.getenv("QDRANT_HOST", "localhost")
-QDRANT_PORT = os.getenv("QDRANT_PORT", 6333)
-QDRANT_API_KEY = os.getenv("QDRANT_API_KEY")
-QDRANT_COLLECTION_NAME = os.getenv("QDRANT_COLLECTION_NAME", "sportbot_collection")
-QDRANT_ENABLED = os.getenv("QDRANT_ENABLED", "true").lower() == "true"
+QDRANT_COLLECTION_NAME = settings.QDRANT_COLLECTION_NAME
+VECTOR_SIZE = int(os.getenv("VECTOR_SIZE", settings.EMBEDDING_DIMENSION))
+# Named sparse vector holding the BM25 weights next to the unnamed dense vector
+SPARSE_VECTOR_NAME = "bm25"
+SEARCH_MODES = ("dense", "sparse", "hybrid")
 
-# Embeddings: puedes cambiar por OpenAI con una flag (ver requisitos). :contentReference[oaicite:2]{index=2}
-EMBED_MODEL = os.getenv("EMBED_MODEL", "intfloat/multilingual-e5-small")
-VECTOR_SIZE = int(os.getenv("VECTOR_SIZE", 384))
+# Payload fields used in search filters, indexed so filtering does not scan every point
+PAYLOAD_INDEXES = {
+    "tipo": models.PayloadSchemaType.KEYWORD,
+    "categoria_id": models.PayloadSchemaType.INTEGER,
+    "precio": models.PayloadSchemaType.FLOAT,
+    "disponible": models.PayloadSchemaType.BOOL
+}
 
-_client: Optional[QdrantClient] = None
 
-class QdrantService:
-    def __init__(self):
-        self.client = QdrantClient(
-            host=QDRANT_HOST,
-            port=QDRANT_PORT,
-            api_key=QDRANT_API_KEY if QDRANT_API_KEY else None
+@dataclass(frozen=True)
+class VectorIndexConfig:
+    """HNSW, storage and quantization settings of a collection (QDRANT_HNSW_*, QDRANT_ON_DISK, QDRANT_QUANTIZATION*)"""
+    m: int = 16
+    ef_construct: int = 100
+    hnsw_ef: int = 0  # search-time ef; 0 leaves the server default
+    on_disk: bool = False
+    quantization: str = "none"  # none | int8
+    rescore: bool = True
+    oversampling: float = 2.0
+
+    @classmethod
+    def from_settings(cls) -> "VectorIndexConfig":
+        return cls(
+            m=settings.QDRANT_HNSW_M,
+            ef_construct=settings.QDRANT_HNSW_EF_CONSTRUCT,
+            hnsw_ef=settings.QDRANT_HNSW_EF,
+            on_disk=settings.QDRANT_ON_DISK,
+            quantization=settings.QDRANT_QUANTIZATION,
+            rescore=settings.QDRANT_QUANTIZATION_RESCORE,
+            oversampling=settings.QDRANT_QUANTIZATION_OVERSAMPLING
         )
-        self.collection_name = QDRANT_COLLECTION_NAME
+
+    def quantization_config(self) -> Optional[models.ScalarQuantization]:
+        if self.quantization != "int8":
+            return None
+        # int8 copies stay in RAM even when the float32 originals live on disk
+        return models.ScalarQuantization(
+            scalar=models.ScalarQuantizationConfig(type=models.ScalarType.INT8, quantile=0.99, always_ram=True)
+        )
+
+    def search_params(self, exact: bool = False) -> Optional[models.SearchParams]:
+        """Search-time parameters; exact=True bypasses the index (ground truth for recall)"""
+        if exact:
+            return models.SearchParams(exact=True)
+        quantization = None
+        if self.quantization == "int8":
+            quantization = models.QuantizationSearchParams(rescore=self.rescore, oversampling=self.oversampling)
+        if not self.hnsw_ef and quantization is None:
+            return None
+        return models.SearchParams(hnsw_ef=self.hnsw_ef or None, quantization=quantization)
+
+
+def point_id(doc_id: str) -> str:
+    """Stable point id for a document id such as "producto_12" (same in every backend)"""
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, doc_id))
+
+
+def as_point_id(doc_id: str) -> str:
+    """doc_id unchanged when it already is a point id (a UUID), else point_id(doc_id)"""
+    try:
+        return str(uuid.UUID(str(doc_id)))
+    except ValueError:
+        return point_id(str(doc_id))
+
+
+def documents_to_points(documents: List[Dict[str, Any]]) -> Tuple[List[str], np.ndarray, List[Dict[str, Any]]]:
+    """Document ids, float32 matrix and payloads of upsert_documents() input"""
+    payloads = [
+        {
+            'content': doc.get('content', ''),
+            'metadata': doc.get('metadata', {}),
+            'tipo': doc.get('tipo', 'producto'),
+            'categoria_id': doc.get('categoria_id'),
+            'precio': doc.get('precio'),
+            'disponible': doc.get('disponible', True)
+        }
+        for doc in documents
+    ]
+    doc_ids = [
+        str(doc['doc_id']) if 'doc_id' in doc else f"{doc.get('tipo', 'producto')}_{doc['id']}"
+        for doc in documents
+    ]
+    vectors = np.array([doc['vector'] for doc in documents], dtype=np.float32).reshape(len(documents), -1)
+    return doc_ids, vectors, payloads
+
+
+def search_result(point: Any, score: float, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """One search_similar() hit"""
+    return {
+        'id': point,
+        'score': score,
+        'content': payload.get('content', ''),
+        'metadata': payload.get('metadata', {}),
+        'tipo': payload.get('tipo', 'producto'),
+        'categoria_id': payload.get('categoria_id'),
+        'precio': payload.get('precio'),
+        'disponible': payload.get('disponible', True)
+    }
+
+
+def create_qdrant_client() -> AsyncQdrantClient:
+    """Async client for the configured Qdrant (server, or embedded with QDRANT_LOCATION)"""
+    if settings.QDRANT_LOCATION == ":memory:":
+        return AsyncQdrantClient(location=":memory:")
+    if settings.QDRANT_LOCATION:
+        return AsyncQdrantClient(path=settings.QDRANT_LOCATION)
+    return AsyncQdrantClient(
+        host=settings.QDRANT_HOST,
+        port=settings.QDRANT_PORT,
+        grpc_port=settings.QDRANT_GRPC_PORT,
+        prefer_grpc=settings.QDRANT_PREFER_GRPC,
+        api_key=settings.QDRANT_API_KEY or None,
+        timeout=settings.QDRANT_TIMEOUT
+    )
+
+
+class QdrantService:
+    """
+    Async access to the vector collection.
+
+    Every call awaits the AsyncQdrantClient (HTTP or gRPC), so searches and
+    upserts never block the event loop. Use the shared instance from
+    get_qdrant_service(); the client keeps its connections open between calls.
+
+    Read and delete helpers log errors and return an empty result; with
+    ``raise_errors`` they raise instead, so a caller such as
+    FailoverVectorService can tell "Qdrant is down" from "no results".
+    """
+
+    def __init__(self, client: Optional[AsyncQdrantClient] = None, collection_name: str = QDRANT_COLLECTION_NAME,
+                 index_config: Optional[VectorIndexConfig] = None, raise_errors: bool = False):
+        self.client = client or create_qdrant_client()
+        self.raise_errors = raise_errors
+        self.collection_name = collection_name
         self.vector_size = VECTOR_SIZE
+        self.index_config = index_config or VectorIndexConfig.from_settings()
+        # Whether the collection has the sparse vector; checked by create_collection_if_not_exists
+        self.sparse_enabled = settings.HYBRID_SEARCH_ENABLED
+        self.reset_upsert_stats()
+
+    async def create_collection_if_not_exists(self, payload_indexes: bool = True, recreate: bool = False) -> None:
+        """
+        Create collection if it doesn't exist, with the configured index settings
 
-    def create_collection_if_not_exists(self):
-        """Create collection if it doesn't exist"""
+        An existing collection is migrated to the current VectorIndexConfig
+        (see migrate_collection_config), and any missing payload index is added.
+        A sparse vector cannot be added to an existing collection: without
+        ``recreate`` such a collection stays dense-only, with it (full
+        re-index) the collection is dropped and created again.
+        """
         try:
-            collections = self.client.get_collections()
-            collection_names = [col.name for col in collections.collections]
+            config = self.index_config
+            exists = await self.client.collection_exists(self.collection_name)
+            if exists and settings.HYBRID_SEARCH_ENABLED:
+                info = await self.client.get_collection(self.collection_name)
+                self.sparse_enabled = SPARSE_VECTOR_NAME in (info.config.params.sparse_vectors or {})
+                if not self.sparse_enabled:
+                    if recreate:
+                        logger.warning(f"Recreating {self.collection_name} to add the {SPARSE_VECTOR_NAME} sparse vector")
+                        await self.client.delete_collection(self.collection_name)
+                        exists = False
+                    else:
+                        logger.warning(f"{self.collection_name} has no sparse vector; hybrid search needs a full re-index")
 
-            if self.collection_name not in collection_names:
-                self.client.create_collection(
+            if not exists:
+                await self.client.create_collection(
                     collection_name=self.collection_name,
-                    vectors_config=VectorParams(
+                    vectors_config=models.VectorParams(
                         size=self.vector_size,
-                        distance=Distance.COSINE
-                    )
+                        distance=models.Distance.COSINE,
+                        on_disk=config.on_disk
+                    ),
+                    sparse_vectors_config={SPARSE_VECTOR_NAME: models.SparseVectorParams()}
+                    if settings.HYBRID_SEARCH_ENABLED else None,
+                    hnsw_config=models.HnswConfigDiff(m=config.m, ef_construct=config.ef_construct),
+                    quantization_config=config.quantization_config()
                 )
+                self.sparse_enabled = settings.HYBRID_SEARCH_ENABLED
                 logger.info(f"Created collection: {self.collection_name}")
             else:
                 logger.info(f"Collection {self.collection_name} already exists")
+                await self.migrate_collection_config()
+            if payload_indexes:
+                await self.ensure_payload_indexes()
         except Exception as e:
             logger.error(f"Error creating collection: {str(e)}")
             raise
-        
-    def initialize_collection(self):
-        """Create collection if it doesn't exist"""
-        try:
-            collections = self.client.get_collections()
-            collection_names = [col.name for col in collections.collections]
-            
-            if self.collection_name not in collection_names:
-                self.client.create_collection(
-                    collection_name=self.collection_name,
-                    vectors_config=VectorParams(
-                        size=self.vector_size,
-                        distance=Distance.COSINE
-                    )
+
+    async def migrate_collection_config(self) -> Dict[str, Any]:
+        """
+        Bring an existing collection in line with index_config
+
+        Only the settings that differ are sent; Qdrant rebuilds the HNSW
+        graph / quantized copies in the background while the collection
+        keeps serving.
+
+        Returns:
+            The settings that changed (empty when already up to date)
+        """
+        config = self.index_config
+        params = (await self.client.get_collection(self.collection_name)).config
+        changes: Dict[str, Any] = {}
+
+        if params.hnsw_config.m != config.m or params.hnsw_config.ef_construct != config.ef_construct:
+            changes["hnsw_config"] = models.HnswConfigDiff(m=config.m, ef_construct=config.ef_construct)
+        if bool(params.params.vectors.on_disk) != config.on_disk:
+            # "" addresses the collection's single unnamed vector
+            changes["vectors_config"] = {"": models.VectorParamsDiff(on_disk=config.on_disk)}
+        quantized = isinstance(params.quantization_config, models.ScalarQuantization)
+        if quantized != (config.quantization == "int8"):
+            changes["quantization_config"] = config.quantization_config() or models.Disabled.DISABLED
+
+        if changes:
+            await self.client.update_collection(collection_name=self.collection_name, **changes)
+            logger.info(f"Migrated {self.collection_name} config: {', '.join(changes)}")
+        return changes
+
+    async def ensure_payload_indexes(self) -> List[str]:
+        """
+        Create the PAYLOAD_INDEXES missing from the collection
+
+        Safe to run on every startup: existing collections get the indexes
+        they lack and nothing else changes.
+
+        Returns:
+            Fields that were indexed now
+        """
+        info = await self.client.get_collection(self.collection_name)
+        existing = info.payload_schema or {}
+        created = []
+        for field, schema in PAYLOAD_INDEXES.items():
+            if field not in existing:
+                await self.client.create_payload_index(
+                    collection_name=self.collection_name, field_name=field, field_schema=schema, wait=True
                 )
-                logger.info(f"Created collection: {self.collection_name}")
-            else:
-                logger.info(f"Collection {self.collection_name} already exists")
-                
-        except Exception as e:
-            logger.error(f"Error initializing collection: {str(e)}")
-            raise
-    
-    def upsert_documents(self, documents: List[Dict[str, Any]]) -> bool:
-        """Insert or update documents in Qdrant"""
+                created.append(field)
+        if created:
+            logger.info(f"Created payload indexes on {self.collection_name}: {', '.join(created)}")
+        return created
+
+    # Kept for older callers
+    initialize_collection = create_collection_if_not_exists
+
+    async def upsert_documents(self, documents: List[Dict[str, Any]]) -> bool:
+        """
+        Insert or update documents (dicts with doc_id or id, vector, content, metadata...)
+
+        Point ids derive from the document id (see point_id), so writing the
+        same document again replaces its point instead of adding another.
+        """
         try:
-            points = []
-            for doc in documents:
-                point = PointStruct(
-                    id=str(uuid.uuid4()) if 'id' not in doc else str(doc['id']),
-                    vector=doc['vector'],
-                    payload={
-                        'content': doc.get('content', ''),
-                        'metadata': doc.get('metadata', {}),
-                        'tipo': doc.get('tipo', 'producto'),
-                        'categoria_id': doc.get('categoria_id'),
-                        'precio': doc.get('precio'),
-                        'disponible': doc.get('disponible', True)
-                    }
-                )
-                points.append(point)
-            
-            self.client.upsert(
-                collection_name=self.collection_name,
-                points=points
-            )
-            
-            logger.info(f"Upserted {len(points)} documents to Qdrant")
+            await self.upsert_embeddings(*documents_to_points(documents))
             return True
-            
+
         except Exception as e:
             logger.error(f"Error upserting documents: {str(e)}")
+            if self.raise_errors:
+                raise
             return False
-    
-    def search_similar(self, query_vector: List[float], limit: int = 5, 
-                      filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
-        """Search for similar documents"""
+
+    point_id = staticmethod(point_id)
+
+    async def upsert_embeddings(self, doc_ids: Sequence[str], vectors: np.ndarray,
+                                payloads: Sequence[Dict[str, Any]], batch_size: Optional[int] = None,
+                                parallelism: Optional[int] = None,
+                                sparse_vectors: Optional[Sequence[SparseVector]] = None) -> int:
+        """
+        Upsert a float32 embedding matrix, one row per document, plus optional
+        BM25 sparse vectors (see BM25SparseEncoder.encode_documents)
+
+        Points are sent in chunks of ``batch_size`` (QDRANT_UPSERT_BATCH_SIZE)
+        with up to ``parallelism`` (QDRANT_UPSERT_PARALLELISM) requests in
+        flight; a failed chunk is retried with backoff before the upsert
+        fails. The matrix stays a numpy array; only the chunk being sent is
+        converted for the wire.
+
+        Returns:
+            Number of points written
+        """
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if len(vectors) == 0:
+            return 0
+        batch_size = batch_size or settings.QDRANT_UPSERT_BATCH_SIZE
+        semaphore = asyncio.Semaphore(parallelism or settings.QDRANT_UPSERT_PARALLELISM)
+        ids = [self.point_id(doc_id) for doc_id in doc_ids]
+        payloads = list(payloads)
+
+        if not self.sparse_enabled:
+            sparse_vectors = None
+
+        def batch_vectors(start: int, end: int) -> Any:
+            dense = vectors[start:end].tolist()
+            if sparse_vectors is None:
+                return dense
+            # "" is the collection's unnamed dense vector
+            return {"": dense, SPARSE_VECTOR_NAME: [
+                models.SparseVector(indices=indices.tolist(), values=values.tolist())
+                for indices, values in sparse_vectors[start:end]
+            ]}
+
+        async def upload(start: int) -> None:
+            end = start + batch_size
+            async with semaphore:
+                await self._upsert_with_retries(models.Batch(
+                    ids=ids[start:end], vectors=batch_vectors(start, end), payloads=payloads[start:end]
+                ))
+
+        start_time = time.perf_counter()
+        chunks = [asyncio.ensure_future(upload(start)) for start in range(0, len(vectors), batch_size)]
         try:
-            search_filter = None
-            if filters:
-                conditions = []
-                for key, value in filters.items():
-                    if isinstance(value, list):
-                        conditions.append(
-                            models.FieldCondition(
-                                key=key,
-                                match=models.MatchAny(any=value)
-                            )
-                        )
-                    else:
-                        conditions.append(
-                            models.FieldCondition(
-                                key=key,
-                                match=models.MatchValue(value=value)
-                            )
-                        )
-                
-                if conditions:
-                    search_filter = models.Filter(must=conditions)
-            
-            results = self.client.search(
-                collection_name=self.collection_name,
-                query_vector=query_vector,
-                limit=limit,
-                query_filter=search_filter,
-                with_payload=True
-            )
-            
-            documents = []
-            for result in results:
-                doc = {
-                    'id': result.id,
-                    'score': result.score,
-                    'content': result.payload.get('content', ''),
-                    'metadata': result.payload.get('metadata', {}),
-                    'tipo': result.payload.get('tipo', 'producto'),
-                    'categoria_id': result.payload.get('categoria_id'),
-                    'precio': result.payload.get('precio'),
-                    'disponible': result.payload.get('disponible', True)
-                }
-                documents.append(doc)
-            
-            return documents
-            
+            await asyncio.gather(*chunks)
+        except Exception:
+            for chunk in chunks:
+                chunk.cancel()
+            raise
+        elapsed = time.perf_counter() - start_time
+
+        self.upserted_points += len(vectors)
+        self.upsert_batches += len(chunks)
+        self.upsert_seconds += elapsed
+        logger.info(f"Upserted {len(vectors)} embeddings to Qdrant ({len(vectors) / elapsed:.0f} points/s)")
+        return len(vectors)
+
+    async def _upsert_with_retries(self, batch: models.Batch) -> None:
+        max_retries = settings.QDRANT_UPSERT_MAX_RETRIES
+        for attempt in range(1, max_retries + 1):
+            try:
+                await self.client.upsert(collection_name=self.collection_name, points=batch, wait=True)
+                return
+            except Exception as e:
+                if attempt == max_retries:
+                    raise
+                self.upsert_retries += 1
+                logger.warning(f"Upsert of {len(batch.ids)} points failed (attempt {attempt}): {str(e)}")
+                await asyncio.sleep(min(2 ** attempt * 0.1, 5.0))
+
+    def reset_upsert_stats(self) -> None:
+        """Start a new count of upserted points (e.g. at the start of a sync)"""
+        self.upserted_points = 0
+        self.upsert_batches = 0
+        self.upsert_retries = 0
+        self.upsert_seconds = 0.0
+
+    def upsert_stats(self) -> Dict[str, Any]:
+        """Points written and ingest throughput since the last reset"""
+        return {
+            "points": self.upserted_points,
+            "batches": self.upsert_batches,
+            "retries": self.upsert_retries,
+            "seconds": round(self.upsert_seconds, 3),
+            "points_per_second": round(self.upserted_points / self.upsert_seconds, 1) if self.upsert_seconds else 0.0
+        }
+
+    @staticmethod
+    def _build_filter(filters: Optional[Dict[str, Any]] = None, precio_min: Optional[float] = None,
+                      precio_max: Optional[float] = None, disponible: Optional[bool] = None) -> Optional[models.Filter]:
+        """
+        Must-filter from a {field: condition} dict and the shortcut arguments
+
+        A list matches any of its values, a dict with gt/gte/lt/lte is a
+        numeric range, anything else must match exactly.
+        """
+        conditions = []
+        for key, value in (filters or {}).items():
+            if isinstance(value, (list, tuple, set)):
+                conditions.append(models.FieldCondition(key=key, match=models.MatchAny(any=list(value))))
+            elif isinstance(value, dict):
+                conditions.append(models.FieldCondition(key=key, range=models.Range(**value)))
+            else:
+                conditions.append(models.FieldCondition(key=key, match=models.MatchValue(value=value)))
+        if precio_min is not None or precio_max is not None:
+            conditions.append(models.FieldCondition(key="precio", range=models.Range(gte=precio_min, lte=precio_max)))
+        if disponible is not None:
+            conditions.append(models.FieldCondition(key="disponible", match=models.MatchValue(value=disponible)))
+        return models.Filter(must=conditions) if conditions else None
+
+    async def search_similar(self, query_vector: Union[np.ndarray, List[float]], limit: int = 5,
+                             filters: Optional[Dict[str, Any]] = None, precio_min: Optional[float] = None,
+                             precio_max: Optional[float] = None, disponible: Optional[bool] = None,
+                             query_text: Optional[str] = None, mode: Optional[str] = None,
+                             prefetch_limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Search for similar documents
+
+        Args:
+            query_vector: Query embedding
+            limit: Maximum number of results
+            filters: Payload conditions, e.g. {"tipo": "producto", "categoria_id": [1, 4],
+                "precio": {"gte": 20, "lte": 80}}
+            precio_min: Minimum price (inclusive)
+            precio_max: Maximum price (inclusive)
+            disponible: Only available (True) or unavailable (False) documents
+            query_text: Raw query, needed for the BM25 (sparse) side
+            mode: dense, sparse or hybrid (default SEARCH_MODE); hybrid runs
+                both searches as prefetches of one query and fuses them with
+                reciprocal rank fusion. Falls back to dense without query_text,
+                sparse vector or fitted encoder.
+            prefetch_limit: Candidates per side before fusion (default HYBRID_PREFETCH_LIMIT)
+        """
+        try:
+            mode = mode or settings.SEARCH_MODE
+            if mode not in SEARCH_MODES:
+                raise ValueError(f"Unknown search mode: {mode}")
+            query_filter = self._build_filter(filters, precio_min, precio_max, disponible)
+            dense = np.asarray(query_vector, dtype=np.float32).tolist()
+            sparse = self._sparse_query(query_text) if mode != "dense" else None
+
+            if sparse is None or mode == "dense":
+                response = await self.client.query_points(
+                    collection_name=self.collection_name,
+                    query=dense,
+                    limit=limit,
+                    query_filter=query_filter,
+                    search_params=self.index_config.search_params(),
+                    with_payload=True
+                )
+            elif mode == "sparse":
+                response = await self.client.query_points(
+                    collection_name=self.collection_name,
+                    query=sparse,
+                    using=SPARSE_VECTOR_NAME,
+                    limit=limit,
+                    query_filter=query_filter,
+                    with_payload=True
+                )
+            else:
+                candidates = max(limit, prefetch_limit or settings.HYBRID_PREFETCH_LIMIT)
+                response = await self.client.query_points(
+                    collection_name=self.collection_name,
+                    prefetch=[
+                        models.Prefetch(
+                            query=dense, filter=query_filter, limit=candidates,
+                            params=self.index_config.search_params()
+                        ),
+                        models.Prefetch(query=sparse, using=SPARSE_VECTOR_NAME, filter=query_filter, limit=candidates)
+                    ],
+                    query=models.FusionQuery(fusion=models.Fusion.RRF),
+                    limit=limit,
+                    with_payload=True
+                )
+
+            return [search_result(result.id, result.score, result.payload) for result in response.points]
+
         except Exception as e:
             logger.error(f"Error searching documents: {str(e)}")
+            if self.raise_errors:
+                raise
             return []
-    
-    def delete_documents(self, document_ids: List[str]) -> bool:
-        """Delete documents by IDs"""
+
+    def _sparse_query(self, query_text: Optional[str]) -> Optional[models.SparseVector]:
+        encoder = get_sparse_encoder() if query_text and self.sparse_enabled else None
+        if encoder is None:
+            return None
+        indices, values = encoder.encode_query(query_text)
+        if not len(indices):
+            return None
+        return models.SparseVector(indices=indices.tolist(), values=values.tolist())
+
+    async def delete_documents(self, document_ids: List[str]) -> bool:
+        """Delete documents by point id (or document id, mapped through point_id)"""
         try:
-            self.client.delete(
+            await self.client.delete(
                 collection_name=self.collection_name,
-                points_selector=models.PointIdsList(
-                    points=document_ids
-                )
+                points_selector=models.PointIdsList(points=[as_point_id(doc_id) for doc_id in document_ids])
             )
-            
+
             logger.info(f"Deleted {len(document_ids)} documents from Qdrant")
             return True
-            
+
         except Exception as e:
             logger.error(f"Error deleting documents: {str(e)}")
+            if self.raise_errors:
+                raise
             return False
-    
-    def get_collection_info(self) -> Dict[str, Any]:
+
+    async def get_collection_info(self) -> Dict[str, Any]:
         """Get collection information"""
         try:
-            info = self.client.get_collection(self.collection_name)
+            info = await self.client.get_collection(self.collection_name)
             return {
+                'backend': 'qdrant',
                 'name': self.collection_name,
-                'vectors_count': info.config.params.vectors.size,
+                'vector_size': info.config.params.vectors.size,
                 'points_count': info.points_count,
+                'payload_indexes': sorted(info.payload_schema or {}),
+                'indexed_vectors_count': info.indexed_vectors_count,
+                'hnsw': {'m': info.config.hnsw_config.m, 'ef_construct': info.config.hnsw_config.ef_construct},
+                'on_disk': bool(info.config.params.vectors.on_disk),
+                'quantization': 'int8' if info.config.quantization_config else 'none',
+                'sparse_vectors': sorted(info.config.params.sparse_vectors or {}),
                 'status': info.status
             }
         except Exception as e:
             logger.error(f"Error getting collection info: {str(e)}")
+            if self.raise_errors:
+                raise
             return {}
-    
-    def clear_collection(self) -> bool:
+
+    async def clear_collection(self) -> bool:
         """Clear all documents from collection"""
         try:
-            self.client.delete(
+            await self.client.delete(
                 collection_name=self.collection_name,
-                points_selector=models.FilterSelector(
-                    filter=models.Filter(
-                        must=[
-                            models.HasIdCondition(has_id=[])
-                        ]
-                    )
-                )
+                points_selector=models.FilterSelector(filter=models.Filter(must=[]))
             )
             logger.info(f"Cleared collection: {self.collection_name}")
             return True
         except Exception as e:
             logger.error(f"Error clearing collection: {str(e)}")
+            if self.raise_errors:
+                raise
             return False
+
+    async def close(self) -> None:
+        await self.client.close()
+
+
+_qdrant_service: Optional[QdrantService] = None
+
+
+def create_vector_service():
+    """
+    Vector backend selected by VECTOR_BACKEND
+
+    qdrant: QdrantService, behind FailoverVectorService (local replica plus
+    circuit breaker) when VECTOR_FAILOVER_ENABLED. local: LocalVectorStore
+    only, for development and tests without a Qdrant server.
+    """
+    if settings.VECTOR_BACKEND == "local":
+        from app.services.local_vectors import LocalVectorStore
+        return LocalVectorStore()
+    if settings.VECTOR_FAILOVER_ENABLED:
+        from app.services.local_vectors import LocalVectorStore
+        from app.services.vector_failover import FailoverVectorService
+        return FailoverVectorService(QdrantService(raise_errors=True), LocalVectorStore())
+    return QdrantService()
+
+
+def get_qdrant_service() -> QdrantService:
+    """Shared vector service (one client and connection pool per process), see create_vector_service"""
+    global _qdrant_service
+    if _qdrant_service is None:
+        _qdrant_service = create_vector_service()
+    return _qdrant_service
+
+async def close_qdrant_service() -> None:
+    """Close the shared client's connections"""
+    global _qdrant_service
+    if _qdrant_service is not None:
+        await _qdrant_service.close()
+        _qdrant_service = None
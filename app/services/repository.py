@@ -0,0 +1,21 @@
+from typing import Any, Dict, List, Optional, Sequence
+import logging
+
+from app.database import get_async_pooled_connection
+
+logger = logging.getLogger(__name__)
+
+
+async def fetch_all(sql: str, params: Optional[Sequence[Any]] = None) -> List[Dict]:
+    """Run a query on the async pool and return every row"""
+    async with get_async_pooled_connection() as connection:
+        async with connection.cursor() as cursor:
+            await cursor.execute(sql, params)
+            return await cursor.fetchall()
+
+async def fetch_one(sql: str, params: Optional[Sequence[Any]] = None) -> Optional[Dict]:
+    """Run a query on the async pool and return the first row"""
+    async with get_async_pooled_connection() as connection:
+        async with connection.cursor() as cursor:
+            await cursor.execute(sql, params)
+            return await cursor.fetchone()
@@ -0,0 +1,36 @@
+from typing import Any, Dict, Iterable, List, Type
+from decimal import Decimal
+
+import orjson
+from pydantic import BaseModel
+from fastapi.responses import JSONResponse
+
+
+def _default(obj: Any) -> Any:
+    # Mirrors Pydantic's JSON mode: Decimal as string, models as their fields
+    if isinstance(obj, Decimal):
+        return str(obj)
+    if isinstance(obj, BaseModel):
+        return obj.__dict__
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+def dumps(content: Any) -> bytes:
+    """Serialize trusted content with orjson"""
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    orjson-backed JSON response for trusted payloads.
+
+    Returning it from a route bypasses FastAPI's response_model validation,
+    so it is only used for data read straight from the database.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def construct_models(rows: Iterable[Dict], model: Type[BaseModel]) -> List[BaseModel]:
+    """Build response models from database rows without re-validating them"""
+    return [model.model_construct(**row) for row in rows]
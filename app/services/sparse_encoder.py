@@ -0,0 +1,172 @@
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+import threading
+import unicodedata
+from collections import Counter
+
+import numpy as np
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Words too common in the catalog texts to help ranking
+STOPWORDS = frozenset(
+    "a al con de del el en es la las lo los no o para por que se si sin su un una y "
+    "producto descripcion categoria precio disponible".split()
+)
+_TOKEN = re.compile(r"[a-z0-9]+(?:[-./][a-z0-9]+)*")
+
+SparseVector = Tuple[np.ndarray, np.ndarray]
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercased, accent-free tokens; compound tokens such as SKUs ("tkd-001")
+    are kept whole and also split into their parts
+    """
+    folded = unicodedata.normalize("NFKD", text.lower())
+    folded = "".join(char for char in folded if not unicodedata.combining(char))
+    tokens = []
+    for token in _TOKEN.findall(folded):
+        if token in STOPWORDS:
+            continue
+        tokens.append(token)
+        if not token.isalnum():
+            tokens.extend(part for part in re.split(r"[-./]", token) if part and part not in STOPWORDS)
+    return tokens
+
+
+def token_index(token: str) -> int:
+    """Stable 32-bit sparse dimension for a token (independent of the vocabulary)"""
+    return int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=4).digest(), "little")
+
+
+class BM25SparseEncoder:
+    """
+    BM25 term weights as sparse vectors.
+
+    Documents get the BM25 term-frequency part of the score and queries the
+    IDF of their terms, so the dot product Qdrant computes between them is
+    the document's BM25 score. Statistics come from the catalog texts passed
+    to fit(); token dimensions are hashes, so points written with an older
+    fit stay comparable after a refit.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.document_count = 0
+        self.average_length = 0.0
+        self.document_frequency: Dict[str, int] = {}
+
+    def fit(self, documents: Iterable[str]) -> "BM25SparseEncoder":
+        frequency: Counter = Counter()
+        total_length = 0
+        count = 0
+        for document in documents:
+            tokens = tokenize(document)
+            frequency.update(set(tokens))
+            total_length += len(tokens)
+            count += 1
+        self.document_count = count
+        self.average_length = total_length / count if count else 0.0
+        self.document_frequency = dict(frequency)
+        return self
+
+    def idf(self, token: str) -> float:
+        frequency = self.document_frequency.get(token, 0)
+        return math.log(1 + (self.document_count - frequency + 0.5) / (frequency + 0.5))
+
+    @staticmethod
+    def _vector(weights: Dict[int, float]) -> SparseVector:
+        indices = np.fromiter(weights.keys(), dtype=np.uint32, count=len(weights))
+        values = np.fromiter(weights.values(), dtype=np.float32, count=len(weights))
+        return indices, values
+
+    def encode_document(self, document: str) -> SparseVector:
+        tokens = tokenize(document)
+        norm = self.k1 * (1 - self.b + self.b * len(tokens) / (self.average_length or 1))
+        weights: Dict[int, float] = {}
+        for token, frequency in Counter(tokens).items():
+            weights[token_index(token)] = frequency * (self.k1 + 1) / (frequency + norm)
+        return self._vector(weights)
+
+    def encode_documents(self, documents: Iterable[str]) -> List[SparseVector]:
+        return [self.encode_document(document) for document in documents]
+
+    def encode_query(self, query: str) -> SparseVector:
+        return self._vector({token_index(token): self.idf(token) for token in set(tokenize(query))})
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "k1": self.k1,
+            "b": self.b,
+            "document_count": self.document_count,
+            "average_length": self.average_length,
+            "document_frequency": self.document_frequency
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "BM25SparseEncoder":
+        encoder = cls(k1=data["k1"], b=data["b"])
+        encoder.document_count = data["document_count"]
+        encoder.average_length = data["average_length"]
+        encoder.document_frequency = data["document_frequency"]
+        return encoder
+
+    def save(self, path: str) -> None:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Write-then-rename so other workers never read a half-written file
+        temporary = f"{path}.tmp"
+        with open(temporary, "w") as output:
+            json.dump(self.to_dict(), output)
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path: str) -> "BM25SparseEncoder":
+        with open(path) as source:
+            return cls.from_dict(json.load(source))
+
+
+_encoder: Optional[BM25SparseEncoder] = None
+_encoder_mtime: Optional[float] = None
+_encoder_lock = threading.Lock()
+
+
+def get_sparse_encoder() -> Optional[BM25SparseEncoder]:
+    """
+    The catalog's BM25 encoder, as last saved by DataSyncService
+
+    Reloaded when the file changes, so every worker picks up a new sync;
+    None until the first sync has written it.
+    """
+    global _encoder, _encoder_mtime
+    path = settings.SPARSE_ENCODER_PATH
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return _encoder
+    with _encoder_lock:
+        if mtime != _encoder_mtime:
+            try:
+                _encoder = BM25SparseEncoder.load(path)
+                _encoder_mtime = mtime
+            except (OSError, ValueError, KeyError) as e:
+                logger.error(f"Error loading sparse encoder: {str(e)}")
+        return _encoder
+
+def save_sparse_encoder(encoder: BM25SparseEncoder) -> None:
+    """Persist a freshly fitted encoder and make it current in this process"""
+    global _encoder, _encoder_mtime
+    with _encoder_lock:
+        encoder.save(settings.SPARSE_ENCODER_PATH)
+        _encoder = encoder
+        _encoder_mtime = os.path.getmtime(settings.SPARSE_ENCODER_PATH)
@@ -0,0 +1,275 @@
+# Conmutación automática a la réplica local cuando Qdrant no responde
+
+import time
+import asyncio
+import logging
+from typing import List, Dict, Any, Optional, Sequence
+
+import numpy as np
+
+from app.config import settings
+from app.services.local_vectors import LocalVectorStore
+from app.services.qdrant import QdrantService, as_point_id, documents_to_points
+from app.services.sparse_encoder import SparseVector
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """
+    Closed / open / half-open breaker around calls to one backend
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    allow_request() refuses calls for ``reset_timeout`` seconds; then a
+    single probe call is let through (half-open). Its success closes the
+    circuit, its failure opens it for another period.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trips = 0
+
+    def allow_request(self) -> bool:
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self.state = self.HALF_OPEN
+            return True
+        return False
+
+    def record_success(self) -> bool:
+        """Returns True when this success closed an open circuit"""
+        recovered = self.state != self.CLOSED
+        self.state = self.CLOSED
+        self.failures = 0
+        return recovered
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.trips += 1
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"state": self.state, "failures": self.failures, "trips": self.trips}
+
+
+class BackendUnavailable(Exception):
+    """The circuit is open: the primary backend is not called"""
+
+
+class FailoverVectorService:
+    """
+    QdrantService with a LocalVectorStore replica behind a circuit breaker.
+
+    Every write goes to both backends, so the replica can answer on its
+    own. Reads go to Qdrant while the circuit is closed; failed or refused
+    calls are answered by the replica (degraded mode) instead of returning
+    nothing. Writes that Qdrant missed mark it stale: once it answers
+    again, the missed clear (if any) and deletes (kept as tombstones) are
+    replayed, then the replica's points, before reads switch back.
+
+    Attributes not defined here (client, index_config...) are Qdrant's.
+    """
+
+    def __init__(self, primary: QdrantService, fallback: LocalVectorStore,
+                 breaker: Optional[CircuitBreaker] = None):
+        self.primary = primary
+        self.fallback = fallback
+        self.breaker = breaker or CircuitBreaker(
+            settings.VECTOR_FAILOVER_THRESHOLD, settings.VECTOR_FAILOVER_RESET_SECONDS
+        )
+        self.stale = False
+        self.failovers = 0
+        self._resync_task: Optional[asyncio.Future] = None
+        # What Qdrant missed besides upserts (those are replayed from the replica)
+        self._pending_clear = False
+        self._pending_deletes: set = set()
+        # Bumped by every write Qdrant missed; a resync only clears ``stale``
+        # if none happened while it ran
+        self._missed_writes = 0
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.primary, name)
+
+    @property
+    def degraded(self) -> bool:
+        """Reads are being served by the local replica"""
+        return self.stale or self.breaker.state != CircuitBreaker.CLOSED
+
+    async def _call_primary(self, method: str, *args, **kwargs) -> Any:
+        if not self.breaker.allow_request():
+            raise BackendUnavailable(f"Qdrant circuit is {self.breaker.state}")
+        try:
+            result = await getattr(self.primary, method)(*args, **kwargs)
+        except Exception as e:
+            self.breaker.record_failure()
+            if self.breaker.state == CircuitBreaker.OPEN:
+                logger.warning(f"Qdrant unavailable ({str(e)}); serving from the local replica")
+            raise
+        if self.breaker.record_success():
+            logger.info("Qdrant reachable again; circuit closed")
+        return result
+
+    async def _read(self, method: str, *args, **kwargs) -> Any:
+        """Qdrant when healthy and up to date, otherwise the replica"""
+        if self.stale:
+            self._start_resync()
+        else:
+            try:
+                return await self._call_primary(method, *args, **kwargs)
+            except Exception:
+                pass
+        self.failovers += 1
+        return await getattr(self.fallback, method)(*args, **kwargs)
+
+    async def _write(self, method: str, *args, **kwargs) -> Any:
+        """Replica always; Qdrant unless the circuit refuses, else it is marked stale"""
+        result, replica_error = None, None
+        try:
+            result = await getattr(self.fallback, method)(*args, **kwargs)
+        except Exception as e:
+            logger.error(f"Local replica failed on {method}: {str(e)}")
+            replica_error = e
+        if not self.stale:
+            try:
+                return await self._call_primary(method, *args, **kwargs)
+            except Exception as e:
+                if replica_error is not None:
+                    raise
+                logger.warning(f"Qdrant missed {method} ({str(e)}); it will be resynced from the local replica")
+                self.stale = True
+        if replica_error is not None:
+            raise replica_error
+        self._missed_writes += 1
+        if method == "clear_collection":
+            self._pending_clear = True
+            self._pending_deletes.clear()
+        elif method == "delete_documents":
+            self._pending_deletes.update(as_point_id(doc_id) for doc_id in args[0])
+        self._start_resync()
+        return result
+
+    def _start_resync(self) -> None:
+        """Replay the replica into Qdrant in the background, at most once per breaker probe"""
+        if self._resync_task is not None and not self._resync_task.done():
+            return
+        if not len(self.fallback.points()[0]) and not self._pending_clear and not self._pending_deletes:
+            return  # nothing to replay: the replica was never filled
+        if not self.breaker.allow_request():
+            return
+        self._resync_task = asyncio.ensure_future(self._resync())
+
+    async def _resync(self) -> None:
+        missed_writes = self._missed_writes
+        clear, deletes = self._pending_clear, set(self._pending_deletes)
+        doc_ids, vectors, payloads, sparse = self.fallback.points()
+        # A document deleted and then written again during the outage is upserted, not deleted
+        deletes -= {as_point_id(doc_id) for doc_id in doc_ids}
+        try:
+            await self.primary.create_collection_if_not_exists()
+            if clear:
+                await self.primary.clear_collection()
+            if deletes:
+                await self.primary.delete_documents(sorted(deletes))
+            if len(doc_ids):
+                await self.primary.upsert_embeddings(
+                    doc_ids, vectors, payloads,
+                    sparse_vectors=sparse if all(item is not None for item in sparse) else None
+                )
+        except Exception as e:
+            self.breaker.record_failure()
+            logger.warning(f"Qdrant resync failed: {str(e)}")
+            return
+        self.breaker.record_success()
+        if missed_writes != self._missed_writes:
+            # Writes landed on the replica meanwhile: replay again, pending clear and tombstones included
+            self._resync_task = None
+            self._start_resync()
+            return
+        self._pending_clear = False
+        self._pending_deletes.clear()
+        self.stale = False
+        logger.info(
+            f"Resynced {len(doc_ids)} points{' after a clear' if clear else ''} and {len(deletes)} deletes "
+            f"into Qdrant; reads switched back from the local replica"
+        )
+
+    # QdrantService interface
+
+    async def create_collection_if_not_exists(self, payload_indexes: bool = True, recreate: bool = False) -> None:
+        """Prepare both backends; an unreachable Qdrant leaves the service in degraded mode instead of failing"""
+        await self.fallback.create_collection_if_not_exists(payload_indexes, recreate)
+        try:
+            await self._call_primary("create_collection_if_not_exists", payload_indexes, recreate)
+        except Exception as e:
+            logger.warning(f"Qdrant collection not ready ({str(e)}); starting on the local replica")
+
+    initialize_collection = create_collection_if_not_exists
+
+    point_id = staticmethod(QdrantService.point_id)
+
+    async def upsert_documents(self, documents: List[Dict[str, Any]]) -> bool:
+        """Insert or update documents (dicts with doc_id or id, vector, content, metadata...)"""
+        try:
+            await self.upsert_embeddings(*documents_to_points(documents))
+            return True
+        except Exception as e:
+            logger.error(f"Error upserting documents: {str(e)}")
+            return False
+
+    async def upsert_embeddings(self, doc_ids: Sequence[str], vectors: np.ndarray,
+                                payloads: Sequence[Dict[str, Any]], batch_size: Optional[int] = None,
+                                parallelism: Optional[int] = None,
+                                sparse_vectors: Optional[Sequence[SparseVector]] = None) -> int:
+        return await self._write(
+            "upsert_embeddings", doc_ids, vectors, payloads, batch_size, parallelism, sparse_vectors=sparse_vectors
+        )
+
+    async def delete_documents(self, document_ids: List[str]) -> bool:
+        return await self._write("delete_documents", document_ids)
+
+    async def clear_collection(self) -> bool:
+        return await self._write("clear_collection")
+
+    async def search_similar(self, query_vector, limit: int = 5, **kwargs) -> List[Dict[str, Any]]:
+        """Same arguments and results as QdrantService.search_similar"""
+        return await self._read("search_similar", query_vector, limit, **kwargs)
+
+    async def get_collection_info(self) -> Dict[str, Any]:
+        info = await self._read("get_collection_info")
+        return {**info, "failover": self.failover_stats()}
+
+    def reset_upsert_stats(self) -> None:
+        self.primary.reset_upsert_stats()
+        self.fallback.reset_upsert_stats()
+
+    def upsert_stats(self) -> Dict[str, Any]:
+        """Qdrant's ingest stats, plus the replica's"""
+        return {**self.primary.upsert_stats(), "local_replica": self.fallback.upsert_stats()}
+
+    def failover_stats(self) -> Dict[str, Any]:
+        return {
+            "degraded": self.degraded,
+            "stale": self.stale,
+            "circuit": self.breaker.to_dict(),
+            "fallback_reads": self.failovers
+        }
+
+    async def close(self) -> None:
+        if self._resync_task is not None:
+            self._resync_task.cancel()
+        await self.fallback.close()
+        await self.primary.close()
@@ -0,0 +1,284 @@
+from typing import Any, Dict, List, Optional, Tuple
+from collections import OrderedDict
+from dataclasses import dataclass
+import asyncio
+import logging
+import threading
+import time
+
+from app.config import settings
+from app.database import async_transaction
+
+logger = logging.getLogger(__name__)
+
+# Resolved chat rows kept per process; misses cost one lookup on the next flush
+CHAT_ID_CACHE_SIZE = 10000
+
+
+@dataclass
+class ConversationTurn:
+    """One user message and the bot reply, waiting to be persisted"""
+    chat_key: str                     # chat.chatId used when the chat row has to be created
+    user_message: str
+    bot_response: str
+    usuario_id: Optional[int] = None  # usuario row; None creates one named ``nombre``
+    nombre: Optional[str] = None
+
+
+class ConversationWriter:
+    """
+    Write-behind buffer for chat counters and mensaje rows.
+
+    Replies enqueue their turn and return immediately; a background task
+    drains the queue every ``batch_size`` turns or ``flush_interval`` seconds
+    and persists the whole batch in one transaction: one counter UPDATE per
+    chat and one multi-row INSERT on mensaje. The queue is bounded, so when
+    the database falls behind callers wait (backpressure) for at most
+    ``enqueue_timeout`` seconds before the turn is dropped and counted.
+    """
+
+    def __init__(self, batch_size: int = 200, flush_interval: float = 1.0, max_pending: int = 10000,
+                 enqueue_timeout: float = 2.0, max_retries: int = 3):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.enqueue_timeout = enqueue_timeout
+        self.max_retries = max_retries
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        # chat key -> (chat.id, chat.usuarioId); forget_chat() runs in the
+        # threadpool of sync routes, so every access holds _chat_ids_lock
+        self._chat_ids: "OrderedDict[str, Tuple[int, int]]" = OrderedDict()
+        self._chat_ids_lock = threading.Lock()
+
+        self.enqueued = 0
+        self.flushed_turns = 0
+        self.flushes = 0
+        self.dropped = 0
+        self.failures = 0
+        self.backpressure_waits = 0
+        self.last_flush_ms = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """
+        Start the flush task on the running event loop (idempotent)
+
+        After a crash only the task is restarted: the queue is kept, so the
+        turns still waiting in it are flushed by the new task.
+        """
+        if self.running:
+            return
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._task = asyncio.create_task(self._run())
+        self._task.add_done_callback(self._on_task_done)
+        pending = self._queue.qsize()
+        logger.info(f"Conversation write-behind buffer started ({pending} turns pending)")
+
+    def _on_task_done(self, task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(
+                "Conversation write-behind task crashed; restarting on the next turn",
+                exc_info=task.exception()
+            )
+
+    async def stop(self) -> None:
+        """Flush everything still queued and stop the flush task"""
+        if not self.running:
+            return
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+        logger.info("Conversation write-behind buffer stopped")
+
+    async def record_turn(self, turn: ConversationTurn) -> bool:
+        """
+        Queue a turn for persistence
+
+        Returns:
+            False if the turn was dropped because the buffer stayed full
+        """
+        if not self.running:
+            self.start()
+
+        try:
+            self._queue.put_nowait(turn)
+        except asyncio.QueueFull:
+            self.backpressure_waits += 1
+            try:
+                await asyncio.wait_for(self._queue.put(turn), timeout=self.enqueue_timeout)
+            except asyncio.TimeoutError:
+                self.dropped += 1
+                logger.error(f"Write-behind buffer full, dropped turn for {turn.chat_key}")
+                return False
+        self.enqueued += 1
+        return True
+
+    def forget_chat(self, chat_id: int) -> None:
+        """Drop a deleted chat from the resolved ids so it is looked up again (thread-safe)"""
+        with self._chat_ids_lock:
+            for key in [key for key, (cached_id, _) in self._chat_ids.items() if cached_id == chat_id]:
+                del self._chat_ids[key]
+
+    async def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            batch: List[ConversationTurn] = []
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    turn = await asyncio.wait_for(self._queue.get(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    break
+                if turn is None:
+                    stopping = True
+                    # Drain what was queued before the stop request
+                    while not self._queue.empty():
+                        queued = self._queue.get_nowait()
+                        if queued is not None:
+                            batch.append(queued)
+                    break
+                batch.append(turn)
+
+            for start in range(0, len(batch), self.batch_size):
+                await self._flush_with_retries(batch[start:start + self.batch_size])
+
+    async def _flush_with_retries(self, batch: List[ConversationTurn]) -> None:
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                await self._flush(batch)
+                return
+            except Exception as e:
+                self.failures += 1
+                logger.warning(f"Write-behind flush of {len(batch)} turns failed (attempt {attempt}): {str(e)}")
+                # Cached ids may point at deleted chats
+                with self._chat_ids_lock:
+                    self._chat_ids.clear()
+                if attempt < self.max_retries:
+                    await asyncio.sleep(min(2 ** attempt * 0.1, 5.0))
+        self.dropped += len(batch)
+        logger.error(f"Dropped {len(batch)} conversation turns after {self.max_retries} attempts")
+
+    async def _flush(self, batch: List[ConversationTurn]) -> None:
+        start_time = time.perf_counter()
+        async with async_transaction() as connection:
+            async with connection.cursor() as cursor:
+                chats: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+                for turn in batch:
+                    chat = chats.get(turn.chat_key)
+                    if chat is None:
+                        chat_id, usuario_id = await self._resolve_chat(cursor, turn)
+                        chat = chats[turn.chat_key] = {
+                            "id": chat_id, "usuarioId": usuario_id, "turns": 0, "ultimoMensaje": None, "turn": turn
+                        }
+                    chat["turns"] += 1
+                    chat["ultimoMensaje"] = turn.user_message
+
+                for key, chat in chats.items():
+                    if not await self._bump_chat(cursor, chat):
+                        # Deleted since its id was resolved (DELETE /chats on this or another
+                        # worker): never re-create it under the old id, resolve the chat again
+                        with self._chat_ids_lock:
+                            self._chat_ids.pop(key, None)
+                        chat["id"], chat["usuarioId"] = await self._resolve_chat(cursor, chat["turn"])
+                        if not await self._bump_chat(cursor, chat):
+                            raise RuntimeError(f"Chat {chat['id']} of {key} vanished while flushing")
+
+                mensajes = []
+                for turn in batch:
+                    chat_id = chats[turn.chat_key]["id"]
+                    mensajes.append((chat_id, "usuario", turn.user_message))
+                    mensajes.append((chat_id, "bot", turn.bot_response))
+                await cursor.executemany(
+                    "INSERT INTO mensaje (chatId, tipo, contenido) VALUES (%s, %s, %s)", mensajes
+                )
+
+        self.flushes += 1
+        self.flushed_turns += len(batch)
+        self.last_flush_ms = round((time.perf_counter() - start_time) * 1000, 2)
+
+    @staticmethod
+    async def _bump_chat(cursor, chat: Dict[str, Any]) -> bool:
+        """Add a batch's turns to a chat row; False if the row no longer exists"""
+        # totalMensajes always grows, so a matched row always counts as affected
+        await cursor.execute(
+            "UPDATE chat SET ultimoMensaje = %s, totalMensajes = totalMensajes + %s WHERE id = %s",
+            (chat["ultimoMensaje"], chat["turns"], chat["id"])
+        )
+        return cursor.rowcount > 0
+
+    async def _resolve_chat(self, cursor, turn: ConversationTurn) -> Tuple[int, int]:
+        """Find (or create with zero counters) the chat row of a turn"""
+        with self._chat_ids_lock:
+            cached = self._chat_ids.get(turn.chat_key)
+            if cached is not None:
+                self._chat_ids.move_to_end(turn.chat_key)
+                return cached
+
+        if turn.usuario_id is not None:
+            # Same rule as before write-behind: a usuario's latest chat
+            await cursor.execute(
+                "SELECT id, usuarioId FROM chat WHERE usuarioId = %s ORDER BY fechaCreacion DESC LIMIT 1",
+                (turn.usuario_id,)
+            )
+        else:
+            await cursor.execute(
+                "SELECT id, usuarioId FROM chat WHERE chatId = %s ORDER BY fechaCreacion DESC LIMIT 1",
+                (turn.chat_key,)
+            )
+        row = await cursor.fetchone()
+
+        if row:
+            resolved = (row["id"], row["usuarioId"])
+        else:
+            usuario_id = turn.usuario_id
+            if usuario_id is None:
+                await cursor.execute("INSERT INTO usuario (nombre) VALUES (%s)", (turn.nombre or turn.chat_key,))
+                usuario_id = cursor.lastrowid
+            await cursor.execute(
+                "INSERT INTO chat (usuarioId, chatId, ultimoMensaje, totalMensajes) VALUES (%s, %s, NULL, 0)",
+                (usuario_id, turn.chat_key)
+            )
+            resolved = (cursor.lastrowid, usuario_id)
+
+        with self._chat_ids_lock:
+            self._chat_ids[turn.chat_key] = resolved
+            while len(self._chat_ids) > CHAT_ID_CACHE_SIZE:
+                self._chat_ids.popitem(last=False)
+        return resolved
+
+    def stats(self) -> Dict[str, Any]:
+        """Get queue depth and flush counters"""
+        return {
+            "running": self.running,
+            "pending": self._queue.qsize() if self._queue is not None else 0,
+            "max_pending": self.max_pending,
+            "batch_size": self.batch_size,
+            "flush_interval": self.flush_interval,
+            "enqueued": self.enqueued,
+            "flushed_turns": self.flushed_turns,
+            "flushes": self.flushes,
+            "dropped": self.dropped,
+            "failures": self.failures,
+            "backpressure_waits": self.backpressure_waits,
+            "last_flush_ms": self.last_flush_ms,
+            "cached_chats": len(self._chat_ids)
+        }
+
+
+# Process-wide conversation writer, started on application startup
+conversation_writer = ConversationWriter(
+    batch_size=settings.WRITE_BEHIND_BATCH_SIZE,
+    flush_interval=settings.WRITE_BEHIND_FLUSH_INTERVAL,
+    max_pending=settings.WRITE_BEHIND_MAX_PENDING,
+    enqueue_timeout=settings.WRITE_BEHIND_ENQUEUE_TIMEOUT,
+    max_retries=settings.WRITE_BEHIND_MAX_RETRIES
+)
@@ -0,0 +1,80 @@
+"""
+Concurrent throughput benchmark for POST /api/v1/chats/message.
+
+Run it against a server started from the revision you want to measure, e.g.
+before and after moving conversation persistence onto the aiomysql pool:
+
+    uvicorn main:app --port 8000
+    python benchmarks/bench_chat_message.py --url http://localhost:8000 --concurrency 50 --requests 500
+
+Requests carry a user_id so every call also exercises conversation storage.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+async def _worker(client: httpx.AsyncClient, url: str, queue: asyncio.Queue, latencies: list, errors: list):
+    while True:
+        try:
+            index = queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+        payload = {"message": f"¿Tienen doboks talla M? ({index})", "user_id": 1 + index % 20}
+        start = time.perf_counter()
+        try:
+            response = await client.post(url, json=payload)
+            if response.status_code >= 400:
+                errors.append(response.status_code)
+        except httpx.HTTPError as e:
+            errors.append(type(e).__name__)
+        latencies.append(time.perf_counter() - start)
+
+
+async def run(base_url: str, total: int, concurrency: int, timeout: float) -> dict:
+    url = f"{base_url.rstrip('/')}/api/v1/chats/message"
+    queue: asyncio.Queue = asyncio.Queue()
+    for i in range(total):
+        queue.put_nowait(i)
+
+    latencies: list = []
+    errors: list = []
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(timeout=timeout, limits=limits) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            _worker(client, url, queue, latencies, errors) for _ in range(concurrency)
+        ))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": total,
+        "concurrency": concurrency,
+        "errors": len(errors),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(total / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args.url, args.requests, args.concurrency, args.timeout))
+    for key, value in result.items():
+        print(f"{key:>16}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Parity, latency and RSS of the embedding backends: torch vs ONNX (fp32 / int8).
+
+    python benchmarks/bench_embedding_backends.py --threads 4
+
+Each backend runs in a fresh interpreter (so RSS is not shared) with
+EMBEDDING_BACKEND / EMBEDDING_ONNX_QUANTIZE set accordingly. Parity is the
+cosine agreement of each ONNX variant with the torch vectors on the same
+texts; the script exits with status 1 when the mean cosine of a variant
+falls below --min-cosine (fp32) or --min-cosine-int8.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+TEXTS = [
+    "¿Tienen doboks talla M?",
+    "Producto: Dobok de competición | Descripción: Algodón, aprobado por la WT | Precio: $89.90",
+    "protectores de pecho para competencia infantil",
+    "Categoría: Protecciones | Descripción: Petos, cascos, bucales y espinilleras",
+    "Promoción: 20% en cinturones bordados con nombre durante todo el mes de diciembre",
+    "guantes de entrenamiento baratos",
+    "Necesito un casco homologado talla L para mi hijo que empieza a competir el próximo año",
+    "horarios de clases para adultos principiantes",
+] * 4
+
+BACKENDS = {
+    "torch": {"EMBEDDING_BACKEND": "torch"},
+    "onnx-fp32": {"EMBEDDING_BACKEND": "onnx", "EMBEDDING_ONNX_QUANTIZE": "false"},
+    "onnx-int8": {"EMBEDDING_BACKEND": "onnx", "EMBEDDING_ONNX_QUANTIZE": "true"},
+}
+
+
+def measure(repeat: int, output: str) -> None:
+    from app.config import settings
+    from app.services.model_registry import model_registry, process_rss_mb
+
+    rss_before = process_rss_mb()
+    start = time.perf_counter()
+    model = model_registry.get(settings.EMBEDDING_MODEL)
+    load_seconds = time.perf_counter() - start
+    vectors = np.asarray(model.encode(TEXTS, batch_size=32, convert_to_numpy=True), dtype=np.float32)
+
+    single, batch = [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        model.encode(TEXTS[0], convert_to_numpy=True)
+        single.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        model.encode(TEXTS, batch_size=32, convert_to_numpy=True)
+        batch.append(time.perf_counter() - start)
+
+    np.save(output, vectors)
+    print(json.dumps({
+        "load_s": round(load_seconds, 2),
+        "single_ms": round(statistics.median(single) * 1000, 2),
+        "batch32_ms": round(statistics.median(batch) * 1000, 2),
+        "rss_mb": process_rss_mb(),
+        "model_rss_mb": round(process_rss_mb() - rss_before, 1),
+    }))
+
+
+def cosine(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    a = a / np.linalg.norm(a, axis=1, keepdims=True)
+    b = b / np.linalg.norm(b, axis=1, keepdims=True)
+    return (a * b).sum(axis=1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=0, help="EMBEDDING_ONNX_THREADS (0 = all available CPUs)")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--min-cosine", type=float, default=0.9999)
+    parser.add_argument("--min-cosine-int8", type=float, default=0.98)
+    parser.add_argument("--measure", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        measure(args.repeat, args.measure)
+        return
+
+    results, vectors = {}, {}
+    for name, env in BACKENDS.items():
+        output = f"/tmp/bench_embedding_{name}.npy"
+        stdout = subprocess.run(
+            [sys.executable, __file__, "--measure", output, "--repeat", str(args.repeat)],
+            capture_output=True, text=True, check=True, cwd=ROOT,
+            env={**os.environ, **env, "EMBEDDING_ONNX_THREADS": str(args.threads), "EMBEDDING_WARMUP": "lazy"}
+        ).stdout.strip().splitlines()[-1]
+        results[name] = json.loads(stdout)
+        vectors[name] = np.load(output)
+        print(f"{name:10} {results[name]}")
+
+    failed = False
+    for name, threshold in (("onnx-fp32", args.min_cosine), ("onnx-int8", args.min_cosine_int8)):
+        agreement = cosine(vectors["torch"], vectors[name])
+        ok = agreement.mean() >= threshold
+        failed |= not ok
+        print(f"parity {name:10} mean cosine {agreement.mean():.6f}  min {agreement.min():.6f}  "
+              f"{'OK' if ok else f'BELOW {threshold}'}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Concurrent query encoding: one forward pass per query vs micro-batching.
+
+    python benchmarks/bench_embedding_batching.py --concurrency 50 --batch-sizes 1 8 32
+
+Fires --concurrency simultaneous encodes through BatchingEmbeddingExecutor
+for each max batch size (1 reproduces the previous one-at-a-time
+behaviour) and reports wall time, queries/s and the batches formed.
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.config import settings
+from app.services.embedding_executor import BatchingEmbeddingExecutor
+from app.services.model_registry import model_registry
+
+QUERIES = [
+    "¿Tienen doboks talla M?",
+    "protectores de pecho para competencia",
+    "cinturón negro bordado con nombre",
+    "guantes de entrenamiento baratos",
+    "casco homologado WT talla L",
+]
+
+
+async def run(executor: BatchingEmbeddingExecutor, concurrency: int) -> float:
+    texts = [f"{QUERIES[i % len(QUERIES)]} #{i}" for i in range(concurrency)]
+    start = time.perf_counter()
+    await asyncio.gather(*[executor.encode(text) for text in texts])
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    model = model_registry.get(settings.EMBEDDING_MODEL)
+    model.encode(QUERIES)  # warm up
+
+    def encode_batch(texts):
+        return model.encode(texts, batch_size=len(texts), convert_to_numpy=True, show_progress_bar=False)
+
+    print(f"model: {settings.EMBEDDING_MODEL}, concurrency: {args.concurrency}")
+    for batch_size in args.batch_sizes:
+        executor = BatchingEmbeddingExecutor(encode_batch, max_batch_size=batch_size, max_wait_ms=args.max_wait_ms)
+        elapsed = statistics.median(asyncio.run(run(executor, args.concurrency)) for _ in range(args.repeat))
+        stats = executor.stats()
+        executor.shutdown()
+        print(f"max_batch={batch_size:<4} {elapsed * 1000:8.1f} ms  {args.concurrency / elapsed:8.1f} q/s  "
+              f"avg batch {stats['avg_batch_size']}")
+
+
+if __name__ == "__main__":
+    main()
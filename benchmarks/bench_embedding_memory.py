@@ -0,0 +1,121 @@
+"""
+Per-worker memory of the embedding model: one copy per service vs the shared registry.
+
+    python benchmarks/bench_embedding_memory.py --services 4 --workers 4
+
+Each scenario runs in a fresh interpreter:
+
+  per-service  loads one SentenceTransformer per service, as DataSyncService,
+               ChatController, IngestController and /rag-status used to do
+  registry     builds the same number of EmbeddingService instances; they
+               share one model through model_registry
+  fork         preloads the model once, then forks --workers children (what
+               gunicorn --preload does) and reports RSS and PSS per worker;
+               PSS splits shared pages between the processes mapping them
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+SAMPLE = "Dobok de competición talla M, algodón, aprobado por la WT"
+
+
+def pss_mb() -> float:
+    try:
+        with open("/proc/self/smaps_rollup") as smaps:
+            for line in smaps:
+                if line.startswith("Pss:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return float("nan")
+
+
+def run_per_service(services: int) -> dict:
+    from sentence_transformers import SentenceTransformer
+    from app.config import settings
+    from app.services.model_registry import process_rss_mb
+
+    before = process_rss_mb()
+    models = [SentenceTransformer(settings.EMBEDDING_MODEL) for _ in range(services)]
+    for model in models:
+        model.encode(SAMPLE)
+    return {"rss_before_mb": before, "rss_after_mb": process_rss_mb()}
+
+
+def run_registry(services: int) -> dict:
+    from app.services.embedding import EmbeddingService
+    from app.services.model_registry import process_rss_mb
+
+    before = process_rss_mb()
+    instances = [EmbeddingService() for _ in range(services)]
+    for service in instances:
+        service.encode_query(SAMPLE)
+    return {"rss_before_mb": before, "rss_after_mb": process_rss_mb()}
+
+
+def _worker(queue) -> None:
+    from app.services.embedding import EmbeddingService
+    from app.services.model_registry import model_registry
+
+    EmbeddingService().encode_query(SAMPLE)
+    queue.put({**model_registry.stats(), "pss_mb": pss_mb()})
+
+
+def run_fork(workers: int) -> dict:
+    from app.config import settings
+    from app.services.model_registry import model_registry, process_rss_mb
+
+    model_registry.preload(settings.EMBEDDING_MODEL, freeze=True)
+    context = multiprocessing.get_context("fork")
+    queue = context.Queue()
+    processes = [context.Process(target=_worker, args=(queue,)) for _ in range(workers)]
+    for process in processes:
+        process.start()
+    results = [queue.get() for _ in processes]
+    for process in processes:
+        process.join()
+    return {
+        "master_rss_mb": process_rss_mb(),
+        "workers": [
+            {"pid": r["pid"], "rss_mb": r["rss_mb"], "pss_mb": r["pss_mb"], "inherited": r["inherited"]}
+            for r in results
+        ]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--services", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--scenario", choices=["per-service", "registry", "fork"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.scenario:
+        runners = {
+            "per-service": lambda: run_per_service(args.services),
+            "registry": lambda: run_registry(args.services),
+            "fork": lambda: run_fork(args.workers),
+        }
+        print(json.dumps(runners[args.scenario]()))
+        return
+
+    for scenario in ("per-service", "registry", "fork"):
+        output = subprocess.run(
+            [sys.executable, __file__, "--scenario", scenario,
+             "--services", str(args.services), "--workers", str(args.workers)],
+            capture_output=True, text=True, check=True, cwd=ROOT, env={**os.environ, "EMBEDDING_WARMUP": "lazy"}
+        ).stdout.strip().splitlines()[-1]
+        print(f"{scenario:12} {output}")
+
+
+if __name__ == "__main__":
+    main()
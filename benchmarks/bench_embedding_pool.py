@@ -0,0 +1,57 @@
+"""
+Re-index throughput of the multi-process embedding pool, from 1 to N workers.
+
+    python benchmarks/bench_embedding_pool.py --documents 20000 --max-workers 8
+    EMBEDDING_BACKEND=onnx python benchmarks/bench_embedding_pool.py
+
+For each worker count the pool is started and warmed up (model loaded in every
+worker), then the synthetic catalog from bench_embedding_bucketing is streamed
+through EmbeddingProcessPool.imap. Reports documents/s, speedup over one
+worker and parallel efficiency (speedup / workers). Each worker gets
+--threads torch/ONNX threads (default 1, so N workers use N cores).
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("EMBEDDING_WARMUP", "lazy")
+
+from bench_embedding_bucketing import make_catalog  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=20000)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--threads", type=int, default=1, help="torch/ONNX threads per worker")
+    parser.add_argument("--chunk-size", type=int, default=256)
+    args = parser.parse_args()
+
+    from app.services.embedding_pool import EmbeddingProcessPool
+
+    texts = make_catalog(args.documents)
+    counts = sorted({1, *(2 ** i for i in range(1, args.max_workers.bit_length())), args.max_workers})
+    baseline = None
+    for workers in counts:
+        with EmbeddingProcessPool(workers=workers, threads_per_worker=args.threads, chunk_size=args.chunk_size) as pool:
+            # One chunk per worker so every process has its model loaded before timing
+            list(pool.imap(texts[:args.chunk_size * workers]))
+
+            start_time = time.perf_counter()
+            encoded = sum(len(vectors) for _, vectors in pool.imap(texts))
+            rate = encoded / (time.perf_counter() - start_time)
+
+        baseline = baseline or rate
+        print(
+            f"workers={workers:<3} {rate:9.1f} docs/s  speedup={rate / baseline:5.2f}x  "
+            f"efficiency={rate / baseline / workers:5.1%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Retrieval quality and latency of dense, sparse (BM25) and hybrid (RRF) search.
+
+    python benchmarks/bench_hybrid_search.py --location :memory: --products 5000
+    docker run -p 6333:6333 qdrant/qdrant
+    python benchmarks/bench_hybrid_search.py --host localhost --products 50000
+
+Builds a synthetic catalog where every product has a type, brand, size,
+colour and SKU, embeds it with the configured EmbeddingService, fits the
+BM25SparseEncoder on the same texts and loads both vectors into a scratch
+collection (dropped at the end). Two query sets, each run in every mode:
+
+  sku         "guantes TKD-00412": exactly one relevant product; reports the
+              hit rate at k (is it in the top k)
+  attributes  "dobok adidas talla XL": every product of that type, brand and
+              size is relevant; reports precision at k
+
+plus p50/p95 latency of QdrantService.search_similar (query embedding not
+included). Identifier and attribute lookups are where dense-only retrieval
+is weakest and where the sparse side of hybrid should help.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("EMBEDDING_WARMUP", "lazy")
+os.environ["EMBEDDING_CACHE_ENABLED"] = "false"
+os.environ.setdefault("SPARSE_ENCODER_PATH", str(Path(tempfile.gettempdir()) / "bench_sparse_encoder.json"))
+
+TYPES = ["dobok", "guantes", "protector bucal", "cinturón", "casco", "espinilleras", "peto", "bolso deportivo"]
+BRANDS = ["adidas", "daedo", "kwon", "mooto", "everlast", "venum", "shiai", "hayabusa"]
+SIZES = ["XS", "S", "M", "L", "XL", "XXL"]
+COLOURS = ["negro", "blanco", "rojo", "azul", "verde"]
+DESCRIPTIONS = [
+    "ideal para entrenamiento diario y competición",
+    "material transpirable con costuras reforzadas",
+    "homologado para torneos oficiales",
+    "acolchado de alta densidad, ligero y resistente",
+    "modelo infantil y adulto, fácil de lavar",
+]
+
+
+def make_catalog(products: int, seed: int = 0):
+    rng = random.Random(seed)
+    catalog = []
+    for i in range(products):
+        item = {
+            "tipo": rng.choice(TYPES), "marca": rng.choice(BRANDS), "talla": rng.choice(SIZES),
+            "color": rng.choice(COLOURS), "sku": f"TKD-{i:05d}",
+        }
+        item["content"] = (
+            f"Producto: {item['tipo']} {item['marca']} {item['color']} talla {item['talla']} | "
+            f"Descripción: {rng.choice(DESCRIPTIONS)}. Código {item['sku']} | Precio: ${rng.randint(10, 300)}"
+        )
+        catalog.append(item)
+    return catalog
+
+
+def make_queries(catalog: list, count: int, seed: int = 1):
+    rng = random.Random(seed)
+    by_attributes = {}
+    for i, item in enumerate(catalog):
+        by_attributes.setdefault((item["tipo"], item["marca"], item["talla"]), set()).add(i)
+    sku = []
+    for i in rng.sample(range(len(catalog)), min(count, len(catalog))):
+        sku.append((f"{catalog[i]['tipo']} {catalog[i]['sku']}", {i}))
+    attributes = []
+    for key in rng.sample(sorted(by_attributes), min(count, len(by_attributes))):
+        attributes.append((f"{key[0]} {key[1]} talla {key[2]}", by_attributes[key]))
+    return {"sku": sku, "attributes": attributes}
+
+
+async def measure(service, embedding, queries, point_index, k: int, mode: str) -> dict:
+    latencies, score = [], 0.0
+    for text, relevant in queries:
+        vector = embedding.encode_query(text)
+        start_time = time.perf_counter()
+        results = await service.search_similar(vector, limit=k, query_text=text, mode=mode)
+        latencies.append((time.perf_counter() - start_time) * 1000)
+        found = {point_index[result["id"]] for result in results} & relevant
+        score += len(found) / min(k, len(relevant))
+    latencies.sort()
+    return {
+        "score": score / len(queries),
+        "p50": statistics.median(latencies),
+        "p95": latencies[max(0, int(len(latencies) * 0.95) - 1)],
+    }
+
+
+async def run(args) -> None:
+    from qdrant_client import AsyncQdrantClient
+    from app.services.embedding import EmbeddingService
+    from app.services.qdrant import QdrantService
+    from app.services.sparse_encoder import BM25SparseEncoder, save_sparse_encoder
+
+    if args.host:
+        client = AsyncQdrantClient(host=args.host, port=args.port, prefer_grpc=args.grpc, timeout=60)
+    else:
+        client = AsyncQdrantClient(location=args.location)
+    service = QdrantService(client=client, collection_name="bench_hybrid")
+    service.sparse_enabled = True
+
+    catalog = make_catalog(args.products)
+    contents = [item["content"] for item in catalog]
+    doc_ids = [f"producto_{i}" for i in range(len(catalog))]
+    payloads = [{"content": item["content"], "tipo": "producto"} for item in catalog]
+
+    embedding = EmbeddingService()
+    start_time = time.perf_counter()
+    vectors = embedding.encode_documents(contents)
+    print(f"embedded    {len(contents)} products in {time.perf_counter() - start_time:.1f} s")
+    encoder = BM25SparseEncoder().fit(contents)
+    start_time = time.perf_counter()
+    sparse_vectors = encoder.encode_documents(contents)
+    print(f"bm25        {len(contents)} products in {time.perf_counter() - start_time:.2f} s")
+
+    # search_similar encodes query text with the saved (process-wide) encoder
+    save_sparse_encoder(encoder)
+
+    service.vector_size = vectors.shape[1]
+    await client.delete_collection(service.collection_name)
+    await service.create_collection_if_not_exists(payload_indexes=False)
+    try:
+        await service.upsert_embeddings(doc_ids, vectors, payloads, sparse_vectors=sparse_vectors)
+        point_index = {QdrantService.point_id(doc_id): i for i, doc_id in enumerate(doc_ids)}
+        metrics = {"sku": "hit", "attributes": "precision"}
+        for name, queries in make_queries(catalog, args.queries).items():
+            for mode in ("dense", "sparse", "hybrid"):
+                row = await measure(service, embedding, queries, point_index, args.k, mode)
+                print(
+                    f"{name:10} {mode:6} {metrics[name]}@{args.k}={row['score']:.3f}  "
+                    f"p50={row['p50']:6.2f} ms  p95={row['p95']:6.2f} ms"
+                )
+    finally:
+        await client.delete_collection(service.collection_name)
+        await client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--location", default=":memory:", help="embedded Qdrant when --host is not given")
+    parser.add_argument("--host")
+    parser.add_argument("--port", type=int, default=6333)
+    parser.add_argument("--grpc", action="store_true")
+    parser.add_argument("--products", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
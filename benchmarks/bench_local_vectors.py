@@ -0,0 +1,110 @@
+"""
+Search latency and recall of the in-process LocalVectorStore.
+
+    python benchmarks/bench_local_vectors.py --points 50000
+    pip install hnswlib && python benchmarks/bench_local_vectors.py --points 200000 --hnsw
+
+Loads --points clustered synthetic vectors with catalog-like payloads into a
+scratch store under a temporary directory, then reports p50/p95 latency of
+search_similar for the same filter scenarios as bench_qdrant_filtered_search
+(plus recall@k against brute force when --hnsw builds the graph), the
+upsert time and the cold load time of the memory-mapped collection.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("EMBEDDING_WARMUP", "lazy")
+os.environ.setdefault("LOCAL_VECTOR_HNSW_MIN_POINTS", "0")
+
+SCENARIOS = {
+    "none": {},
+    "disponible": {"disponible": True},
+    "categoria": {"filters": {"tipo": "producto", "categoria_id": 7}},
+    "categorias_any": {"filters": {"categoria_id": [2, 9, 15]}, "disponible": True},
+    "precio_range": {"precio_min": 100.0, "precio_max": 105.0},
+    "combined": {"filters": {"categoria_id": [3, 4]}, "precio_min": 50.0, "precio_max": 120.0, "disponible": True},
+}
+
+
+async def measure(store, queries, k: int, arguments: dict):
+    await store.search_similar(queries[0], limit=k, mode="dense", **arguments)  # warm up filter columns
+    latencies, results = [], []
+    for query in queries:
+        start_time = time.perf_counter()
+        results.append(await store.search_similar(query, limit=k, mode="dense", **arguments))
+        latencies.append((time.perf_counter() - start_time) * 1000)
+    latencies.sort()
+    return results, statistics.median(latencies), latencies[max(0, int(len(latencies) * 0.95) - 1)]
+
+
+async def run(args) -> None:
+    import numpy as np
+    from app.services.local_vectors import LocalVectorStore
+
+    rng = np.random.default_rng(0)
+    centers = rng.standard_normal((200, args.dim), dtype=np.float32)
+    vectors = centers[rng.integers(0, 200, args.points)] + 0.35 * rng.standard_normal((args.points, args.dim), dtype=np.float32)
+    queries = centers[rng.integers(0, 200, args.queries)] + 0.35 * rng.standard_normal((args.queries, args.dim), dtype=np.float32)
+    payloads = [
+        {"tipo": "producto", "categoria_id": int(c), "precio": float(p), "disponible": bool(d)}
+        for c, p, d in zip(rng.integers(0, 20, args.points), np.round(rng.uniform(5, 500, args.points), 2),
+                           rng.random(args.points) < 0.8)
+    ]
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = LocalVectorStore(path=directory, collection_name="bench_local", hnsw=False)
+        start_time = time.perf_counter()
+        await store.upsert_embeddings([f"producto_{i}" for i in range(args.points)], vectors, payloads)
+        print(f"upsert      {args.points} points in {time.perf_counter() - start_time:.2f} s")
+        start_time = time.perf_counter()
+        store = LocalVectorStore(path=directory, collection_name="bench_local", hnsw=False)
+        print(f"cold load   {(time.perf_counter() - start_time) * 1000:.1f} ms (memory-mapped)")
+
+        exact = {}
+        for scenario, arguments in SCENARIOS.items():
+            exact[scenario], p50, p95 = await measure(store, queries, args.k, arguments)
+            print(f"{scenario:15} brute-force p50={p50:7.2f} ms  p95={p95:7.2f} ms")
+
+        if args.hnsw:
+            store.hnsw_enabled = True
+            start_time = time.perf_counter()
+            store._start_hnsw_build()
+            if store._hnsw_task is None:
+                print("hnsw        not built (is hnswlib installed?)")
+                args.hnsw = False
+            else:
+                await store._hnsw_task
+                print(f"hnsw build  {time.perf_counter() - start_time:.1f} s")
+        if args.hnsw:
+            for scenario, arguments in SCENARIOS.items():
+                results, p50, p95 = await measure(store, queries, args.k, arguments)
+                hits = sum(
+                    len({hit["id"] for hit in got} & {hit["id"] for hit in expected})
+                    for got, expected in zip(results, exact[scenario])
+                )
+                total = sum(len(expected) for expected in exact[scenario]) or 1
+                print(f"{scenario:15} hnsw        p50={p50:7.2f} ms  p95={p95:7.2f} ms  recall@{args.k}={hits / total:.4f}")
+        await store.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--points", type=int, default=50000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--hnsw", action="store_true", help="also build and measure the hnswlib graph")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+EXPLAIN check and latency benchmark for the producto search queries.
+
+Point DB_* at a scratch database with migrations 001 and 002 applied, seed
+it once and run the scenarios:
+
+    python benchmarks/bench_product_search.py --seed 1000000
+    python benchmarks/bench_product_search.py --repeat 20
+
+Every scenario is built with the same code the endpoint uses
+(ProductoController._search_filter + build_page_query), EXPLAINed and timed
+for its first page and for a page reached through a cursor. The script
+exits with status 1 if any plan falls back to a full scan of producto.
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from decimal import Decimal
+from pathlib import Path
+from typing import List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.database import get_sync_connection
+from app.controllers.producto.ProductoController import ProductoController
+from app.models.producto.ProductoModel import ProductoSearch
+from app.services.pagination import build_page_query, encode_cursor
+
+TALLAS = ("XS", "S", "M", "L", "XL")
+COLORES = ("blanco", "negro", "azul", "rojo", "verde")
+NOMBRES = ("Dobok", "Camiseta", "Cinturón", "Protector", "Guantes", "Pantalón", "Casco", "Bolso")
+CATEGORIAS = 12
+
+SCENARIOS: List[Tuple[str, ProductoSearch]] = [
+    ("categoria+talla+color+precio", ProductoSearch(categoriaId=3, talla="M", color="azul", precioMax=Decimal("50"))),
+    ("talla+precio", ProductoSearch(talla="M", precioMax=Decimal("50"))),
+    ("talla+color", ProductoSearch(talla="L", color="negro")),
+    ("color", ProductoSearch(color="rojo", descending=True)),
+    ("precio range", ProductoSearch(precioMin=Decimal("20"), precioMax=Decimal("25"))),
+    ("categoria only", ProductoSearch(categoriaId=5)),
+    ("text", ProductoSearch(q="camisetas")),
+    ("text+talla+precio", ProductoSearch(q="dobok", talla="M", precioMax=Decimal("50"))),
+]
+
+
+def seed(connection, total: int, chunk: int) -> None:
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT COUNT(*) AS total FROM categoria")
+        if cursor.fetchone()["total"] < CATEGORIAS:
+            cursor.executemany(
+                "INSERT INTO categoria (nombre, descripcion) VALUES (%s, %s)",
+                [(f"Categoría {i}", "Categoría de prueba") for i in range(CATEGORIAS)]
+            )
+        cursor.execute("SELECT id FROM categoria ORDER BY id LIMIT %s", (CATEGORIAS,))
+        categoria_ids = [row["id"] for row in cursor.fetchall()]
+
+        sql = """
+        INSERT INTO producto (categoriaId, nombre, descripcion, talla, color, precio, stock)
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
+        """
+        start = time.perf_counter()
+        for offset in range(0, total, chunk):
+            rows = []
+            for i in range(offset, min(offset + chunk, total)):
+                nombre = NOMBRES[i % len(NOMBRES)]
+                rows.append((
+                    categoria_ids[i % len(categoria_ids)],
+                    f"{nombre} {TALLAS[i % 5]} {i}",
+                    f"{nombre} de entrenamiento para taekwondo, modelo {i % 997}",
+                    TALLAS[i % 5],
+                    COLORES[(i // 5) % 5],
+                    Decimal(500 + (i * 7919) % 15000) / 100,
+                    i % 40,
+                ))
+            cursor.executemany(sql, rows)
+            connection.commit()
+            print(f"\rseeded {min(offset + chunk, total)}/{total}", end="", flush=True)
+        print(f"\nseed: {time.perf_counter() - start:.1f} s")
+
+
+def explain(cursor, sql: str, values: list) -> List[dict]:
+    cursor.execute("EXPLAIN " + sql, values)
+    return cursor.fetchall()
+
+
+def timed(cursor, sql: str, values: list, repeat: int) -> Tuple[float, List[dict]]:
+    timings, rows = [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        cursor.execute(sql, values)
+        rows = cursor.fetchall()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seed", type=int, default=0, help="Insert this many synthetic productos first")
+    parser.add_argument("--chunk", type=int, default=5000)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    connection = get_sync_connection()
+    if args.seed:
+        seed(connection, args.seed, args.chunk)
+
+    full_scans = []
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT COUNT(*) AS total FROM producto")
+        print(f"productos: {cursor.fetchone()['total']}\n")
+        print(f"{'scenario':32} {'page':6} {'type':9} {'key':44} {'rows':>9} {'ms':>8}")
+
+        for name, filters in SCENARIOS:
+            where, params = ProductoController._search_filter(filters)
+            cursor_value = None
+            for page in ("first", "next"):
+                if page == "next" and cursor_value is None:
+                    continue
+                sql, values = build_page_query("producto", "precio", args.limit, cursor_value, where, params,
+                                               descending=filters.descending)
+                plan = [step for step in explain(cursor, sql, values) if step["table"] == "producto"]
+                elapsed, rows = timed(cursor, sql, values, args.repeat)
+                for step in plan:
+                    print(f"{name:32} {page:6} {str(step['type']):9} {str(step['key']):44} "
+                          f"{step['rows'] or 0:>9} {elapsed * 1000:>8.2f}")
+                    if step["type"] == "ALL":
+                        full_scans.append(f"{name} ({page} page)")
+                if len(rows) > args.limit:
+                    last = rows[args.limit - 1]
+                    cursor_value = encode_cursor(last["precio"], last["id"])
+
+    connection.close()
+    if full_scans:
+        print(f"\nFULL TABLE SCAN in: {', '.join(full_scans)}")
+        sys.exit(1)
+    print("\nno full table scans")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Filtered-search latency with and without payload indexes.
+
+    docker run -p 6333:6333 qdrant/qdrant
+    python benchmarks/bench_qdrant_filtered_search.py --host localhost --points 1000000
+
+Loads the same --points synthetic products into two scratch collections,
+one with PAYLOAD_INDEXES (tipo, categoria_id, precio, disponible) and one
+without, then reports p50/p95 search latency for filters of decreasing
+selectivity. Payload: 20 categories, precio uniform in 5..500, 80%
+available. Use a Qdrant server: embedded (:memory:) mode ignores payload
+indexes and scans anyway. --keep leaves the collections for reruns with
+--skip-load.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("EMBEDDING_WARMUP", "lazy")
+
+SCENARIOS = {
+    "none": {},
+    "disponible": {"disponible": True},
+    "categoria": {"filters": {"tipo": "producto", "categoria_id": 7}},
+    "categorias_any": {"filters": {"categoria_id": [2, 9, 15]}, "disponible": True},
+    "precio_range": {"precio_min": 100.0, "precio_max": 105.0},
+    "combined": {"filters": {"categoria_id": [3, 4]}, "precio_min": 50.0, "precio_max": 120.0, "disponible": True},
+}
+
+
+async def load(service, points: int, dim: int, chunk: int = 50000) -> None:
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    for start in range(0, points, chunk):
+        count = min(chunk, points - start)
+        vectors = rng.standard_normal((count, dim), dtype=np.float32)
+        categorias = rng.integers(0, 20, count)
+        precios = np.round(rng.uniform(5, 500, count), 2)
+        disponibles = rng.random(count) < 0.8
+        payloads = [
+            {"tipo": "producto", "categoria_id": int(c), "precio": float(p), "disponible": bool(d)}
+            for c, p, d in zip(categorias, precios, disponibles)
+        ]
+        await service.upsert_embeddings(
+            [f"producto_{i}" for i in range(start, start + count)], vectors, payloads, 1024, 8
+        )
+
+
+async def run(args) -> None:
+    import numpy as np
+    from qdrant_client import AsyncQdrantClient
+    from app.services.qdrant import QdrantService
+
+    if args.host:
+        client = AsyncQdrantClient(host=args.host, port=args.port, prefer_grpc=args.grpc, timeout=120)
+    else:
+        client = AsyncQdrantClient(location=":memory:")
+
+    services = {}
+    for indexed in (True, False):
+        service = QdrantService(client=client, collection_name=f"bench_filtered_{'indexed' if indexed else 'plain'}")
+        service.vector_size = args.dim
+        if not args.skip_load:
+            await client.delete_collection(service.collection_name)
+            await service.create_collection_if_not_exists(payload_indexes=indexed)
+            start_time = time.perf_counter()
+            await load(service, args.points, args.dim)
+            print(f"loaded {service.collection_name}: {args.points} points in {time.perf_counter() - start_time:.1f} s")
+        services["indexed" if indexed else "no index"] = service
+
+    queries = np.random.default_rng(1).standard_normal((args.queries, args.dim), dtype=np.float32)
+    try:
+        for scenario, arguments in SCENARIOS.items():
+            for label, service in services.items():
+                await service.search_similar(queries[0], limit=args.limit, **arguments)  # warm up
+                latencies = []
+                for query in queries:
+                    start_time = time.perf_counter()
+                    await service.search_similar(query, limit=args.limit, **arguments)
+                    latencies.append((time.perf_counter() - start_time) * 1000)
+                latencies.sort()
+                print(
+                    f"{scenario:15} {label:9} p50={statistics.median(latencies):8.2f} ms  "
+                    f"p95={latencies[int(len(latencies) * 0.95) - 1]:8.2f} ms"
+                )
+    finally:
+        if not args.keep:
+            for service in services.values():
+                await client.delete_collection(service.collection_name)
+        await client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host")
+    parser.add_argument("--port", type=int, default=6333)
+    parser.add_argument("--grpc", action="store_true")
+    parser.add_argument("--points", type=int, default=1000000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=5)
+    parser.add_argument("--keep", action="store_true", help="keep the collections after the run")
+    parser.add_argument("--skip-load", action="store_true", help="reuse collections kept by a previous run")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+Recall@k, latency and memory of HNSW / storage / quantization settings.
+
+    docker run -p 6333:6333 qdrant/qdrant
+    python benchmarks/bench_qdrant_hnsw.py --host localhost --points 200000 --k 10
+
+Builds a clustered synthetic catalog (embeddings of similar products sit
+close together), then for each configuration below creates a scratch
+collection with QdrantService, waits for the HNSW index to finish and
+reports:
+
+  recall@k    overlap with the exact top-k from a brute-force numpy search
+  p50 / p99   search latency through QdrantService.search_similar
+  memory      server resident memory growth after loading (from /metrics)
+              next to the expected vector RAM (float32 in RAM unless
+              on_disk, plus 1 byte per dimension for int8 copies)
+
+The "exact" row times Qdrant's exact (index-free) search for reference.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("EMBEDDING_WARMUP", "lazy")
+
+CONFIGURATIONS = {
+    "default": {},
+    "m32_ef256": {"m": 32, "ef_construct": 256, "hnsw_ef": 128},
+    "int8_rescore": {"quantization": "int8", "rescore": True, "oversampling": 2.0},
+    "int8_no_rescore": {"quantization": "int8", "rescore": False},
+    "on_disk_int8": {"on_disk": True, "quantization": "int8", "rescore": True, "oversampling": 2.0},
+}
+
+
+def synthetic_catalog(points: int, dim: int, clusters: int = 200, seed: int = 0):
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim), dtype=np.float32)
+    labels = rng.integers(0, clusters, points)
+    vectors = centers[labels] + 0.35 * rng.standard_normal((points, dim), dtype=np.float32)
+    return vectors
+
+
+def server_memory_mb(host: str, port: int) -> float:
+    try:
+        with urllib.request.urlopen(f"http://{host}:{port}/metrics", timeout=5) as response:
+            for line in response.read().decode().splitlines():
+                if line.startswith("memory_resident_bytes"):
+                    return float(line.split()[-1]) / 1024 / 1024
+    except OSError:
+        pass
+    return float("nan")
+
+
+async def wait_until_indexed(service, timeout: float = 1800) -> None:
+    from qdrant_client import models
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        info = await service.client.get_collection(service.collection_name)
+        if info.status == models.CollectionStatus.GREEN:
+            return
+        await asyncio.sleep(1)
+    raise TimeoutError(f"{service.collection_name} still indexing after {timeout} s")
+
+
+async def measure(service, queries, truth, k: int, exact: bool = False) -> dict:
+    point_index = truth["point_index"]
+    params = service.index_config.search_params(exact=exact)
+    latencies, hits = [], 0
+    for query, expected in zip(queries, truth["indices"]):
+        start_time = time.perf_counter()
+        if exact:
+            response = await service.client.query_points(
+                service.collection_name, query=query.tolist(), limit=k, search_params=params
+            )
+            ids = [point.id for point in response.points]
+        else:
+            ids = [result["id"] for result in await service.search_similar(query, limit=k)]
+        latencies.append((time.perf_counter() - start_time) * 1000)
+        hits += len({point_index[str(point_id)] for point_id in ids} & set(expected.tolist()))
+    latencies.sort()
+    return {
+        "recall": hits / (len(queries) * k),
+        "p50": statistics.median(latencies),
+        "p99": latencies[max(0, int(len(latencies) * 0.99) - 1)],
+    }
+
+
+async def run(args) -> None:
+    import numpy as np
+    from qdrant_client import AsyncQdrantClient
+    from app.services.embedding import EmbeddingService
+    from app.services.qdrant import QdrantService, VectorIndexConfig
+
+    client = AsyncQdrantClient(host=args.host, port=args.port, prefer_grpc=args.grpc, timeout=300)
+    vectors = synthetic_catalog(args.points, args.dim)
+    queries = synthetic_catalog(args.queries, args.dim, seed=1)
+    doc_ids = [f"producto_{i}" for i in range(args.points)]
+    payloads = [{"tipo": "producto"} for _ in range(args.points)]
+
+    # Exact cosine top-k as ground truth
+    embedding = EmbeddingService()
+    normalized = embedding.normalize(vectors)
+    normalized_queries = embedding.normalize(queries)
+    indices = np.concatenate([
+        embedding.top_k(normalized_queries[start:start + 64], normalized, args.k, normalized=True)[0]
+        for start in range(0, len(queries), 64)
+    ])
+    truth = {"indices": indices, "point_index": {QdrantService.point_id(doc_id): i for i, doc_id in enumerate(doc_ids)}}
+
+    results = {}
+    for name, overrides in CONFIGURATIONS.items():
+        if args.only and name not in args.only.split(","):
+            continue
+        service = QdrantService(client=client, collection_name=f"bench_hnsw_{name}", index_config=VectorIndexConfig(**overrides))
+        service.vector_size = args.dim
+        await client.delete_collection(service.collection_name)
+        memory_before = server_memory_mb(args.host, args.port)
+        await service.create_collection_if_not_exists(payload_indexes=False)
+        try:
+            start_time = time.perf_counter()
+            await service.upsert_embeddings(doc_ids, vectors, payloads, 1024, 8)
+            await wait_until_indexed(service)
+            build_seconds = time.perf_counter() - start_time
+
+            config = service.index_config
+            expected_mb = args.points * args.dim * ((0 if config.on_disk else 4) + (1 if config.quantization == "int8" else 0)) / 1024 / 1024
+            row = {
+                **await measure(service, queries, truth, args.k),
+                "build_s": build_seconds,
+                "memory_mb": server_memory_mb(args.host, args.port) - memory_before,
+                "vector_ram_mb": expected_mb,
+            }
+            results[name] = row
+            print(
+                f"{name:16} recall@{args.k}={row['recall']:.4f}  p50={row['p50']:6.2f} ms  p99={row['p99']:6.2f} ms  "
+                f"memory={row['memory_mb']:7.1f} MB (vectors ~{expected_mb:.0f} MB)  build={build_seconds:.0f} s"
+            )
+            if name == "default":
+                exact = await measure(service, queries, truth, args.k, exact=True)
+                print(f"{'exact':16} recall@{args.k}={exact['recall']:.4f}  p50={exact['p50']:6.2f} ms  p99={exact['p99']:6.2f} ms")
+        finally:
+            await client.delete_collection(service.collection_name)
+    await client.close()
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=6333)
+    parser.add_argument("--grpc", action="store_true")
+    parser.add_argument("--points", type=int, default=200000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--only", help="comma-separated configuration names")
+    parser.add_argument("--json", help="also write the results to this file")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Search latency and throughput of the async QdrantService.
+
+    python benchmarks/bench_qdrant_search.py --location :memory:
+    docker run -p 6333:6333 -p 6334:6334 qdrant/qdrant
+    python benchmarks/bench_qdrant_search.py --host localhost
+    python benchmarks/bench_qdrant_search.py --host localhost --grpc
+
+Loads --points synthetic float32 vectors into a scratch collection (dropped
+at the end), then reports:
+
+  sequential   p50/p95 latency of --queries searches awaited one by one
+  concurrent   queries/s with --concurrency searches in flight on one shared
+               client (what concurrent API requests see)
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("EMBEDDING_WARMUP", "lazy")
+
+
+async def run(args) -> None:
+    import numpy as np
+    from qdrant_client import AsyncQdrantClient
+    from app.services.qdrant import QdrantService
+
+    if args.host:
+        client = AsyncQdrantClient(host=args.host, port=args.port, prefer_grpc=args.grpc, timeout=30)
+    else:
+        client = AsyncQdrantClient(location=args.location)
+    service = QdrantService(client=client, collection_name="bench_search")
+    service.vector_size = args.dim
+
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((args.points, args.dim), dtype=np.float32)
+    queries = rng.standard_normal((args.queries, args.dim), dtype=np.float32)
+
+    await client.delete_collection(service.collection_name)
+    await service.create_collection_if_not_exists()
+    try:
+        start_time = time.perf_counter()
+        await service.upsert_embeddings(
+            [f"producto_{i}" for i in range(args.points)], vectors,
+            [{"content": f"Producto {i}", "tipo": "producto", "categoria_id": i % 20} for i in range(args.points)]
+        )
+        print(f"loaded      {args.points} points in {time.perf_counter() - start_time:.2f} s")
+        await service.search_similar(queries[0], limit=args.limit)  # warm up
+
+        latencies = []
+        for query in queries:
+            start_time = time.perf_counter()
+            await service.search_similar(query, limit=args.limit)
+            latencies.append((time.perf_counter() - start_time) * 1000)
+        latencies.sort()
+        print(
+            f"sequential  p50={statistics.median(latencies):.2f} ms  "
+            f"p95={latencies[int(len(latencies) * 0.95) - 1]:.2f} ms"
+        )
+
+        semaphore = asyncio.Semaphore(args.concurrency)
+
+        async def search(query) -> None:
+            async with semaphore:
+                await service.search_similar(query, limit=args.limit)
+
+        start_time = time.perf_counter()
+        await asyncio.gather(*(search(query) for query in queries))
+        elapsed = time.perf_counter() - start_time
+        print(f"concurrent  {len(queries) / elapsed:.1f} queries/s at concurrency {args.concurrency}")
+    finally:
+        await client.delete_collection(service.collection_name)
+        await client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--location", default=":memory:", help="embedded Qdrant when --host is not given")
+    parser.add_argument("--host")
+    parser.add_argument("--port", type=int, default=6333)
+    parser.add_argument("--grpc", action="store_true", help="use gRPC (port 6334) instead of HTTP")
+    parser.add_argument("--points", type=int, default=20000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--limit", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=16)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
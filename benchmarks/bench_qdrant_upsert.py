@@ -0,0 +1,74 @@
+"""
+Ingest throughput of QdrantService.upsert_embeddings by batch size and parallelism.
+
+    python benchmarks/bench_qdrant_upsert.py --location :memory:
+    python benchmarks/bench_qdrant_upsert.py --host localhost --points 100000
+    python benchmarks/bench_qdrant_upsert.py --host localhost --grpc --batch-sizes 128,512 --parallelism 1,8
+
+Every combination writes the same --points synthetic vectors into a scratch
+collection (dropped at the end) and reports points/s. The second write of a
+combination must leave the point count unchanged: ids derive from
+"producto_{i}", so a re-sync replaces points instead of duplicating them.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("EMBEDDING_WARMUP", "lazy")
+
+
+async def run(args) -> None:
+    import numpy as np
+    from qdrant_client import AsyncQdrantClient
+    from app.services.qdrant import QdrantService
+
+    if args.host:
+        client = AsyncQdrantClient(host=args.host, port=args.port, prefer_grpc=args.grpc, timeout=60)
+    else:
+        client = AsyncQdrantClient(location=args.location)
+    service = QdrantService(client=client, collection_name="bench_upsert")
+    service.vector_size = args.dim
+
+    vectors = np.random.default_rng(0).standard_normal((args.points, args.dim), dtype=np.float32)
+    doc_ids = [f"producto_{i}" for i in range(args.points)]
+    payloads = [{"content": f"Producto {i}", "tipo": "producto", "categoria_id": i % 20} for i in range(args.points)]
+
+    try:
+        for batch_size in (int(value) for value in args.batch_sizes.split(",")):
+            for parallelism in (int(value) for value in args.parallelism.split(",")):
+                await client.delete_collection(service.collection_name)
+                await service.create_collection_if_not_exists()
+                service.reset_upsert_stats()
+                for _ in range(2):
+                    await service.upsert_embeddings(doc_ids, vectors, payloads, batch_size, parallelism)
+                stats = service.upsert_stats()
+                count = (await client.count(service.collection_name, exact=True)).count
+                print(
+                    f"batch={batch_size:<5} parallelism={parallelism:<3} {stats['points_per_second']:10.1f} points/s  "
+                    f"retries={stats['retries']}  points_after_resync={count}"
+                )
+    finally:
+        await client.delete_collection(service.collection_name)
+        await client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--location", default=":memory:", help="embedded Qdrant when --host is not given")
+    parser.add_argument("--host")
+    parser.add_argument("--port", type=int, default=6333)
+    parser.add_argument("--grpc", action="store_true", help="use gRPC (port 6334) instead of HTTP")
+    parser.add_argument("--points", type=int, default=20000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--batch-sizes", default="64,256,1024")
+    parser.add_argument("--parallelism", default="1,4,8")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Serialization cost per 10k productos: validated Pydantic path vs fast path.
+
+    python benchmarks/bench_serialization.py --rows 10000 --repeat 5
+
+"validated" reproduces the previous route behaviour: ProductoResponse(**row)
+per row, response_model validation and the stdlib json encoder.
+"fast" is the current path: model_construct plus orjson.
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.models.producto.ProductoModel import ProductoResponse
+from app.services.serialization import construct_models, dumps
+
+
+def make_rows(count: int) -> List[dict]:
+    now = datetime(2024, 1, 1)
+    return [
+        {
+            "id": i,
+            "categoriaId": i % 12 + 1,
+            "nombre": f"Dobok entrenamiento {i}",
+            "descripcion": "Uniforme de algodón para entrenamiento diario " * 3,
+            "talla": ("XS", "S", "M", "L", "XL")[i % 5],
+            "color": ("blanco", "negro", "azul")[i % 3],
+            "precio": Decimal("49.90") + i % 50,
+            "stock": i % 40,
+            "fechaCreacion": now + timedelta(minutes=i),
+            "fechaActualizacion": now + timedelta(minutes=i),
+        }
+        for i in range(count)
+    ]
+
+
+def validated(rows: List[dict]) -> bytes:
+    models = [ProductoResponse(**row) for row in rows]
+    checked = TypeAdapter(List[ProductoResponse]).validate_python(models)
+    return json.dumps(jsonable_encoder(checked), ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def fast(rows: List[dict]) -> bytes:
+    return dumps(construct_models(rows, ProductoResponse))
+
+
+def measure(fn, rows, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(rows)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    assert json.loads(validated(rows[:50])) == json.loads(fast(rows[:50])), "fast path changed the wire format"
+
+    baseline = measure(validated, rows, args.repeat)
+    optimized = measure(fast, rows, args.repeat)
+    print(f"rows: {args.rows}")
+    print(f"validated: {baseline * 1000:.1f} ms")
+    print(f"fast:      {optimized * 1000:.1f} ms")
+    print(f"speedup:   {baseline / optimized:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
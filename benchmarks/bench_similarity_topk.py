@@ -0,0 +1,81 @@
+"""
+In-memory similarity search with the EmbeddingService batch APIs.
+
+    python benchmarks/bench_similarity_topk.py --candidates 100000 --dim 384 --k 10
+
+Uses synthetic L2-normalized float32 vectors, so no model is loaded. Reports
+the median and p95 latency of:
+
+  top_k        one query vs the whole matrix (matrix-vector product + argpartition)
+  top_k batch  --batch queries at once (one matrix-matrix product)
+  full sort    the same scores ranked with argsort, for reference
+  python loop  EmbeddingService.similarity per candidate on a --loop-sample
+               subset, extrapolated to all candidates
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("EMBEDDING_WARMUP", "lazy")
+
+
+def timed(function, repeat: int) -> list:
+    samples = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        function()
+        samples.append((time.perf_counter() - start_time) * 1000)
+    return samples
+
+
+def report(name: str, samples: list, per: int = 1) -> None:
+    samples = sorted(sample / per for sample in samples)
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    print(f"{name:12} median={statistics.median(samples):8.3f} ms  p95={p95:8.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--candidates", type=int, default=100000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--batch", type=int, default=32)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--loop-sample", type=int, default=2000)
+    args = parser.parse_args()
+
+    import numpy as np
+    from app.services.embedding import EmbeddingService
+
+    service = EmbeddingService()
+    rng = np.random.default_rng(0)
+    candidates = service.normalize(rng.standard_normal((args.candidates, args.dim), dtype=np.float32))
+    queries = service.normalize(rng.standard_normal((args.batch, args.dim), dtype=np.float32))
+    query = queries[0]
+
+    # Same winners as a full sort
+    indices, _ = service.top_k(query, candidates, args.k, normalized=True)
+    expected = np.argsort(-(candidates @ query))[:args.k]
+    assert set(indices) == set(expected), "top_k disagrees with a full sort"
+
+    report("top_k", timed(lambda: service.top_k(query, candidates, args.k, normalized=True), args.repeat))
+    report(
+        "top_k batch",
+        timed(lambda: service.top_k(queries, candidates, args.k, normalized=True), max(1, args.repeat // 5)),
+        per=args.batch
+    )
+    report("full sort", timed(lambda: np.argsort(-(candidates @ query))[:args.k], max(1, args.repeat // 5)))
+
+    sample = candidates[:args.loop_sample]
+    loop = timed(lambda: [service.similarity(query, row) for row in sample], 3)
+    report("python loop", [ms * args.candidates / len(sample) for ms in loop])
+
+
+if __name__ == "__main__":
+    main()
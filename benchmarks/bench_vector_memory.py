@@ -0,0 +1,118 @@
+"""
+Memory of a full data sync: embeddings as Python lists vs one float32 matrix.
+
+    python benchmarks/bench_vector_memory.py --documents 100000 --dim 384
+
+Synthetic vectors stand in for the encoder, so no model or Qdrant is needed.
+Each path runs in a fresh interpreter and reports how much the peak RSS grew
+while preparing the upload, and how long that took:
+
+  lists   what the sync used to do: every embedding became a list of Python
+          floats (24 bytes per float plus 8 per list slot) held until upsert
+  matrix  DataSyncService now keeps the (n, dim) float32 matrix from
+          embed_documents (4 bytes per float) and only the batch being sent
+          is converted at the client's wire boundary
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+
+def peak_rss_mb() -> float:
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / (1024 if sys.platform == "darwin" else 1)
+
+
+def _encoder_output(documents: int, dim: int):
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    matrix = rng.standard_normal((documents, dim), dtype=np.float32)
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix
+
+
+def _payloads(documents: int) -> list:
+    return [{"content": f"Producto {i}", "tipo": "producto", "metadata": {"id": i}} for i in range(documents)]
+
+
+def run_lists(documents: int, dim: int, batch_size: int) -> dict:
+    matrix = _encoder_output(documents, dim)
+    payloads = _payloads(documents)
+    rss_before = peak_rss_mb()
+    start_time = time.perf_counter()
+
+    vectors = [row.tolist() for row in matrix]
+    points = [
+        {"id": i, "vector": vector, "payload": payload}
+        for i, (vector, payload) in enumerate(zip(vectors, payloads))
+    ]
+    for start in range(0, len(points), batch_size):
+        batch = points[start:start + batch_size]
+        assert batch
+
+    elapsed = time.perf_counter() - start_time
+    return {
+        "peak_rss_delta_mb": round(peak_rss_mb() - rss_before, 1),
+        "seconds": round(elapsed, 3)
+    }
+
+
+def run_matrix(documents: int, dim: int, batch_size: int) -> dict:
+    import numpy as np
+
+    matrix = _encoder_output(documents, dim)
+    payloads = _payloads(documents)
+    rss_before = peak_rss_mb()
+    start_time = time.perf_counter()
+
+    vectors = np.ascontiguousarray(matrix, dtype=np.float32)
+    assert vectors is matrix  # no copy for encoder output
+    for start in range(0, len(vectors), batch_size):
+        # The client serializes one batch at a time; that is the only list conversion left
+        batch = vectors[start:start + batch_size].tolist()
+        assert len(batch) == len(payloads[start:start + batch_size])
+
+    elapsed = time.perf_counter() - start_time
+    return {
+        "peak_rss_delta_mb": round(peak_rss_mb() - rss_before, 1),
+        "seconds": round(elapsed, 3),
+        "matrix_mb": round(matrix.nbytes / 1024 / 1024, 1)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=100000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--scenario", choices=["lists", "matrix"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.scenario:
+        runner = run_lists if args.scenario == "lists" else run_matrix
+        print(json.dumps(runner(args.documents, args.dim, args.batch_size)))
+        return
+
+    for scenario in ("lists", "matrix"):
+        output = subprocess.run(
+            [sys.executable, __file__, "--scenario", scenario, "--documents", str(args.documents),
+             "--dim", str(args.dim), "--batch-size", str(args.batch_size)],
+            capture_output=True, text=True, check=True, cwd=ROOT,
+            env={**os.environ, "EMBEDDING_WARMUP": "lazy", "EMBEDDING_CACHE_ENABLED": "false"}
+        ).stdout.strip().splitlines()[-1]
+        print(f"{scenario:7} {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from app.config import settings
 
 # Import all route modules
@@ -12,8 +13,13 @@ from app.routes.chat.ChatRoutes import admin_router as chat_admin_router
 from app.routes.ingest.IngestRoutes import router as ingest_router
 from app.routes.telegram.TelegramRoutes import telegram_router
 
-from app.services.qdrant import QdrantService
+from app.services.qdrant import get_qdrant_service, close_qdrant_service
 from app.services.data_sync import DataSyncService
+from app.services.cache import catalog_cache
+from app.services.write_behind import conversation_writer
+from app.services.model_registry import model_registry
+from app.services.embedding_executor import embedding_executor_stats, shutdown_embedding_executors
+from app.database import get_pool, close_pool, init_async_pool, close_async_pool, get_async_pool_stats
 import asyncio
 import logging
 
@@ -21,6 +27,10 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+if settings.EMBEDDING_WARMUP == "import":
+    # Loaded before gunicorn --preload forks, so workers share the weights copy-on-write
+    model_registry.preload(settings.EMBEDDING_MODEL, freeze=True)
+
 # Create FastAPI application
 app = FastAPI(
     title=settings.APP_NAME,
@@ -36,8 +46,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "Last-Modified"],
 )
 
+# Compress large list payloads for clients that send Accept-Encoding: gzip
+app.add_middleware(GZipMiddleware, minimum_size=settings.GZIP_MINIMUM_SIZE)
+
 # Include all routers
 app.include_router(categoria_router, prefix="/api/v1")
 app.include_router(producto_router, prefix="/api/v1")
@@ -52,13 +66,27 @@ app.include_router(telegram_router)
 @app.on_event("startup")
 async def startup_event():
     """Initialize RAG components on application startup"""
+    try:
+        # Open the minimum number of pooled database connections up front
+        await asyncio.to_thread(get_pool().warm_up)
+        await init_async_pool()
+        conversation_writer.start()
+        logger.info("Database connection pools initialized")
+    except Exception as e:
+        logger.error(f"Error initializing database pool: {str(e)}")
+    
+    if settings.EMBEDDING_WARMUP == "startup":
+        try:
+            await asyncio.to_thread(model_registry.preload, settings.EMBEDDING_MODEL)
+        except Exception as e:
+            logger.error(f"Error loading embedding model: {str(e)}")
+    
     try:
         logger.info("Initializing RAG components...")
         
-        # Initialize Qdrant service
-        qdrant_service = QdrantService()
-        qdrant_service.create_collection_if_not_exists()
-        logger.info("Qdrant collection initialized successfully")
+        # Initialize the vector backend (Qdrant, local store or Qdrant with local failover)
+        await get_qdrant_service().create_collection_if_not_exists()
+        logger.info(f"Vector collection initialized ({settings.VECTOR_BACKEND})")
         
         # Optional: Perform initial data synchronization
         # Uncomment the following lines if you want automatic sync on startup
@@ -74,6 +102,17 @@ async def startup_event():
         # Don't fail startup, but log the error
         logger.warning("Application started without RAG capabilities")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release pooled resources on application shutdown"""
+    # Flush buffered conversation turns while the pool is still open
+    await conversation_writer.stop()
+    await close_async_pool()
+    close_pool()
+    shutdown_embedding_executors()
+    await close_qdrant_service()
+    logger.info("Database connection pools closed")
+
 @app.get("/")
 def read_root():
     """Root endpoint"""
@@ -89,15 +128,38 @@ def health_check():
     """Health check endpoint"""
     return {"status": "healthy"}
 
+@app.get("/db-pool-status")
+def db_pool_status():
+    """Database connection pool statistics"""
+    return {
+        "sync": get_pool().stats(),
+        "async": get_async_pool_stats(),
+        "write_behind": conversation_writer.stats()
+    }
+
+@app.get("/cache-status")
+def cache_status():
+    """Catalog cache hit/miss statistics"""
+    return catalog_cache.stats()
+
+_data_sync_service = None
+
+def _get_data_sync_service() -> DataSyncService:
+    # Built once; status checks must not construct services per request
+    global _data_sync_service
+    if _data_sync_service is None:
+        _data_sync_service = DataSyncService()
+    return _data_sync_service
+
 @app.get("/rag-status")
 async def rag_status():
     """Check RAG system status"""
     try:
-        data_sync = DataSyncService()
-        status = await data_sync.get_sync_status()
+        status = await _get_data_sync_service().get_sync_status()
         return {
             "rag_enabled": True,
-            "sync_status": status
+            "sync_status": status,
+            "embedding": {**model_registry.stats(), "batching": embedding_executor_stats()}
         }
     except Exception as e:
         return {
@@ -0,0 +1,11 @@
+-- Composite indexes backing keyset pagination and NDJSON exports.
+-- Listings are ordered by (<fecha>, id) DESC and page with
+-- "<fecha> < ? OR (<fecha> = ? AND id < ?)", so each page is an index range scan.
+
+CREATE INDEX idx_producto_fecha_id ON producto (fechaCreacion, id);
+CREATE INDEX idx_producto_categoria_fecha_id ON producto (categoriaId, fechaCreacion, id);
+CREATE INDEX idx_categoria_fecha_id ON categoria (fechaCreacion, id);
+CREATE INDEX idx_usuario_fecha_id ON usuario (fechaCreacion, id);
+CREATE INDEX idx_promocion_inicio_id ON promocion (fechaInicio, id);
+CREATE INDEX idx_chat_fecha_id ON chat (fechaCreacion, id);
+CREATE INDEX idx_chat_usuario_fecha_id ON chat (usuarioId, fechaCreacion, id);
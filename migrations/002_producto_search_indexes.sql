@@ -0,0 +1,13 @@
+-- Indexes backing GET /api/v1/productos/search.
+-- Results are ordered by (precio, id) and paged with
+-- "precio > ? OR (precio = ? AND id > ?)". The equality filters
+-- (categoriaId, talla, color) lead each composite index so the precio range
+-- and the ORDER BY are resolved inside the same index without a filesort.
+
+CREATE INDEX idx_producto_categoria_talla_color_precio ON producto (categoriaId, talla, color, precio, id);
+CREATE INDEX idx_producto_talla_color_precio ON producto (talla, color, precio, id);
+CREATE INDEX idx_producto_color_precio ON producto (color, precio, id);
+CREATE INDEX idx_producto_precio_id ON producto (precio, id);
+
+-- Free-text search on nombre/descripcion (MATCH ... AGAINST in boolean mode)
+CREATE FULLTEXT INDEX ft_producto_nombre_descripcion ON producto (nombre, descripcion);
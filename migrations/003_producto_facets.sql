@@ -0,0 +1,29 @@
+-- Precomputed facet counters for GET /api/v1/productos/facets.
+-- One row per (facet, value): categoria ids, tallas, colores and precio
+-- buckets. ProductoController keeps them in step with each write inside the
+-- same transaction; POST /api/v1/productos/facets/rebuild recounts them.
+
+CREATE TABLE producto_facet (
+    facet VARCHAR(20) NOT NULL,
+    value VARCHAR(100) NOT NULL,
+    total INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (facet, value)
+);
+
+-- Initial fill; the precio buckets must match PRICE_BUCKETS in app/services/facets.py
+INSERT INTO producto_facet (facet, value, total)
+SELECT 'categoria', CAST(categoriaId AS CHAR), COUNT(*) FROM producto GROUP BY categoriaId
+UNION ALL
+SELECT 'talla', talla, COUNT(*) FROM producto WHERE talla IS NOT NULL GROUP BY talla
+UNION ALL
+SELECT 'color', color, COUNT(*) FROM producto WHERE color IS NOT NULL GROUP BY color
+UNION ALL
+SELECT 'precio', bucket, COUNT(*) FROM (
+    SELECT CASE
+        WHEN precio >= 200 THEN '200+'
+        WHEN precio >= 100 THEN '100-200'
+        WHEN precio >= 50 THEN '50-100'
+        WHEN precio >= 25 THEN '25-50'
+        ELSE '0-25'
+    END AS bucket FROM producto
+) AS buckets GROUP BY bucket;
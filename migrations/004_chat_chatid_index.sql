@@ -0,0 +1,4 @@
+-- Lookup of Telegram chats by their external key (chat.chatId = "telegram_<id>")
+-- when the write-behind conversation buffer resolves a chat it has not cached yet.
+
+CREATE INDEX idx_chat_chatid_fecha ON chat (chatId, fechaCreacion);